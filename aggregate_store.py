@@ -0,0 +1,169 @@
+"""
+Per-professor aggregates kept for every evaluation cycle.
+
+Each generated report saves a compact summary of its numbers (response count,
+specialization counts, the grade histogram and average of each of the 12
+questions) under its evaluation cycle. Trend sections are drawn from these
+summaries, so earlier cycles never have to be recomputed from raw workbooks.
+The summary also keeps the professor's counts per department and course/year,
+which rollups.py adds together into department and faculty rollups.
+"""
+import os
+import json
+import sqlite3
+import pandas as pd
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS professor_aggregates (
+    cycle TEXT NOT NULL,
+    professor TEXT NOT NULL,
+    computed_at TEXT NOT NULL,
+    total_students INTEGER NOT NULL,
+    summary TEXT NOT NULL,
+    PRIMARY KEY (professor, cycle)
+);
+"""
+
+
+def infer_semester(timestamp):
+    """
+    Name the evaluation cycle of a response from when it was submitted.
+    September-February belongs to the first semester of an academic year,
+    March-August to the second (e.g. 2024-11-20 -> "2024-2025 S1").
+    """
+    if pd.isna(timestamp):
+        return None
+    if not isinstance(timestamp, pd.Timestamp):
+        timestamp = pd.to_datetime(timestamp, errors='coerce', dayfirst=True)
+        if pd.isna(timestamp):
+            return None
+    year, month = timestamp.year, timestamp.month
+    if month >= 9:
+        return f"{year}-{year + 1} S1"
+    if month <= 2:
+        return f"{year - 1}-{year} S1"
+    return f"{year - 1}-{year} S2"
+
+
+def infer_semesters(timestamps):
+    """
+    infer_semester for a whole column at once: the evaluation cycle of every
+    response, missing where the timestamp is missing or cannot be parsed
+    """
+    parsed = pd.to_datetime(pd.Series(timestamps), errors='coerce', dayfirst=True)
+    months = parsed.dt.to_period('M')
+    names = {month: infer_semester(month.to_timestamp()) for month in months.dropna().unique()}
+    return months.map(names)
+
+
+def infer_cycle(timestamps):
+    """
+    The evaluation cycle most of a professor's responses were submitted in,
+    or None when there are no usable timestamps
+    """
+    cycles = pd.Series([infer_semester(value) for value in timestamps]).dropna()
+    if len(cycles) == 0:
+        return None
+    return cycles.value_counts().index[0]
+
+
+def summarize_aggregates(aggregates, cycle):
+    """
+    Reduce the aggregates of a report to the compact summary that is stored
+    """
+    questions = []
+    for question in aggregates["questions"]:
+        histogram = [0] * 10
+        for grade, count in question.get("sorted_grades", []):
+            histogram[int(grade) - 1] = int(count)
+        questions.append({
+            "number": question["number"],
+            "responses": int(question["responses"]),
+            "histogram": histogram,
+            "average": question.get("average"),
+        })
+    summary = {
+        "cycle": cycle,
+        "professor": str(aggregates["professor"]),
+        "total_students": int(aggregates["total_responses"]),
+        "spec_counts": {str(name): int(count) for name, count in aggregates["spec_counts"].items()},
+        "questions": questions,
+    }
+    if "rollup" in aggregates:
+        summary["department"] = str(aggregates["department"])
+        summary["rollup_hash"] = aggregates["rollup_hash"]
+        summary["rollup"] = [[department, course, year, measure, category, int(count)]
+                             for department, course, year, measure, category, count
+                             in aggregates["rollup"].itertuples(index=False)]
+    return summary
+
+
+def _connect(db_path):
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def save_summaries(db_path, summaries):
+    """
+    Store report summaries; a professor's summary replaces the one of the same cycle
+    """
+    computed_at = pd.Timestamp.now().isoformat(timespec='seconds')
+    conn = _connect(db_path)
+    try:
+        with conn:
+            conn.executemany(
+                """INSERT OR REPLACE INTO professor_aggregates (cycle, professor, computed_at, total_students, summary)
+                   VALUES (?, ?, ?, ?, ?)""",
+                [(summary["cycle"], summary["professor"], computed_at, summary["total_students"],
+                  json.dumps(summary, ensure_ascii=False)) for summary in summaries])
+    finally:
+        conn.close()
+
+
+def load_history(db_path, professor):
+    """
+    Return the stored summaries of one professor, oldest cycle first
+    """
+    if not os.path.exists(db_path):
+        return []
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute("SELECT summary FROM professor_aggregates WHERE professor = ? ORDER BY cycle",
+                            (str(professor),)).fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+def load_summaries(db_path, cycle=None):
+    """
+    Return the stored summaries of every professor for one cycle, or the
+    latest stored summary of every professor when no cycle is given
+    """
+    if not os.path.exists(db_path):
+        return []
+    conn = _connect(db_path)
+    try:
+        if cycle is not None:
+            rows = conn.execute("SELECT summary FROM professor_aggregates WHERE cycle = ? ORDER BY professor",
+                                (str(cycle),)).fetchall()
+        else:
+            rows = conn.execute("""SELECT summary FROM professor_aggregates AS a
+                                   WHERE cycle = (SELECT MAX(cycle) FROM professor_aggregates
+                                                  WHERE professor = a.professor)
+                                   ORDER BY professor""").fetchall()
+    finally:
+        conn.close()
+    return [json.loads(row[0]) for row in rows]
+
+
+def merge_history(history, summary):
+    """
+    Add the summary of the report being generated to the stored history,
+    replacing a stored summary of the same cycle
+    """
+    merged = {item["cycle"]: item for item in history}
+    merged[summary["cycle"]] = summary
+    return [merged[cycle] for cycle in sorted(merged)]
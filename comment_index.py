@@ -0,0 +1,134 @@
+"""
+Inverted index over the student comments of the response store.
+
+Each comment (pros, cons, areas of improvement) is split into words, folded to
+lower case without diacritics ("Întârziere" -> "intarziere", both ş and ș -> s)
+and stored as (term, comment) pairs in the same SQLite database as the responses.
+A query looks its words up as prefixes in that table, so "microfon" also finds
+"microfonul", without scanning the comment text. Indexing is incremental: only
+responses added to the store since the last update are read.
+"""
+import re
+import sqlite3
+import unicodedata
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS comment_docs (
+    id INTEGER PRIMARY KEY,
+    response_id INTEGER NOT NULL,
+    section INTEGER NOT NULL,
+    professor TEXT,
+    semester TEXT,
+    comment TEXT NOT NULL,
+    UNIQUE (response_id, section)
+);
+CREATE TABLE IF NOT EXISTS comment_terms (
+    term TEXT NOT NULL,
+    doc_id INTEGER NOT NULL,
+    PRIMARY KEY (term, doc_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS comment_index_state (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+# Same order as the comment columns of a report
+SECTION_NAMES = ["Pros", "Cons", "Areas of Improvement"]
+
+_WORD = re.compile(r"\w+")
+
+
+def fold_text(text):
+    """
+    Lower-case text and strip its diacritics
+    """
+    decomposed = unicodedata.normalize("NFKD", str(text).lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def tokenize(text):
+    """
+    The distinct folded words of a text
+    """
+    return set(_WORD.findall(fold_text(text)))
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def update_comment_index(db_path, progress_callback=None):
+    """
+    Index the comments of responses added to the store since the last update.
+    Returns the number of comments added to the index.
+    """
+    conn = _connect(db_path)
+    try:
+        if not conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'responses'").fetchone():
+            return 0
+        row = conn.execute("SELECT value FROM comment_index_state WHERE key = 'last_response_id'").fetchone()
+        last_id = row[0] if row else 0
+
+        rows = conn.execute("""SELECT id, professor, semester, comment_1, comment_2, comment_3
+                               FROM responses WHERE id > ? ORDER BY id""", (last_id,)).fetchall()
+        added = 0
+        with conn:
+            for response_id, professor, semester, *comments in rows:
+                for section, comment in enumerate(comments):
+                    if comment is None or not str(comment).strip():
+                        continue
+                    doc_id = conn.execute(
+                        """INSERT INTO comment_docs (response_id, section, professor, semester, comment)
+                           VALUES (?, ?, ?, ?, ?)""",
+                        (response_id, section, professor, semester, str(comment))).lastrowid
+                    conn.executemany("INSERT OR IGNORE INTO comment_terms (term, doc_id) VALUES (?, ?)",
+                                     ((term, doc_id) for term in tokenize(comment)))
+                    added += 1
+            if rows:
+                conn.execute("INSERT OR REPLACE INTO comment_index_state (key, value) VALUES ('last_response_id', ?)",
+                             (rows[-1][0],))
+    finally:
+        conn.close()
+
+    if added:
+        message = f"✓ Indexed {added} new comments"
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+    return added
+
+
+def search_comments(db_path, query, professor=None, semester=None, section=None, limit=200):
+    """
+    Find the comments that contain every word of query (as a word prefix,
+    ignoring case and diacritics). professor, semester and section (0-2, see
+    SECTION_NAMES) narrow the search. Returns dicts with professor, semester,
+    section, comment and response_id, grouped by professor.
+    """
+    terms = sorted(tokenize(query))
+    if not terms:
+        return []
+
+    # One range scan of the term index per word; a comment must match all of them
+    clauses = " INTERSECT ".join("SELECT doc_id FROM comment_terms WHERE term >= ? AND term < ?" for _ in terms)
+    params = [bound for term in terms for bound in (term, term + "\U0010ffff")]
+    sql = f"""SELECT response_id, section, professor, semester, comment FROM comment_docs
+              WHERE id IN ({clauses})"""
+    for column, value in (("professor", professor), ("semester", semester), ("section", section)):
+        if value is not None:
+            sql += f" AND {column} = ?"
+            params.append(value)
+    sql += " ORDER BY professor, semester, response_id, section LIMIT ?"
+    params.append(limit)
+
+    conn = _connect(db_path)
+    try:
+        rows = conn.execute(sql, params).fetchall()
+    finally:
+        conn.close()
+    return [{"response_id": response_id, "section": SECTION_NAMES[section], "professor": professor,
+             "semester": semester, "comment": comment}
+            for response_id, section, professor, semester, comment in rows]
@@ -2,10 +2,364 @@ import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import pandas as pd
 import os
-import shutil
 from pathlib import Path
 import threading
-from main import create_professor_pie_charts, read_excel, cleanup_temp_folder
+import time
+from contextlib import contextmanager
+from matplotlib import colors as mcolors
+from main import (create_professor_pie_charts, generate_faculty_pdf, read_excel_streaming, build_professor_index,
+                  create_chart_pool, prerender_professor_charts, professor_report_aggregates, plan_report_charts,
+                  reserve_output_path)
+from stats_export import report_statistics
+from validation import WorkbookValidationError, validate_workbook, format_validation_report
+from response_store import import_workbook, load_dataset, list_workbooks
+from rollups import generate_rollup_report
+from html_report import generate_html_site
+from comment_index import search_comments, fold_text
+
+OUTPUT_SEPARATE = "Separate PDF per professor"
+OUTPUT_COMBINED = "Combined faculty PDF (with bookmarks)"
+OUTPUT_ARCHIVE = "ZIP archive (one file, PDFs + manifest)"
+OUTPUT_ROLLUP = "Department & faculty summary PDF"
+OUTPUT_HTML = "HTML pages (static site with index)"
+
+# Professor choice that generates the professors ticked in the picker, as one batch
+SELECTED_PROFESSORS = "Selected Professors"
+
+# Report sections to draw (see resolve_sections in main.py)
+SECTION_PRESETS = {
+    "All sections": None,
+    "Grade analysis only": ["grades"],
+    "Comments only": ["comments"],
+    "Distributions only": ["distributions"],
+}
+
+# "All Professors" batches run in worker processes that are recycled regularly,
+# so memory held by matplotlib and font caches is returned to the system
+BATCH_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+# A single report renders its charts in this many processes
+CHART_WORKERS = min(4, os.cpu_count() or 1)
+REPORTS_PER_WORKER = 25
+WORKER_MEMORY_CAP_MB = 1500
+
+# Workbooks added with "Add Workbook" are combined into one dataset in this store,
+# which also keeps every report's aggregates for the trends across evaluation cycles
+DATASET_STORE = os.path.join("assets", "responses.db")
+
+# Charts whose data did not change are reused from here on the next run
+RENDER_CACHE = os.path.join("assets", "render_cache")
+# The charts of the selected professor are rendered into the cache in the background,
+# once the selection has stayed the same this long (ms)
+PRERENDER_DELAY_MS = 400
+# The preview follows the selection after this pause (ms)
+PREVIEW_DELAY_MS = 150
+
+@contextmanager
+def reserved_download(directory, filename):
+    """
+    Claim a file name in directory that no other run can take (see reserve_output_path)
+    and yield its Path; the name is released again if the block fails
+    """
+    path = Path(reserve_output_path(str(directory), filename))
+    try:
+        yield path
+    except BaseException:
+        path.unlink(missing_ok=True)
+        raise
+
+class ProfessorPicker(ttk.Frame):
+    """
+    Filterable multi-select list of professors.
+    
+    Only the rows in view are drawn on a canvas (about a dozen items, whatever the
+    number of professors), so filtering and scrolling stay instant with thousands
+    of names. Click toggles a professor, Shift+click applies the same to a range.
+    on_change(selected) is called with the set of selected names.
+    """
+    ROW_HEIGHT = 20
+    
+    def __init__(self, parent, on_change=None, visible_rows=8):
+        super().__init__(parent)
+        self.on_change = on_change
+        self.names = []          # Every professor, in alphabetical order
+        self.folded = []         # The same names without case and diacritics, for filtering
+        self.shown = []          # The names that match the filter
+        self.selected = set()
+        self.top = 0             # Index in shown of the first row in view
+        self.anchor = None       # Last clicked row, for Shift+click
+        self.columnconfigure(0, weight=1)
+        
+        self.filter_text = tk.StringVar()
+        self.filter_text.trace_add('write', lambda *args: self._apply_filter())
+        ttk.Entry(self, textvariable=self.filter_text, font=('Arial', 10)).grid(row=0, column=0, columnspan=2,
+                                                                               sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.canvas = tk.Canvas(self, height=visible_rows * self.ROW_HEIGHT, bg='white',
+                                highlightthickness=1, highlightbackground='#cccccc')
+        self.canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.scrollbar = ttk.Scrollbar(self, orient='vertical', command=self._yview)
+        self.scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        
+        self.canvas.bind('<Configure>', lambda event: self._draw())
+        self.canvas.bind('<Button-1>', self._click)
+        self.canvas.bind('<Shift-Button-1>', lambda event: self._click(event, extend=True))
+        self.canvas.bind('<MouseWheel>', lambda event: self._scroll(-1 if event.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda event: self._scroll(-1))
+        self.canvas.bind('<Button-5>', lambda event: self._scroll(1))
+        
+        buttons = ttk.Frame(self)
+        buttons.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+        ttk.Button(buttons, text="Select shown", command=self.select_shown).pack(side=tk.LEFT, padx=(0, 5))
+        ttk.Button(buttons, text="Clear", command=self.clear).pack(side=tk.LEFT)
+        self.count_label = ttk.Label(buttons, text="", font=('Arial', 9))
+        self.count_label.pack(side=tk.RIGHT)
+    
+    def set_professors(self, names):
+        """Replace the list; selected professors that are still listed stay selected"""
+        self.names = list(names)
+        self.folded = [fold_text(name) for name in self.names]
+        self.selected &= set(self.names)
+        self._apply_filter()
+        self._changed()
+    
+    def select_shown(self):
+        self.selected.update(self.shown)
+        self._draw()
+        self._changed()
+    
+    def clear(self):
+        self.selected.clear()
+        self._draw()
+        self._changed()
+    
+    def _changed(self):
+        self.count_label.config(text=f"{len(self.selected)} selected")
+        if self.on_change:
+            self.on_change(set(self.selected))
+    
+    def _apply_filter(self):
+        query = fold_text(self.filter_text.get().strip())
+        self.shown = [name for name, folded in zip(self.names, self.folded) if query in folded]
+        self.top = 0
+        self.anchor = None
+        self._draw()
+    
+    def _visible_rows(self):
+        return max(1, self.canvas.winfo_height() // self.ROW_HEIGHT)
+    
+    def _scroll_to(self, top):
+        self.top = max(0, min(top, len(self.shown) - self._visible_rows()))
+        self._draw()
+    
+    def _scroll(self, rows):
+        self._scroll_to(self.top + rows)
+    
+    def _yview(self, *args):
+        """Scrollbar commands: ('moveto', fraction) or ('scroll', n, 'units' or 'pages')"""
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self.shown)))
+        elif args[0] == 'scroll':
+            step = self._visible_rows() if args[2] == 'pages' else 1
+            self._scroll(int(args[1]) * step)
+    
+    def _draw(self):
+        """Draw only the rows in view"""
+        self.canvas.delete('all')
+        width = self.canvas.winfo_width()
+        visible = self._visible_rows()
+        for row, name in enumerate(self.shown[self.top:self.top + visible]):
+            y = row * self.ROW_HEIGHT
+            if name in self.selected:
+                self.canvas.create_rectangle(0, y, width, y + self.ROW_HEIGHT, fill='#dce8fa', outline='')
+            mark = "☑" if name in self.selected else "☐"
+            self.canvas.create_text(6, y + self.ROW_HEIGHT / 2, text=f"{mark}  {name}", anchor=tk.W, font=('Arial', 10))
+        if self.shown:
+            self.scrollbar.set(self.top / len(self.shown), min(1.0, (self.top + visible) / len(self.shown)))
+        else:
+            self.scrollbar.set(0, 1)
+    
+    def _click(self, event, extend=False):
+        index = self.top + event.y // self.ROW_HEIGHT
+        if index >= len(self.shown):
+            return
+        name = self.shown[index]
+        select = name not in self.selected
+        if extend and self.anchor is not None:
+            # Give the whole range the state of the row clicked before
+            select = self.shown[self.anchor] in self.selected
+            first, last = sorted((self.anchor, index))
+            names = self.shown[first:last + 1]
+        else:
+            names = [name]
+            self.anchor = index
+        if select:
+            self.selected.update(names)
+        else:
+            self.selected.difference_update(names)
+        self._draw()
+        self._changed()
+
+class ReportPreview(ttk.Frame):
+    """
+    Quick look at a professor's report: the key figures, a table of the questions
+    and a thumbnail of every chart of the report.
+    
+    Everything is drawn straight from the aggregates with canvas shapes (pie slices,
+    bars, lines), without rendering the real charts, so a preview shows up in a
+    fraction of a second. The thumbnails follow the chart plan of the report
+    (plan_report_charts), so they show the same charts the PDF will have.
+    """
+    THUMB_WIDTH = 150
+    THUMB_HEIGHT = 110
+    TITLE_HEIGHT = 16
+    PALETTE = list(mcolors.TABLEAU_COLORS.values())
+    
+    def __init__(self, parent):
+        super().__init__(parent, padding=5)
+        self.chart_jobs = []
+        self.columnconfigure(0, weight=1)
+        self.rowconfigure(1, weight=1)
+        
+        self.summary = ttk.Label(self, text="Select a professor to preview their report", font=('Arial', 10, 'bold'))
+        self.summary.grid(row=0, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(0, 5))
+        
+        self.canvas = tk.Canvas(self, height=2 * self.THUMB_HEIGHT, bg='white',
+                                highlightthickness=1, highlightbackground='#cccccc')
+        self.canvas.grid(row=1, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(self, orient='vertical', command=self.canvas.yview)
+        scrollbar.grid(row=1, column=1, sticky=(tk.N, tk.S))
+        self.canvas.configure(yscrollcommand=scrollbar.set)
+        self.canvas.bind('<Configure>', lambda event: self._draw())
+        
+        self.questions = ttk.Treeview(self, columns=("question", "average", "responses", "rate"),
+                                      show='headings', height=5)
+        for column, heading, width, anchor in (("question", "Question", 380, tk.W), ("average", "Average", 70, tk.E),
+                                               ("responses", "Responses", 80, tk.E), ("rate", "Response rate", 100, tk.E)):
+            self.questions.heading(column, text=heading)
+            self.questions.column(column, width=width, anchor=anchor, stretch=(column == "question"))
+        self.questions.grid(row=2, column=0, columnspan=2, sticky=(tk.W, tk.E), pady=(5, 0))
+    
+    def clear(self, message):
+        self.summary.config(text=message)
+        self.chart_jobs = []
+        self.questions.delete(*self.questions.get_children())
+        self._draw()
+    
+    def show(self, aggregates, chart_jobs, seconds=None):
+        """Show the statistics of a report (see report_statistics) and sketch its chart jobs"""
+        statistics = report_statistics(aggregates)
+        averages = [q["average"] for q in statistics.get("questions", []) if q["average"] is not None]
+        parts = [statistics["professor"]]
+        if statistics["department"]:
+            parts.append(statistics["department"])
+        parts.append(f"{statistics['total_students']} students")
+        if averages:
+            parts.append(f"average score {sum(averages) / len(averages):.2f}")
+        parts.append(f"{len(chart_jobs)} charts")
+        if seconds is not None:
+            parts.append(f"previewed in {seconds:.2f} s")
+        self.summary.config(text="  ·  ".join(parts))
+        
+        self.questions.delete(*self.questions.get_children())
+        for question in statistics.get("questions", []):
+            text = question["text"] if len(question["text"]) <= 70 else question["text"][:69] + "…"
+            average = "" if question["average"] is None else f"{question['average']:.2f}"
+            rate = "" if question["response_rate"] is None else f"{question['response_rate']:.1f}%"
+            self.questions.insert('', tk.END, values=(f"{question['number']}. {text}", average,
+                                                      question["responses"], rate))
+        
+        self.chart_jobs = chart_jobs
+        self._draw()
+    
+    def _draw(self):
+        """Lay the thumbnails out in as many columns as fit"""
+        self.canvas.delete('all')
+        columns = max(1, self.canvas.winfo_width() // self.THUMB_WIDTH)
+        for index, (key, render, kwargs) in enumerate(self.chart_jobs):
+            x = (index % columns) * self.THUMB_WIDTH
+            y = (index // columns) * self.THUMB_HEIGHT
+            self.canvas.create_text(x + self.THUMB_WIDTH / 2, y + 3, text=key.replace("_", " ").capitalize(),
+                                    anchor=tk.N, font=('Arial', 8, 'bold'))
+            box = (x + 8, y + self.TITLE_HEIGHT + 2, self.THUMB_WIDTH - 16, self.THUMB_HEIGHT - self.TITLE_HEIGHT - 10)
+            sketch = self.SKETCHES.get(render.__name__)
+            if sketch:
+                sketch(self, box, **kwargs)
+        rows = -(-len(self.chart_jobs) // columns)
+        self.canvas.configure(scrollregion=(0, 0, columns * self.THUMB_WIDTH, rows * self.THUMB_HEIGHT))
+    
+    def _pie(self, box, values, **kwargs):
+        x, y, width, height = box
+        size = min(width, height)
+        left, top = x + (width - size) / 2, y + (height - size) / 2
+        total = sum(values)
+        if not total:
+            return
+        if len(values) == 1:
+            self.canvas.create_oval(left, top, left + size, top + size, fill=self.PALETTE[0], outline='white')
+            return
+        start = 90
+        for index, value in enumerate(values):
+            extent = value / total * 360
+            self.canvas.create_arc(left, top, left + size, top + size, start=start, extent=extent, style=tk.PIESLICE,
+                                   fill=self.PALETTE[index % len(self.PALETTE)], outline='white')
+            start += extent
+    
+    def _bars(self, box, values, color='lightblue', edgecolor='darkblue', maximum=None):
+        x, y, width, height = box
+        maximum = maximum or max(values, default=0)
+        if not values or not maximum:
+            return
+        step = width / len(values)
+        fills = color if isinstance(color, list) else [color] * len(values)
+        for index, value in enumerate(values):
+            bar_height = value / maximum * height
+            self.canvas.create_rectangle(x + index * step + 1, y + height - bar_height, x + (index + 1) * step - 1,
+                                         y + height, fill=mcolors.to_hex(fills[index % len(fills)]),
+                                         outline=mcolors.to_hex(edgecolor))
+    
+    def _line(self, box, values, color='#2E86C1', minimum=None, maximum=None):
+        x, y, width, height = box
+        points = [(index, value) for index, value in enumerate(values) if value is not None]
+        if not points:
+            return
+        minimum = min(value for _, value in points) if minimum is None else minimum
+        maximum = max(value for _, value in points) if maximum is None else maximum
+        span = (maximum - minimum) or 1
+        step = width / max(1, len(values) - 1)
+        coords = [(x + index * step, y + height - (value - minimum) / span * height) for index, value in points]
+        if len(coords) > 1:
+            self.canvas.create_line(*[c for point in coords for c in point], fill=color, width=2)
+        for px, py in coords:
+            self.canvas.create_oval(px - 2, py - 2, px + 2, py + 2, fill=color, outline=color)
+    
+    def _sketch_bar_chart(self, box, values, color, edgecolor, **kwargs):
+        self._bars(box, values, color, edgecolor)
+    
+    def _sketch_teaching_methods(self, box, method_values, **kwargs):
+        self._bars(box, method_values, ['#4CAF50', '#2196F3', '#FF9800', '#9C27B0'], 'black')
+    
+    def _sketch_completion_trend(self, box, counts, **kwargs):
+        self._line(box, counts, minimum=0)
+    
+    def _sketch_pareto(self, box, counts, cumulative_percentages, **kwargs):
+        self._bars(box, counts)
+        x, y, width, height = box
+        step = width / max(1, len(counts))
+        # Through the middle of each bar, on a 0-100% scale like the right axis of the chart
+        self._line((x + step / 2, y, width - step, height), cumulative_percentages, color='red', minimum=0, maximum=100)
+    
+    def _sketch_question_trends(self, box, averages, **kwargs):
+        for index, question in enumerate(averages):
+            self._line(box, question, color=self.PALETTE[index % len(self.PALETTE)], minimum=1, maximum=10)
+    
+    SKETCHES = {
+        "render_pie_chart": _pie,
+        "render_bar_chart": _sketch_bar_chart,
+        "render_teaching_methods_chart": _sketch_teaching_methods,
+        "render_completion_trend_chart": _sketch_completion_trend,
+        "render_pareto_chart": _sketch_pareto,
+        "render_question_trends_chart": _sketch_question_trends,
+    }
 
 class ProfessorReportGUI:
     def __init__(self, root):
@@ -18,8 +372,29 @@ class ProfessorReportGUI:
         # Variables
         self.excel_file_path = tk.StringVar()
         self.selected_professor = tk.StringVar()
+        self.output_format = tk.StringVar(value=OUTPUT_SEPARATE)
+        self.report_sections = tk.StringVar(value="All sections")
+        self.export_statistics = tk.BooleanVar(value=False)
         self.professors_list = []
         self.data = None
+        self.professor_index = None
+        self.loading = False  # A workbook is being read in the background
+        self.using_store = False  # The dataset comes from workbooks added to DATASET_STORE
+        self.generating = False
+        
+        # Speculative rendering of the selected professor's charts (see _schedule_prerender)
+        self.prerender_pool = None
+        self.prerender_charts = {}
+        self.prerender_generation = 0
+        self.prerender_after = None
+        self.selected_professor.trace_add('write', lambda *args: self._schedule_prerender())
+        self.report_sections.trace_add('write', lambda *args: self._schedule_prerender())
+        
+        # Preview of the selected professor's report (see _schedule_preview)
+        self.preview_generation = 0
+        self.preview_after = None
+        self.selected_professor.trace_add('write', lambda *args: self._schedule_preview())
+        self.report_sections.trace_add('write', lambda *args: self._schedule_preview())
         
         # Configure scaling for high DPI displays
         self.root.tk.call('tk', 'scaling', 1.2)
@@ -53,9 +428,13 @@ class ProfessorReportGUI:
         self.browse_button = ttk.Button(step1_frame, text="Browse", command=self.browse_file)
         self.browse_button.grid(row=0, column=2, padx=(0, 5))
         
+        # Add another export (e.g. another faculty or semester) to the combined dataset
+        self.add_workbook_button = ttk.Button(step1_frame, text="Add Workbook", command=self.add_workbook)
+        self.add_workbook_button.grid(row=0, column=3, padx=(0, 5))
+        
         # File status
         self.file_status = ttk.Label(step1_frame, text="No file selected", foreground="red", font=('Arial', 9))
-        self.file_status.grid(row=1, column=0, columnspan=3, pady=(10, 0), sticky=(tk.W, tk.E))
+        self.file_status.grid(row=1, column=0, columnspan=4, pady=(10, 0), sticky=(tk.W, tk.E))
         
         # Step 2: Professor Selection
         step2_frame = ttk.LabelFrame(main_frame, text="Step 2: Select Professor", padding="15")
@@ -73,30 +452,82 @@ class ProfessorReportGUI:
                                    foreground="orange", font=('Arial', 9))
         self.prof_status.grid(row=1, column=0, columnspan=3, pady=(10, 0), sticky=(tk.W, tk.E))
         
+        # Keyword search over the comments of every workbook in the dataset store
+        ttk.Label(step2_frame, text="Search comments:", font=('Arial', 10)).grid(row=2, column=0, sticky=tk.W,
+                                                                               padx=(0, 15), pady=(10, 0))
+        self.comment_query = tk.StringVar()
+        self.comment_entry = ttk.Entry(step2_frame, textvariable=self.comment_query, font=('Arial', 10))
+        self.comment_entry.grid(row=2, column=1, sticky=(tk.W, tk.E), padx=(0, 15), pady=(10, 0))
+        self.comment_entry.bind('<Return>', lambda event: self.search_comments())
+        
+        self.search_button = ttk.Button(step2_frame, text="Search", command=self.search_comments)
+        self.search_button.grid(row=2, column=2, pady=(10, 0))
+        
+        # Any subset of professors (e.g. one department), generated together
+        ttk.Label(step2_frame, text="Pick professors:", font=('Arial', 10)).grid(row=3, column=0, sticky=(tk.W, tk.N),
+                                                                              padx=(0, 15), pady=(10, 0))
+        self.professor_picker = ProfessorPicker(step2_frame, on_change=lambda selected: self._refresh_professor_choices())
+        self.professor_picker.grid(row=3, column=1, columnspan=2, sticky=(tk.W, tk.E), pady=(10, 0))
+        
         # Step 3: Generate Reports
         step3_frame = ttk.LabelFrame(main_frame, text="Step 3: Generate Reports", padding="15")
         step3_frame.grid(row=3, column=0, columnspan=3, sticky=(tk.W, tk.E, tk.N, tk.S), pady=(0, 15))
         step3_frame.columnconfigure(0, weight=1)
-        step3_frame.rowconfigure(2, weight=1)  # Make status text area expandable
+        step3_frame.rowconfigure(3, weight=1)  # Make status text area expandable
+        
+        # Output format (only matters for "All Professors")
+        format_frame = ttk.Frame(step3_frame)
+        format_frame.grid(row=0, column=0, sticky=(tk.W, tk.E))
+        format_frame.columnconfigure(1, weight=1)
+        
+        ttk.Label(format_frame, text="Output:", font=('Arial', 10)).grid(row=0, column=0, sticky=tk.W, padx=(0, 15))
+        
+        self.format_combo = ttk.Combobox(format_frame, textvariable=self.output_format, state='readonly',
+                                         values=[OUTPUT_SEPARATE, OUTPUT_COMBINED, OUTPUT_ARCHIVE, OUTPUT_ROLLUP, OUTPUT_HTML], font=('Arial', 10))
+        self.format_combo.grid(row=0, column=1, sticky=(tk.W, tk.E))
+        
+        # Drawing only some sections skips the numbers and charts of the others
+        ttk.Label(format_frame, text="Sections:", font=('Arial', 10)).grid(row=1, column=0, sticky=tk.W,
+                                                                         padx=(0, 15), pady=(10, 0))
+        self.sections_combo = ttk.Combobox(format_frame, textvariable=self.report_sections, state='readonly',
+                                           values=list(SECTION_PRESETS), font=('Arial', 10))
+        self.sections_combo.grid(row=1, column=1, sticky=(tk.W, tk.E), pady=(10, 0))
+        
+        # The report numbers as files for other tools, from the same pass as the PDFs
+        ttk.Checkbutton(format_frame, text="Also export statistics (JSON and CSV)",
+                        variable=self.export_statistics).grid(row=2, column=1, sticky=tk.W, pady=(10, 0))
         
         self.generate_button = ttk.Button(step3_frame, text="Generate PDF Report(s)", 
                                         command=self.generate_reports, state='disabled')
-        self.generate_button.grid(row=0, column=0, pady=15, sticky=(tk.W, tk.E))
+        self.generate_button.grid(row=1, column=0, pady=15, sticky=(tk.W, tk.E))
         
         # Progress bar
         self.progress = ttk.Progressbar(step3_frame, mode='indeterminate')
-        self.progress.grid(row=1, column=0, sticky=(tk.W, tk.E), pady=(0, 15))
+        self.progress.grid(row=2, column=0, sticky=(tk.W, tk.E), pady=(0, 15))
+        
+        # Status log and report preview share the space below the button
+        self.notebook = ttk.Notebook(step3_frame)
+        self.notebook.grid(row=3, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        status_frame = ttk.Frame(self.notebook)
+        status_frame.columnconfigure(0, weight=1)
+        status_frame.rowconfigure(0, weight=1)
+        self.notebook.add(status_frame, text="Status")
         
         # Status text with better sizing
-        self.status_text = tk.Text(step3_frame, height=10, font=('Consolas', 9), 
+        self.status_text = tk.Text(status_frame, height=10, font=('Consolas', 9), 
                                  state='disabled', wrap=tk.WORD, bg='#f8f8f8')
-        self.status_text.grid(row=2, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.status_text.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Scrollbar for status text
-        scrollbar = ttk.Scrollbar(step3_frame, orient="vertical", command=self.status_text.yview)
-        scrollbar.grid(row=2, column=1, sticky=(tk.N, tk.S))
+        scrollbar = ttk.Scrollbar(status_frame, orient="vertical", command=self.status_text.yview)
+        scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
         self.status_text.configure(yscrollcommand=scrollbar.set)
         
+        # Key figures and chart thumbnails of the selected professor, to check the data
+        # before generating
+        self.preview = ReportPreview(self.notebook)
+        self.notebook.add(self.preview, text="Preview")
+        
         # Step 4: Download Location Info
         step4_frame = ttk.LabelFrame(main_frame, text="Step 4: Download Location", padding="15")
         step4_frame.grid(row=4, column=0, columnspan=3, sticky=(tk.W, tk.E), pady=(0, 15))
@@ -125,49 +556,230 @@ class ProfessorReportGUI:
             self.load_excel_file(filename)
     
     def load_excel_file(self, filename):
-        """Load Excel file and extract professor names"""
+        """Load the Excel file in the background; professors are listed while it is read"""
+        self.loading = True
+        self.using_store = False
+        self.data = None
+        self.professor_index = None
+        self.professors_list = []
+        self.professor_combo['values'] = []
+        self.professor_picker.set_professors([])
+        self.selected_professor.set("")
+        self.browse_button.config(state='disabled')
+        self.add_workbook_button.config(state='disabled')
+        self.file_status.config(text=f"Loading {os.path.basename(filename)}...", foreground="orange")
+        self.prof_status.config(text="Reading professors...", foreground="orange")
+        self.log_status(f"Loading {os.path.basename(filename)}...")
+        self.progress.start()
+        self.update_ui_state()
+        
+        threading.Thread(target=self._load_excel_thread, args=(filename,), daemon=True).start()
+    
+    def _load_excel_thread(self, filename):
+        """Read the selected file in place and check it (runs in a background thread)"""
+        def on_rows(rows_read, new_professors):
+            # Update UI on main thread
+            self.root.after(0, self._add_loading_professors, rows_read, new_professors)
+        
         try:
-            # Copy file to assets folder with correct name
-            assets_dir = "assets"
-            os.makedirs(assets_dir, exist_ok=True)
-            
-            # Copy and rename file
-            target_file = os.path.join(assets_dir, "QuestionPro-SR-RawData.xlsx")
-            shutil.copy2(filename, target_file)
-            
-            # Load the data
-            self.data = read_excel(target_file)
-            
-            # Extract professor names
-            professors = self.data['Level 2'].dropna().unique()
-            professors = sorted([prof for prof in professors if pd.notna(prof)])
-            
-            # Update professor list
-            self.professors_list = ["All Professors"] + list(professors)
-            self.professor_combo['values'] = self.professors_list
-            self.selected_professor.set("All Professors")  # Default selection
-            
-            # Update status
-            self.file_status.config(text=f"✓ File loaded successfully ({len(professors)} professors found)", 
-                                  foreground="green")
-            self.prof_status.config(text=f"✓ {len(professors)} professors available for selection", 
-                                  foreground="green")
-            
-            self.log_status(f"Excel file loaded successfully: {os.path.basename(filename)}")
-            self.log_status(f"Found {len(professors)} professors in the data")
-            self.log_status("File copied to assets folder as QuestionPro-SR-RawData.xlsx")
-            
+            data = read_excel_streaming(filename, on_rows)
+            validation = validate_workbook(data)
+            self.root.after(0, self._loading_complete, filename, data, validation)
         except Exception as e:
-            self.file_status.config(text=f"✗ Error loading file: {str(e)}", foreground="red")
+            self.root.after(0, self._loading_error, e)
+    
+    def _add_loading_professors(self, rows_read, new_professors):
+        """List the professors found so far while the rest of the file is read"""
+        if not self.loading:
+            return
+        if new_professors:
+            professors = sorted(set(self.professors_list[1:]) | set(new_professors))
+            self.professors_list = ["All Professors"] + professors
+            self.professor_picker.set_professors(professors)
+            self._refresh_professor_choices()
+        self.prof_status.config(text=f"Reading... {rows_read} responses, {len(self.professors_list[1:])} professors so far",
+                                foreground="orange")
+    
+    def _loading_finished(self):
+        self.loading = False
+        self.progress.stop()
+        self.browse_button.config(state='normal')
+        self.add_workbook_button.config(state='normal')
+    
+    def _loading_complete(self, filename, data, validation):
+        """Called on the main thread once the file is read and validated"""
+        self._loading_finished()
+        selected = self.selected_professor.get()
+        professors = self._use_dataset(data)
+        if selected in self.professors_list:
+            self.selected_professor.set(selected)  # Keep a choice made while the file was read
+        
+        # Update status
+        self.file_status.config(text=f"✓ File loaded successfully ({len(professors)} professors found)", 
+                              foreground="green")
+        
+        self.log_status(f"Excel file loaded successfully: {os.path.basename(filename)}")
+        self.log_status(f"Found {len(professors)} professors in the data")
+        for line in format_validation_report(validation).splitlines():
+            self.log_status(line)
+        self.update_ui_state()
+    
+    def _loading_error(self, error):
+        """Called on the main thread when the file could not be loaded"""
+        self._loading_finished()
+        self.professors_list = []
+        self.professor_combo['values'] = []
+        self.professor_picker.set_professors([])
+        self.selected_professor.set("")
+        
+        if isinstance(error, WorkbookValidationError):
+            self.file_status.config(text=f"✗ Workbook rejected ({len(error.report['errors'])} problems)", foreground="red")
+            self.prof_status.config(text="Please select a valid Excel file", foreground="red")
+            for line in str(error).splitlines():
+                self.log_status(line)
+            messagebox.showerror("Invalid Workbook", str(error))
+        else:
+            self.file_status.config(text=f"✗ Error loading file: {str(error)}", foreground="red")
             self.prof_status.config(text="Please select a valid Excel file", foreground="red")
-            self.log_status(f"Error loading file: {str(e)}")
-            messagebox.showerror("Error", f"Failed to load Excel file:\n{str(e)}")
+            self.log_status(f"Error loading file: {str(error)}")
+            messagebox.showerror("Error", f"Failed to load Excel file:\n{str(error)}")
         
         self.update_ui_state()
     
+    def _use_dataset(self, data):
+        """Make data the dataset to report on and list its professors"""
+        self.data = data
+        
+        # Index each professor's rows once; the index is already in alphabetical order
+        # and is shared with the generator
+        self.professor_index = build_professor_index(self.data)
+        professors = list(self.professor_index)
+        
+        # Update professor list
+        self.professors_list = ["All Professors"] + list(professors)
+        self.selected_professor.set("All Professors")  # Default selection
+        self.professor_picker.set_professors(professors)
+        self._refresh_professor_choices()
+        
+        self.prof_status.config(text=f"✓ {len(professors)} professors available for selection", 
+                              foreground="green")
+        return professors
+    
+    def _refresh_professor_choices(self):
+        """Offer "Selected Professors" (and switch to it) while professors are picked"""
+        if not self.professors_list:
+            return
+        if self.professor_picker.selected:
+            self.professor_combo['values'] = [self.professors_list[0], SELECTED_PROFESSORS] + self.professors_list[1:]
+            self.selected_professor.set(SELECTED_PROFESSORS)
+        else:
+            self.professor_combo['values'] = self.professors_list
+            if self.selected_professor.get() == SELECTED_PROFESSORS:
+                self.selected_professor.set("All Professors")
+    
+    def add_workbook(self):
+        """Append another workbook to the combined dataset (only the new file is read)"""
+        filename = filedialog.askopenfilename(
+            title="Add Excel File to Dataset",
+            filetypes=[('Excel files', '*.xlsx *.xls'), ('All files', '*.*')]
+        )
+        if not filename:
+            return
+        
+        # The previous dataset stays listed until the new one is ready
+        self.loading = True
+        self.browse_button.config(state='disabled')
+        self.add_workbook_button.config(state='disabled')
+        self.file_status.config(text=f"Adding {os.path.basename(filename)} to the dataset...", foreground="orange")
+        self.progress.start()
+        self.update_ui_state()
+        
+        threading.Thread(target=self._add_workbook_thread, args=(filename,), daemon=True).start()
+    
+    def _add_workbook_thread(self, filename):
+        """Import the file into the store and read the combined dataset (runs in a background thread)"""
+        def progress_callback(message):
+            # Update UI on main thread
+            self.root.after(0, lambda: self.log_status(message))
+        
+        try:
+            import_workbook(DATASET_STORE, filename, progress_callback=progress_callback)
+            data = load_dataset(DATASET_STORE)
+            workbooks = list_workbooks(DATASET_STORE)
+            self.root.after(0, self._workbook_added, data, workbooks)
+        except Exception as e:
+            self.root.after(0, self._add_workbook_error, e)
+    
+    def _workbook_added(self, data, workbooks):
+        """Called on the main thread once the workbook is in the store"""
+        self._loading_finished()
+        self.using_store = True
+        professors = self._use_dataset(data)
+        
+        self.excel_file_path.set(f"{len(workbooks)} workbooks ({DATASET_STORE})")
+        self.file_status.config(text=f"✓ Dataset of {len(workbooks)} workbooks loaded ({len(professors)} professors found)",
+                              foreground="green")
+        self.log_status(f"Dataset now has {len(self.data)} responses from {len(workbooks)} workbooks")
+        self.update_ui_state()
+    
+    def _add_workbook_error(self, error):
+        """Called on the main thread when the workbook could not be added"""
+        self._loading_finished()
+        self.file_status.config(text=f"✗ Error adding workbook: {str(error)}", foreground="red")
+        self.log_status(f"Error adding workbook: {str(error)}")
+        messagebox.showerror("Error", f"Failed to add Excel file:\n{str(error)}")
+        self.update_ui_state()
+    
+    def history_db(self):
+        """
+        The store that keeps report aggregates for the cycle trends, once the user has
+        imported workbooks into it; reports of a file that was only opened leave it alone
+        """
+        return DATASET_STORE if self.using_store else None
+    
+    def search_comments(self):
+        """Search the comments of all professors and semesters in the dataset store"""
+        query = self.comment_query.get().strip()
+        if not query:
+            return
+        
+        if not os.path.exists(DATASET_STORE):
+            messagebox.showinfo("Search Comments", "Add workbooks with \"Add Workbook\" to search their comments.")
+            return
+        
+        try:
+            matches = search_comments(DATASET_STORE, query, limit=500)
+        except Exception as e:
+            self.log_status(f"Error searching comments: {str(e)}")
+            messagebox.showerror("Error", f"Failed to search comments:\n{str(e)}")
+            return
+        
+        self.log_status(f"Found {len(matches)} comments matching \"{query}\"")
+        
+        # Show the matches in their own window
+        window = tk.Toplevel(self.root)
+        window.title(f"Comments matching \"{query}\" ({len(matches)})")
+        window.geometry("900x450")
+        window.columnconfigure(0, weight=1)
+        window.rowconfigure(0, weight=1)
+        
+        results = ttk.Treeview(window, columns=("professor", "semester", "section", "comment"), show='headings')
+        for column, heading, width in (("professor", "Professor", 160), ("semester", "Semester", 100),
+                                       ("section", "Section", 130), ("comment", "Comment", 500)):
+            results.heading(column, text=heading)
+            results.column(column, width=width, stretch=(column == "comment"))
+        for match in matches:
+            results.insert('', tk.END, values=(match["professor"], match["semester"] or "",
+                                               match["section"], match["comment"]))
+        results.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
+        
+        results_scrollbar = ttk.Scrollbar(window, orient="vertical", command=results.yview)
+        results_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        results.configure(yscrollcommand=results_scrollbar.set)
+    
     def update_ui_state(self):
         """Update UI elements based on current state"""
-        if self.data is not None and len(self.professors_list) > 0:
+        if self.data is not None and len(self.professors_list) > 0 and not self.loading:
             self.generate_button.config(state='normal')
         else:
             self.generate_button.config(state='disabled')
@@ -190,7 +802,16 @@ class ProfessorReportGUI:
             messagebox.showerror("Error", "Please select a professor")
             return
         
+        # Charts already rendered in the background are picked up from the render cache;
+        # the rest are rendered by the generation itself
+        self._cancel_prerender()
+        if self.prerender_after is not None:
+            self.root.after_cancel(self.prerender_after)
+            self.prerender_after = None
+        
         # Disable button and start progress
+        self.generating = True
+        self.notebook.select(0)  # Follow the progress in the status log
         self.generate_button.config(state='disabled')
         self.progress.start()
         
@@ -203,8 +824,14 @@ class ProfessorReportGUI:
         """Thread function for report generation"""
         try:
             selected = self.selected_professor.get()
+            professors = None
             
-            if selected == "All Professors":
+            if selected == SELECTED_PROFESSORS:
+                professors = sorted(self.professor_picker.selected)
+                specific_professor = None
+                total_professors = len(professors)
+                self.log_status(f"Starting generation for {total_professors} selected professors...")
+            elif selected == "All Professors":
                 self.log_status("Starting generation for all professors...")
                 specific_professor = None
                 total_professors = len([p for p in self.professors_list if p != "All Professors"])
@@ -215,61 +842,216 @@ class ProfessorReportGUI:
                 specific_professor = selected
                 total_professors = 1
             
-            # Create output directory if it doesn't exist
-            os.makedirs("output", exist_ok=True)
-            
             # Define progress callback function
             def progress_callback(message):
                 # Update UI on main thread
                 self.root.after(0, lambda: self.log_status(message))
             
-            # Generate reports with progress feedback
-            create_professor_pie_charts(self.data, specific_professor, progress_callback)
-            
-            # Move generated PDFs to Downloads folder
+            # Reports are written straight into Downloads (atomically, never overwriting
+            # existing files), so there is nothing to stage in output/ or move afterwards
             downloads_dir = Path.home() / "Downloads"
-            output_dir = Path("output")
+            os.makedirs(downloads_dir, exist_ok=True)
+            timestamp = pd.Timestamp.now().strftime('%Y%m%d_%H%M%S')
+            statistics_path = str(downloads_dir / f"statistics_{timestamp}") if self.export_statistics.get() else None
+            
+            if self.output_format.get() == OUTPUT_ROLLUP:
+                # Built from the stored aggregates of each professor where available
+                self.log_status("Writing the department and faculty summary...")
+                professor_index = self.professor_index
+                if professors is not None:
+                    professor_index = {professor: professor_index[professor] for professor in professors}
+                with reserved_download(downloads_dir, f"faculty_summary_{timestamp}.pdf") as report_path:
+                    generate_rollup_report(str(report_path), self.history_db(), data=self.data,
+                                           professor_index=professor_index, progress_callback=progress_callback)
+                self.root.after(0, self._generation_complete, [report_path.name], total_professors)
+                return
             
-            moved_files = []
-            if output_dir.exists():
-                for pdf_file in output_dir.glob("*.pdf"):
-                    target_path = downloads_dir / pdf_file.name
-                    
-                    # Handle file conflicts
-                    counter = 1
-                    original_target = target_path
-                    while target_path.exists():
-                        stem = original_target.stem
-                        suffix = original_target.suffix
-                        target_path = downloads_dir / f"{stem}_{counter}{suffix}"
-                        counter += 1
-                    
-                    shutil.move(str(pdf_file), str(target_path))
-                    moved_files.append(target_path.name)
-                    self.root.after(0, lambda f=pdf_file.name: self.log_status(f"✓ Moved {f} to Downloads folder"))
+            if self.output_format.get() == OUTPUT_HTML:
+                # Charts are inline SVG, so the site is one folder of pages without chart files
+                site_dir = downloads_dir / f"professor_reports_{timestamp}_html"
+                self.log_status(f"Writing HTML pages into: {site_dir.name}")
+                pages = generate_html_site(self.data, str(site_dir), specific_professor, progress_callback,
+                                           professor_index=self.professor_index, professors=professors,
+                                           sections=SECTION_PRESETS[self.report_sections.get()], history_db=self.history_db())
+                self.root.after(0, self._generation_complete, [f"{site_dir.name}/index.html"] if pages else [],
+                                total_professors, len(pages))
+                return
             
-            # Clean up
-            cleanup_temp_folder()
+            if self.output_format.get() == OUTPUT_ARCHIVE:
+                with reserved_download(downloads_dir, f"professor_reports_{timestamp}.zip") as archive_path:
+                    self.log_status(f"Writing reports into archive: {archive_path.name}")
+                    reports = create_professor_pie_charts(self.data, specific_professor, progress_callback,
+                                                          archive_path=str(archive_path), professor_index=self.professor_index,
+                                                          statistics_path=statistics_path, professors=professors,
+                                                          **self._batch_options(total_professors == 1))
+                
+                saved_files = [archive_path.name]
+                if not reports:
+                    archive_path.unlink(missing_ok=True)
+                    saved_files = []
+                
+                self.root.after(0, self._generation_complete, saved_files, total_professors, len(reports))
+                return
+            
+            # Generate reports with progress feedback
+            if specific_professor is None and self.output_format.get() == OUTPUT_COMBINED:
+                self.log_status("Writing all professors into one combined PDF...")
+                with reserved_download(downloads_dir, f"faculty_report_{timestamp}.pdf") as report_path:
+                    generate_faculty_pdf(self.data, str(report_path), progress_callback,
+                                         professor_index=self.professor_index, history_db=self.history_db(),
+                                         sections=SECTION_PRESETS[self.report_sections.get()], render_cache=RENDER_CACHE,
+                                         statistics_path=statistics_path, professors=professors)
+                saved_files = [report_path.name]
+            else:
+                reports = create_professor_pie_charts(self.data, specific_professor, progress_callback,
+                                                      output_dir=str(downloads_dir), overwrite=False,
+                                                      professor_index=self.professor_index, statistics_path=statistics_path,
+                                                      professors=professors, **self._batch_options(total_professors == 1))
+                saved_files = [os.path.basename(report) for report in reports]
+            
+            for saved_file in saved_files:
+                self.root.after(0, lambda f=saved_file: self.log_status(f"✓ Saved {f} to Downloads folder"))
             
             # Update UI on main thread
-            self.root.after(0, self._generation_complete, moved_files, total_professors)
+            self.root.after(0, self._generation_complete, saved_files, total_professors)
             
         except Exception as e:
             self.root.after(0, self._generation_error, str(e))
     
-    def _generation_complete(self, moved_files, total_professors):
+    def _batch_options(self, single_report):
+        """Worker, history, section and cache settings for a generation run (a single report renders its charts in parallel)"""
+        sections = SECTION_PRESETS[self.report_sections.get()]
+        if single_report:
+            options = {"history_db": self.history_db(), "sections": sections, "render_cache": RENDER_CACHE}
+            if CHART_WORKERS > 1:
+                options["chart_workers"] = CHART_WORKERS
+            return options
+        return {
+            "history_db": self.history_db(),
+            "sections": sections,
+            "render_cache": RENDER_CACHE,
+            "workers": BATCH_WORKERS,
+            "max_reports_per_worker": REPORTS_PER_WORKER,
+            "max_worker_rss_mb": WORKER_MEMORY_CAP_MB,
+        }
+    
+    def _schedule_preview(self):
+        """Preview the selected professor's report once the selection settles"""
+        self.preview_generation += 1
+        if self.preview_after is not None:
+            self.root.after_cancel(self.preview_after)
+            self.preview_after = None
+        
+        professor = self.selected_professor.get()
+        if self.data is None or self.loading:
+            return
+        if professor not in (self.professor_index or {}):
+            self.preview.clear("Select a single professor to preview their report")
+            return
+        self.preview_after = self.root.after(PREVIEW_DELAY_MS, self._start_preview)
+    
+    def _start_preview(self):
+        self.preview_after = None
+        thread = threading.Thread(target=self._preview_thread, daemon=True,
+                                  args=(self.preview_generation, self.data, self.professor_index,
+                                        self.selected_professor.get(), SECTION_PRESETS[self.report_sections.get()],
+                                        self.history_db()))
+        thread.start()
+    
+    def _preview_thread(self, generation, data, professor_index, professor, sections, history_db):
+        """Thread function computing the aggregates and chart plan of the preview"""
+        started = time.perf_counter()
+        try:
+            aggregates = professor_report_aggregates(data, professor, professor_index, sections, history_db)
+            chart_jobs = plan_report_charts(aggregates, sections) if aggregates is not None else []
+        except Exception as e:
+            self.root.after(0, self._preview_ready, generation, None, [], f"✗ Could not preview {professor}: {e}")
+            return
+        self.root.after(0, self._preview_ready, generation, aggregates, chart_jobs, time.perf_counter() - started)
+    
+    def _preview_ready(self, generation, aggregates, chart_jobs, result):
+        if generation != self.preview_generation:
+            return  # The selection changed in the meantime
+        if aggregates is None:
+            self.preview.clear(result if isinstance(result, str) else "⚠ No responses for this professor")
+            return
+        self.preview.show(aggregates, chart_jobs, result)
+    
+    def _schedule_prerender(self):
+        """
+        Start rendering the selected professor's charts into the render cache once the
+        selection settles, so Generate mostly assembles finished charts. Changing the
+        selection (or the sections) cancels the charts that have not started yet.
+        """
+        self._cancel_prerender()
+        if self.prerender_after is not None:
+            self.root.after_cancel(self.prerender_after)
+            self.prerender_after = None
+        
+        professor = self.selected_professor.get()
+        if self.data is None or self.loading or self.generating or professor not in (self.professor_index or {}):
+            return
+        self.prerender_after = self.root.after(PRERENDER_DELAY_MS, self._start_prerender)
+    
+    def _start_prerender(self):
+        self.prerender_after = None
+        if self.generating:
+            return  # Never compete with a running generation
+        generation = self.prerender_generation
+        if self.prerender_pool is None:
+            # One low-priority process, so the speculative work never slows down the window
+            self.prerender_pool = create_chart_pool(1, low_priority=True)
+        
+        thread = threading.Thread(target=self._prerender_thread, daemon=True,
+                                  args=(generation, self.data, self.professor_index, self.selected_professor.get(),
+                                        SECTION_PRESETS[self.report_sections.get()], self.history_db()))
+        thread.start()
+    
+    def _prerender_thread(self, generation, data, professor_index, professor, sections, history_db):
+        """Thread function computing the aggregates and submitting the charts"""
+        try:
+            charts = prerender_professor_charts(data, professor, professor_index, self.prerender_pool, RENDER_CACHE,
+                                                sections=sections, history_db=history_db)
+        except Exception as e:
+            # Only a head start: the report itself will render (and report) the charts
+            print(f"⚠ Could not prepare the charts of {professor}: {e}")
+            return
+        self.root.after(0, self._prerender_submitted, generation, charts)
+    
+    def _prerender_submitted(self, generation, charts):
+        if generation != self.prerender_generation:
+            # The selection changed in the meantime
+            for chart in charts.values():
+                if hasattr(chart, "cancel"):
+                    chart.cancel()
+            return
+        self.prerender_charts = charts
+    
+    def _cancel_prerender(self):
+        """Drop the speculative charts that have not started rendering"""
+        self.prerender_generation += 1
+        for chart in self.prerender_charts.values():
+            if hasattr(chart, "cancel"):
+                chart.cancel()
+        self.prerender_charts = {}
+    
+    def _generation_complete(self, moved_files, total_professors, report_count=None):
         """Called when generation is complete"""
+        self.generating = False
         self.progress.stop()
         self.generate_button.config(state='normal')
         
+        if report_count is None:
+            report_count = len(moved_files)
+        
         if moved_files:
-            self.log_status(f"\n✓ SUCCESS! Generated {len(moved_files)} PDF report(s)")
+            self.log_status(f"\n✓ SUCCESS! Generated {report_count} PDF report(s)")
             self.log_status(f"Files saved to Downloads folder:")
             for file in moved_files:
                 self.log_status(f"  - {file}")
             
             messagebox.showinfo("Success", 
-                              f"Successfully generated {len(moved_files)} PDF report(s)!\n\n"
+                              f"Successfully generated {report_count} PDF report(s)!\n\n"
                               f"Files saved to your Downloads folder:\n" + 
                               "\n".join([f"• {file}" for file in moved_files[:5]]) +
                               (f"\n... and {len(moved_files)-5} more" if len(moved_files) > 5 else ""))
@@ -279,6 +1061,7 @@ class ProfessorReportGUI:
     
     def _generation_error(self, error_message):
         """Called when generation encounters an error"""
+        self.generating = False
         self.progress.stop()
         self.generate_button.config(state='normal')
         
@@ -290,12 +1073,15 @@ def main():
     # Create necessary directories
     os.makedirs("temp", exist_ok=True)
     os.makedirs("assets", exist_ok=True)
-    os.makedirs("output", exist_ok=True)
     
     # Create and run GUI
     root = tk.Tk()
     app = ProfessorReportGUI(root)
     root.mainloop()
+    
+    # Speculative charts still queued are not needed anymore
+    if app.prerender_pool is not None:
+        app.prerender_pool.shutdown(wait=False, cancel_futures=True)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,296 @@
+"""
+HTML version of the professor reports, for looking at results in a browser.
+
+A page has the same sections as the PDF report (see REPORT_SECTIONS in main.py)
+and is built from the same aggregates, but its charts are rendered as SVG straight
+into the page, so nothing is rasterized and no chart file is ever written. A whole
+faculty is written as a static site: one page per professor and an index page
+linking them, which can be opened from disk or served by any web server.
+"""
+import io
+import os
+import shutil
+from html import escape
+from urllib.parse import quote
+import matplotlib
+import pandas as pd
+
+from main import (resolve_sections, section_inputs, plan_report_charts, resolve_report_columns,
+                  resolve_question_texts, compute_professor_aggregates, attach_question_rankings,
+                  attach_cycle_history, compute_question_rankings, question_means_matrix,
+                  build_professor_index, professor_rows, is_sorted_by_professor, sort_by_professor,
+                  sanitize_filename, atomic_write, DISTRIBUTION_PAGES, REPORT_SECTIONS)
+
+LOGO_PATH = "assets/LOGO-ULBS_orizontal.png"
+
+STYLE = """
+body { font-family: Arial, "DejaVu Sans", sans-serif; margin: 0 auto; max-width: 960px; padding: 24px; color: #222; }
+section { border-top: 1px solid #ddd; padding: 16px 0; }
+h1 { margin-bottom: 4px; }
+.figures { list-style: none; padding: 0; }
+.chart svg { max-width: 100%; height: auto; }
+table { border-collapse: collapse; }
+td, th { padding: 4px 10px; border-bottom: 1px solid #eee; text-align: left; }
+.comment { margin: 6px 0; }
+.muted { color: #888; }
+nav a { margin-right: 8px; }
+"""
+
+
+def render_svg_charts(aggregates, sections=None):
+    """
+    Render the charts of the selected sections as SVG markup, {key: svg}
+    """
+    charts = {}
+    for key, render, kwargs in plan_report_charts(aggregates, sections):
+        buffer = io.StringIO()
+        # Text stays text instead of glyph outlines, which halves the size of a page
+        with matplotlib.rc_context({"svg.fonttype": "none"}):
+            render(output=buffer, **kwargs)
+        svg = buffer.getvalue()
+        # Drop the XML prolog; the markup is embedded in the page
+        charts[key] = svg[svg.find("<svg"):]
+    return charts
+
+
+def _figures(*items):
+    return "<ul class=\"figures\">" + "".join(f"<li>{escape(str(item))}</li>" for item in items) + "</ul>"
+
+
+def _chart(charts, key):
+    return f"<div class=\"chart\">{charts[key]}</div>" if key in charts else ""
+
+
+def _breakdown(counts, responses, total, unit):
+    rows = "".join(f"<tr><td>{escape(str(label))}</td><td>{count} {unit}</td>"
+                   f"<td>{count / responses * 100:.1f}% of responses</td><td>{count / total * 100:.1f}% of total</td></tr>"
+                   for label, count in counts.items())
+    return f"<table>{rows}</table>"
+
+
+def _html_completion_trends(aggregates, charts):
+    trend = aggregates["trend"]
+    if trend["status"] != "ok":
+        messages = {"no_valid_dates": "No valid timestamp data found for this professor",
+                    "no_timestamps": "No timestamp data available for this professor"}
+        return f"<p>{messages.get(trend['status'], 'Timestamp column not found in data')}</p>"
+    daily = trend["daily_counts"]
+    return "<h2>Completion Trends</h2>" + _chart(charts, "completion_trends") + _figures(
+        f"Peak completion day: {daily.idxmax().strftime('%d %B')} ({daily.max()} completions)",
+        f"Average daily completions: {int(round(daily.mean()))}",
+        f"Total days with responses: {len(daily)}",
+        f"Data range: {daily.index.min().strftime('%d %B')} to {daily.index.max().strftime('%d %B')}")
+
+
+def _html_specialization(aggregates, charts):
+    spec_counts = aggregates["spec_counts"]
+    total = aggregates["total_students"]
+    return ("<h2>Student Specializations</h2>"
+            + _figures(f"Total Students: {total}", f"Number of Different Specializations: {len(spec_counts)}")
+            + _breakdown(spec_counts, total, total, "students") + _chart(charts, "specialization"))
+
+
+def _html_distribution(aggregates, charts, page):
+    key, counts_key, responses_key, title, responses_label, _, unit = page
+    responses = aggregates[responses_key]
+    if not responses:
+        return ""
+    total = aggregates["total_responses"]
+    return (f"<h2>{title}</h2>"
+            + _figures(f"Total Students for Professor: {total}", f"{responses_label}: {responses}",
+                       f"Students with No Response: {total - responses}",
+                       f"Response Rate: {responses / total * 100:.1f}%")
+            + _breakdown(aggregates[counts_key], responses, total, unit) + _chart(charts, key))
+
+
+def _html_teaching_methods(aggregates, charts):
+    method_counts = aggregates["method_counts"]
+    if method_counts is None:
+        return ""
+    total = aggregates["total_responses"]
+    rows = "".join(f"<tr><td>{escape(name)}</td><td>{count} students</td>"
+                   f"<td>{(count / total * 100) if total else 0:.1f}%</td></tr>" for name, count in method_counts.items())
+    return ("<h2>Teaching Methods</h2>"
+            + _figures(f"Total Student Responses: {total}",
+                       f"Number of Teaching Methods Analyzed: {aggregates['teaching_method_columns']}",
+                       f"Total Method Implementations: {sum(method_counts.values())}")
+            + f"<table>{rows}</table>" + _chart(charts, "teaching_methods"))
+
+
+def _html_questions(aggregates, charts):
+    total = aggregates["total_responses"]
+    if total == 0:
+        return ""
+    parts = []
+    for question in aggregates["questions"]:
+        number = question["number"]
+        heading = f"<h2 id=\"question_{number}\">Question {number}</h2><p>{escape(question['text'])}</p>"
+        if question["status"] != "ok":
+            parts.append(heading + "<p class=\"muted\">No valid responses found for this question.</p>")
+            continue
+        responses = question["responses"]
+        figures = [f"Students who Responded: {responses} of {total}",
+                   f"Response Rate: {responses / total * 100:.1f}%",
+                   f"Average Score: {question['average']:.2f}/10"]
+        ranking = question.get("ranking")
+        if ranking is not None:
+            figures.append(f"Faculty rank: {ranking['faculty_rank']} of {ranking['faculty_count']} "
+                           f"(percentile {ranking['faculty_percentile']:.0f})")
+            if "department_rank" in ranking:
+                figures.append(f"Department rank: {ranking['department_rank']} of {ranking['department_count']} "
+                               f"(percentile {ranking['department_percentile']:.0f})")
+        rows = "".join(f"<tr><td>Grade {grade}</td><td>{count} students</td><td>{count / responses * 100:.1f}%</td>"
+                       f"<td>cumulative {cumulative:.1f}%</td></tr>"
+                       for (grade, count), cumulative in zip(question["sorted_grades"], question["cumulative_percentages"]))
+        parts.append(heading + _figures(*figures) + f"<table>{rows}</table>" + _chart(charts, f"question_{number}"))
+    return "".join(parts)
+
+
+def _html_cycle_trends(aggregates, charts):
+    history = aggregates.get("history") or []
+    if len(history) < 2:
+        return ""
+    items = []
+    for item in history:
+        averages = [question["average"] for question in item["questions"] if question["average"] is not None]
+        overall = f"{sum(averages) / len(averages):.2f}/10" if averages else "n/a"
+        items.append(f"{item['cycle']}: {item['total_students']} students, average score {overall}")
+    return "<h2>Trends Across Evaluation Cycles</h2>" + _figures(*items) + _chart(charts, "question_trends")
+
+
+def _html_comments(aggregates, charts):
+    total = aggregates["total_responses"]
+    if total == 0:
+        return ""
+    parts = []
+    for section in aggregates["comment_sections"]:
+        comments = section["comments"]
+        body = "".join(f"<p class=\"comment\">• {escape(comment)}</p>" for comment in comments) \
+            or "<p class=\"muted\">No comments provided by students for this section.</p>"
+        parts.append(f"<h2>{escape(section['title'])}</h2>"
+                     + _figures(f"Students with Comments: {len(comments)} of {total}",
+                                f"Comment Rate: {len(comments) / total * 100:.1f}%")
+                     + body)
+    return "".join(parts)
+
+
+# The HTML counterpart of every registered report section
+HTML_SECTIONS = {
+    "trends": _html_completion_trends,
+    "specialization": _html_specialization,
+    "teaching_methods": _html_teaching_methods,
+    "questions": _html_questions,
+    "cycle_trends": _html_cycle_trends,
+    "comments": _html_comments,
+}
+for _page in DISTRIBUTION_PAGES:
+    HTML_SECTIONS[_page[0]] = lambda aggregates, charts, page=_page: _html_distribution(aggregates, charts, page)
+
+
+def render_professor_html(aggregates, sections=None, logo=None):
+    """
+    The HTML page of one report: the title, then every selected section in page
+    order with its charts inline. logo is the (relative) URL of the logo image.
+    """
+    charts = render_svg_charts(aggregates, sections)
+    professor = escape(str(aggregates["professor"]))
+    parts = ["<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\">",
+             f"<title>Performance Evaluation Report - {professor}</title><style>{STYLE}</style></head><body>",
+             "<nav><a href=\"index.html\">All professors</a></nav>"]
+    if logo:
+        parts.append(f"<img src=\"{escape(logo)}\" alt=\"\" width=\"300\">")
+    parts.append(f"<h1>Performance Evaluation Report</h1><h2>Professor: {professor}</h2>"
+                 f"<p>Total Students who Completed the Form: {aggregates['total_students']}</p>")
+    for name in REPORT_SECTIONS:
+        if (sections is None or name in sections) and name in HTML_SECTIONS:
+            content = HTML_SECTIONS[name](aggregates, charts)
+            if content:
+                parts.append(f"<section id=\"{name}\">{content}</section>")
+    parts.append(f"<p class=\"muted\">Generated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}</p></body></html>")
+    return "".join(parts)
+
+
+def _index_html(entries):
+    rows = "".join(f"<tr><td><a href=\"{escape(quote(entry['file']))}\">{escape(entry['professor'])}</a></td>"
+                   f"<td>{escape(entry['department'] or '')}</td><td>{entry['total_students']}</td>"
+                   f"<td>{entry['average']}</td></tr>" for entry in entries)
+    return (f"<!DOCTYPE html><html lang=\"en\"><head><meta charset=\"utf-8\"><title>Professor Evaluation Reports</title>"
+            f"<style>{STYLE}</style></head><body><h1>Professor Evaluation Reports</h1>"
+            f"<p>{len(entries)} professors. Generated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}</p>"
+            f"<table><tr><th>Professor</th><th>Department</th><th>Students</th><th>Average Score</th></tr>{rows}</table>"
+            f"</body></html>")
+
+
+def generate_html_site(data, output_dir, specific_professor=None, progress_callback=None, professor_index=None,
+                       sections=None, history_db=None, cycle=None, professors=None):
+    """
+    Write report_<name>.html for every professor (or only specific_professor, or
+    the list professors) and an index.html linking them to output_dir. sections works as for the PDF reports;
+    with history_db the stored cycles are shown (nothing is saved). Returns the paths
+    of the professor pages.
+    """
+    def report_progress(message):
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+
+    sections = resolve_sections(sections)
+    inputs = section_inputs(sections, history=bool(history_db))
+    if professor_index is None:
+        if not is_sorted_by_professor(data):
+            data = sort_by_professor(data)
+        professor_index = build_professor_index(data)
+    if specific_professor:
+        professors = [specific_professor]
+    requested = set(professor_index if professors is None else professors)
+    professors = [professor for professor in professor_index if professor in requested]
+
+    columns = resolve_report_columns(data)
+    question_texts = resolve_question_texts(data, columns["questions"])
+    rankings = None
+    if sections is None or "questions" in sections:
+        rankings = compute_question_rankings(*question_means_matrix(data, columns))
+    specialization_col = columns["specialization"]
+
+    os.makedirs(output_dir, exist_ok=True)
+    logo = None
+    if os.path.exists(LOGO_PATH):
+        shutil.copyfile(LOGO_PATH, os.path.join(output_dir, "logo.png"))
+        logo = "logo.png"
+
+    pages = []
+    entries = []
+    for i, professor in enumerate(professors):
+        report_progress(f"Processing professor {i+1}/{len(professors)}: {professor}")
+        try:
+            prof_data = professor_rows(data, professor_index, professor)
+            spec_counts = prof_data[specialization_col].value_counts()
+            if len(spec_counts) == 0:
+                report_progress(f"⚠ No data found for professor: {professor}")
+                continue
+            aggregates = compute_professor_aggregates(professor, prof_data, columns, question_texts, spec_counts, inputs)
+            attach_question_rankings(aggregates, rankings)
+            if history_db:
+                attach_cycle_history(aggregates, prof_data, columns, history_db, cycle)
+
+            file_name = f"report_{sanitize_filename(professor)}.html"
+            path = os.path.join(output_dir, file_name)
+            with atomic_write(path) as tmp_path:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    f.write(render_professor_html(aggregates, sections, logo))
+            pages.append(path)
+
+            averages = [question["average"] for question in aggregates.get("questions", [])
+                        if question.get("average") is not None]
+            entries.append({"professor": str(professor), "file": file_name, "department": aggregates.get("department"),
+                            "total_students": aggregates["total_students"],
+                            "average": f"{sum(averages) / len(averages):.2f}" if averages else "n/a"})
+        except Exception as e:
+            # Continue with next professor instead of crashing
+            report_progress(f"✗ Error processing professor {professor}: {str(e)}")
+
+    with atomic_write(os.path.join(output_dir, "index.html")) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(_index_html(entries))
+    report_progress(f"✓ Wrote HTML reports of {len(pages)} professors: {os.path.join(output_dir, 'index.html')}")
+    return pages
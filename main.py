@@ -1,121 +1,910 @@
 import pandas as pd
-import matplotlib.pyplot as plt
+import numpy as np
 import matplotlib
 matplotlib.use('Agg')  # Use non-interactive backend to save memory
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.ticker import MaxNLocator
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import letter
 from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfbase.ttfonts import TTFont
 from reportlab.lib.fonts import addMapping
 from PIL import Image
+import openpyxl
+from pandas.io.parsers import TextParser
 import os
+import io
+import json
 import shutil
+import zipfile
+import tempfile
+import zlib
+import time
+import hashlib
+import argparse
 import gc  # For garbage collection
+import itertools
+import functools
+import threading
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from worker_pool import run_in_recycled_workers
+from pipeline import Stage, run_pipeline
+from shared_dataset import SharedDataset, export_shared_dataset, remove_shared_dataset
+from validation import WorkbookValidationError, validate_workbook, format_validation_report
+from stats_export import report_statistics, statistics_files, write_statistics
+from text_layout import TextLayout, paginate, draw_text_blocks
+from streaming_canvas import StreamingCanvas
+from aggregate_store import infer_semesters, summarize_aggregates, save_summaries, load_history, merge_history
+
+# Threads per stage of the report pipeline (see create_professor_pie_charts)
+DEFAULT_STAGE_WORKERS = {"aggregate": 1, "render": 1, "assemble": 1, "commit": 1}
 
 # Placeholder for reading Excel data
 def read_excel(file_path):
     data = pd.read_excel(file_path)
     
     # Sort data alphabetically by the "Level 2" column (professor names)
-    data = data.sort_values(by='Level 2', ascending=True)
-    
-    # Reset index after sorting
-    data = data.reset_index(drop=True)
+    data = sort_by_professor(data)
     
     # Create temp directory if it doesn't exist
     os.makedirs("temp", exist_ok=True)
     return data
 
+# Function to read a workbook in one pass, reporting its professors while it is read
+def read_excel_streaming(file_path, on_rows=None, batch_rows=2000):
+    """
+    Read a workbook like read_excel does, straight from file_path (no copy).
+    
+    .xlsx files are read row by row, and every batch_rows rows on_rows(rows_read,
+    new_professors) is called with the "Level 2" names not seen before, so a caller
+    can list professors long before the whole sheet is parsed. The rows are then
+    parsed into a table by the same parser read_excel uses. Other formats are read
+    with read_excel and reported once at the end.
+    """
+    if not str(file_path).lower().endswith(('.xlsx', '.xlsm')):
+        data = read_excel(file_path)
+        if on_rows:
+            on_rows(len(data), sorted(data['Level 2'].dropna().astype(str).unique()))
+        return data
+    
+    workbook = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
+    try:
+        sheet = workbook.worksheets[0]
+        sheet.reset_dimensions()  # Some exporters write wrong sheet dimensions
+        rows = [list(row) for row in itertools.islice(sheet.iter_rows(values_only=True), 1)]
+        level2 = rows[0].index('Level 2') if rows and 'Level 2' in rows[0] else None
+        seen = set()
+        new_names = []
+        for row in sheet.iter_rows(min_row=2, values_only=True):
+            rows.append(list(row))
+            if level2 is not None and level2 < len(row) and row[level2] is not None and row[level2] not in seen:
+                seen.add(row[level2])
+                new_names.append(str(row[level2]))
+            if on_rows and len(rows) % batch_rows == 0:
+                on_rows(len(rows) - 1, sorted(new_names))
+                new_names = []
+    finally:
+        workbook.close()
+    
+    # Trailing empty rows are not part of the table (as with read_excel)
+    while len(rows) > 1 and all(value is None for value in rows[-1]):
+        rows.pop()
+    if on_rows:
+        on_rows(len(rows) - 1, sorted(new_names))
+    data = TextParser(rows, header=0).read()
+    
+    # Sort like read_excel does
+    data = sort_by_professor(data)
+    os.makedirs("temp", exist_ok=True)
+    return data
+
+def sort_by_professor(data):
+    """
+    Sort rows alphabetically by professor ("Level 2"), rows without a professor last
+    """
+    data = data.sort_values(by='Level 2', ascending=True)
+    
+    # Reset index after sorting
+    return data.reset_index(drop=True)
+
+def is_sorted_by_professor(data):
+    """
+    Check that rows are grouped the way sort_by_professor leaves them
+    """
+    names = data['Level 2']
+    valid = names.notna().to_numpy()
+    n_valid = int(valid.sum())
+    # All named rows first, then the rows without a professor
+    if not valid[:n_valid].all():
+        return False
+    return names.iloc[:n_valid].is_monotonic_increasing
+
+# Function to index the rows of each professor in data sorted by sort_by_professor
+def build_professor_index(data):
+    """
+    Map each professor to the (start, stop) range of their rows.
+    
+    The data must be sorted by "Level 2" (read_excel does this), so every professor's
+    rows are contiguous. The ranges are found from the run lengths of the sorted column,
+    and professor_rows turns them into slices without copying the rows.
+    The index is ordered alphabetically, like the professor list in the GUI.
+    """
+    if not is_sorted_by_professor(data):
+        raise ValueError("Data must be sorted by 'Level 2' before it can be indexed (use read_excel)")
+    
+    names = data['Level 2'].to_numpy()
+    n_valid = int(data['Level 2'].notna().sum())
+    if n_valid == 0:
+        return {}
+    names = names[:n_valid]
+    
+    # Positions where the professor name changes mark the start of a new run
+    boundaries = np.flatnonzero(names[1:] != names[:-1]) + 1
+    starts = np.concatenate(([0], boundaries))
+    stops = np.concatenate((boundaries, [n_valid]))
+    return {names[start]: (int(start), int(stop)) for start, stop in zip(starts, stops)}
+
+def professor_rows(data, professor_index, professor):
+    """
+    Return the rows of one professor as a slice of data (no copy is made).
+    data may also be a SharedDataset, which builds just these rows from its mapped files.
+    """
+    start, stop = professor_index[professor]
+    if isinstance(data, SharedDataset):
+        return data.rows(start, stop)
+    return data.iloc[start:stop]
+
 # Function to create pie charts for each professor showing specialization distribution
-def create_professor_pie_charts(data, specific_professor=None, progress_callback=None):
+def create_professor_pie_charts(data, specific_professor=None, progress_callback=None, archive_path=None,
+                                output_dir="output", overwrite=True, shard=None,
+                                workers=None, max_reports_per_worker=None, max_worker_rss_mb=None,
+                                professor_index=None, chart_workers=None, stage_workers=None, queue_size=2,
+                                history_db=None, cycle=None, sections=None, render_cache=None,
+                                statistics_path=None, professors=None):
+    """
+    Generate the report of one professor (or of all professors, or of the given
+    list of professors) and return the paths of the reports that were written.
+    
+    By default each report is saved as <output_dir>/report_<name>.pdf. Reports are
+    written to a temporary file in the destination folder and renamed into place
+    once complete, and with overwrite=False an existing file is never replaced
+    (a numbered name is used instead). When archive_path is given, every finished
+    report is written straight into that ZIP archive instead, together with a
+    manifest.json describing each report.
+    
+    Charts are rendered into a private workspace for this run, so several runs
+    can safely execute at the same time.
+    
+    shard=(i, n) restricts the run to shard i of n (1-based): only professors whose
+    name hashes to that shard are processed, so n machines can split one workbook
+    without overlap. A shard run also writes shard_<i>_of_<n>_manifest.json next to
+    its output, which merge_shard_manifests uses to detect missing reports.
+    
+    With workers=N the reports are rendered in N separate processes. Each worker is
+    replaced by a fresh one after max_reports_per_worker reports or once it uses more
+    than max_worker_rss_mb of memory, and a report that pushes a worker past that cap
+    is retried once in a fresh worker. This keeps memory bounded on long runs.
+    
+    professor_index is the result of build_professor_index(data); pass it when it
+    was already built at load time, otherwise it is built here.
+    
+    Without workers, reports go through a pipeline of aggregation, chart rendering,
+    PDF assembly and output commit stages that overlap across professors.
+    stage_workers (e.g. {"render": 2}) sets the threads of each stage and queue_size
+    how many reports may wait between two stages. chart_workers=N renders the charts
+    in N processes; it only applies without workers, which are already parallel.
+    
+    With history_db, each report's aggregates are saved in that database under
+    its evaluation cycle (cycle, or inferred from the response timestamps), and
+    reports get a section comparing the question averages of the stored cycles.
+    
+    sections (names or groups, see resolve_sections) limits the reports to those
+    sections; only the aggregates and charts they use are computed.
+    
+    With a render_cache folder, every chart is kept there under the hash of its
+    inputs, and a later run only renders the charts whose inputs changed (see
+    render_section_charts).
+    
+    With statistics_path (a path prefix such as output/statistics), the numbers of
+    every report are also exported as JSON and CSV/Parquet tables (see
+    stats_export.py); in archive mode the files are added to the archive instead.
+    """
+    sections = resolve_sections(sections)
+    prune_render_cache(render_cache)
+    
     # Find the column immediately before "Level 2" (specializations)
     level2_index = data.columns.get_loc('Level 2')
     specialization_col = data.columns[level2_index - 1]
     
-    # Get unique professors
-    all_professors = data['Level 2'].unique()
+    # Get unique professors (in alphabetical order, without NaN names)
+    if professor_index is None:
+        if not is_sorted_by_professor(data):
+            data = sort_by_professor(data)
+        professor_index = build_professor_index(data)
     
     # Filter professors based on input
     if specific_professor:
-        if specific_professor in all_professors:
+        if specific_professor in professor_index:
             professors = [specific_professor]
         else:
-            return
+            return []
+    elif professors is not None:
+        # Exactly the requested professors, as one batch in alphabetical order
+        requested = set(professors)
+        professors = [prof for prof in professor_index if prof in requested]
+    else:
+        professors = list(professor_index)
+    
+    if shard is not None:
+        shard_index, shard_count = shard
+        if not 1 <= shard_index <= shard_count:
+            raise ValueError(f"Invalid shard {shard_index} of {shard_count}")
+        professors = [prof for prof in professors if professor_shard(prof, shard_count) == shard_index]
+        print(f"Shard {shard_index}/{shard_count}: {len(professors)} professors assigned")
+    
+    def report_progress(message):
+        # Update progress if callback is provided
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+    
+    generated_reports = []
+    report_status = []  # One entry per professor, used for the shard manifest
+    cached_charts = [0, 0]  # Charts reused from the render cache, charts of the reports
+    statistics = []
+    
+    # Rank every professor's question averages once, before any report is generated
+    rankings = None
+    if sections is None or "questions" in sections:
+        rankings = compute_question_rankings(*question_means_matrix(data, resolve_report_columns(data)))
+    
+    # Settings shared by every report of this run (sent once to each worker process)
+    job = {
+        "specialization_col": specialization_col,
+        "output_dir": output_dir,
+        "overwrite": overwrite,
+        "in_memory": archive_path is not None,
+        "professor_index": professor_index,
+        "chart_workers": None if workers else chart_workers,
+        "stage_workers": stage_workers,
+        "queue_size": queue_size,
+        "history_db": history_db,
+        "cycle": cycle,
+        "rankings": rankings,
+        "sections": sections,
+        "render_cache": render_cache,
+        "export_statistics": statistics_path is not None,
+    }
+    
+    # Open the archive once; reports are appended to it as they are finished
+    archive = None
+    manifest = []
+    if archive_path:
+        archive_tmp_path = temporary_path_for(archive_path)
+        archive = zipfile.ZipFile(archive_tmp_path, 'w', zipfile.ZIP_DEFLATED)
+    
+    shared_dataset_dir = None
+    try:
+        if workers:
+            # Workers map the table from disk instead of each receiving a pickled copy
+            shared_dataset_dir = os.path.abspath(export_shared_dataset(data))
+            results = run_in_recycled_workers(
+                _generate_report_task, professors,
+                worker_init=_init_report_worker, init_args=(shared_dataset_dir, job), worker_exit=_close_report_worker,
+                workers=workers, max_tasks_per_worker=max_reports_per_worker, max_rss_mb=max_worker_rss_mb,
+                progress_callback=report_progress)
+        else:
+            results = _generate_reports_in_pipeline(data, professors, job, report_progress)
+        
+        for done, (professor, result, error) in enumerate(results, start=1):
+            if error is not None:
+                report_status.append({"professor": str(professor), "status": "error", "error": error})
+                # Continue with next professor instead of crashing
+                report_progress(f"✗ Error processing professor {professor}: {error}")
+            
+            elif result["status"] == "generated":
+                if archive is not None:
+                    report_name = unique_archive_name(archive, f"report_{sanitize_filename(professor)}.pdf")
+                    archive.writestr(report_name, result["pdf_bytes"])
+                    manifest.append(dict(result["manifest_entry"], file=report_name))
+                else:
+                    report_name = result["report"]
+                generated_reports.append(report_name)
+                if result.get("summaries"):
+                    save_summaries(history_db, result["summaries"])
+                if result.get("statistics") is not None:
+                    statistics.append(result["statistics"])
+                reused = result.get("reused_charts") or {}
+                cached_charts[0] += sum(reused.values())
+                cached_charts[1] += len(reused)
+                report_status.append({"professor": str(professor), "status": "generated",
+                                      "report": os.path.basename(report_name),
+                                      "total_students": result["total_students"]})
+                suffix = f" ({done}/{len(professors)})" if workers else ""
+                report_progress(f"✓ Successfully generated report for {professor}{suffix}")
+            
+            else:
+                report_status.append({"professor": str(professor), "status": "no_data"})
+                report_progress(f"⚠ No data found for professor: {professor}")
+        
+        if statistics_path is not None:
+            if archive is not None:
+                for name, content in statistics_files(statistics, os.path.basename(statistics_path)).items():
+                    archive.writestr(name, content)
+            else:
+                write_statistics(statistics_path, statistics, progress_callback)
+        
+        if archive is not None:
+            archive.writestr("manifest.json", json.dumps({
+                "generated_at": pd.Timestamp.now().isoformat(timespec='seconds'),
+                "report_count": len(manifest),
+                "reports": manifest,
+            }, ensure_ascii=False, indent=2))
+            archive.close()
+            archive = None
+            os.replace(archive_tmp_path, archive_path)
+        
+        if shard is not None:
+            manifest_dir = os.path.dirname(archive_path) if archive_path else output_dir
+            write_shard_manifest(manifest_dir, shard, data, report_status, archive_path)
+    
+    finally:
+        # Never leave a half-written archive behind
+        if archive is not None:
+            archive.close()
+            os.unlink(archive_tmp_path)
+        if shared_dataset_dir is not None:
+            remove_shared_dataset(shared_dataset_dir)
+    
+    if render_cache is not None:
+        report_progress(f"✓ Reused {cached_charts[0]} of {cached_charts[1]} charts from the render cache")
+    report_progress(f"✓ Completed processing {len(professors)} professors")
+    return generated_reports
+
+
+def _generate_reports_in_pipeline(data, professors, job, report_progress):
+    """
+    Generate the reports in the current process as a staged pipeline, yielding
+    (professor, result, error) like the worker pool does.
+    
+    aggregation -> chart rendering -> PDF assembly -> output commit run in their
+    own threads, connected by bounded queues, so one professor's PDF is written
+    while the next one's charts render. A slow stage blocks the earlier ones,
+    which keeps the number of reports in memory constant.
+    """
+    stage_workers = dict(DEFAULT_STAGE_WORKERS)
+    for stage, count in (job.get("stage_workers") or {}).items():
+        if stage not in stage_workers:
+            raise ValueError(f"Unknown pipeline stage '{stage}' (expected one of {', '.join(stage_workers)})")
+        stage_workers[stage] = count
+    
+    state = _init_report_worker(data, job)
+    
+    counter = itertools.count(1)
+    counter_lock = threading.Lock()
+    
+    def aggregate(professor):
+        with counter_lock:
+            position = next(counter)
+        report_progress(f"Processing professor {position}/{len(professors)}: {professor}")
+        return _aggregate_report(state, professor)
+    
+    stages = [
+        Stage("aggregate", aggregate, stage_workers["aggregate"]),
+        Stage("render", lambda work: _render_report_charts(state, work), stage_workers["render"]),
+        Stage("assemble", lambda work: _assemble_report(state, work), stage_workers["assemble"]),
+        Stage("commit", lambda work: _commit_report(state, work), stage_workers["commit"]),
+    ]
+    try:
+        yield from run_pipeline(professors, stages, queue_size=job.get("queue_size") or 2)
+    finally:
+        _close_report_worker(state)
+
+
+def _init_report_worker(data, job):
+    """
+    Prepare the state used to generate reports (once per process).
+    Charts are rendered into a private workspace for this process.
+    data is a DataFrame, or in worker processes the folder of a shared dataset.
+    """
+    if isinstance(data, str):
+        data = SharedDataset(data)
+    columns = resolve_report_columns(data)
+    chart_executor = create_chart_pool(job["chart_workers"]) if job.get("chart_workers") else None
+    return dict(job, data=data, workspace=create_run_workspace(), columns=columns,
+                question_texts=resolve_question_texts(data, columns["questions"]),
+                chart_executor=chart_executor)
+
+
+def _close_report_worker(state):
+    """
+    Remove the workspace of a report process once it is done
+    """
+    if state.get("chart_executor") is not None:
+        state["chart_executor"].shutdown()
+    shutil.rmtree(state["workspace"], ignore_errors=True)
+
+
+def _generate_report_task(state, professor):
+    """
+    Generate the report of one professor and describe the outcome.
+    The PDF is written to the output folder, or returned as bytes in archive mode.
+    """
+    work = _aggregate_report(state, professor)
+    work = _render_report_charts(state, work)
+    work = _assemble_report(state, work)
+    return _commit_report(state, work)
+
+
+def _aggregate_report(state, professor):
+    """
+    Pipeline stage 1: slice out the professor's rows and compute the report numbers
+    """
+    # Slice out the rows of the current professor
+    prof_data = professor_rows(state["data"], state["professor_index"], professor)
+    
+    # Count specializations for this professor
+    spec_counts = prof_data[state["specialization_col"]].value_counts()
+    
+    if len(spec_counts) == 0:  # Only create chart if there's data
+        return {"professor": professor, "status": "no_data"}
+    
+    # Save charts with professor name (sanitize filename); the first row number keeps
+    # names unique while several reports are in flight
+    start, _ = state["professor_index"][professor]
+    chart_filename = os.path.join(state["workspace"], f"pie_chart_{start}_{sanitize_filename(professor)}.png")
+    inputs = section_inputs(state.get("sections"), history=bool(state.get("history_db")))
+    aggregates = compute_professor_aggregates(professor, prof_data, state["columns"],
+                                              state["question_texts"], spec_counts, inputs)
+    attach_question_rankings(aggregates, state.get("rankings"))
+    summaries = None
+    if state.get("history_db"):
+        summaries = attach_cycle_history(aggregates, prof_data, state["columns"], state["history_db"], state.get("cycle"))
+    return {
+        "professor": professor,
+        "status": "generated",
+        "prof_data": prof_data,
+        "chart_path": chart_filename,
+        "aggregates": aggregates,
+        "summaries": summaries,
+        "statistics": report_statistics(aggregates) if state.get("export_statistics") else None,
+    }
+
+
+def _render_report_charts(state, work):
+    """
+    Pipeline stage 2: render every chart of the report and wait until they are on disk
+    """
+    if work["status"] != "generated":
+        return work
+    charts, work["reused_charts"] = render_section_charts(work["aggregates"], state.get("sections"), work["chart_path"],
+                                                            state["chart_executor"], state.get("render_cache"))
+    try:
+        for key in charts:
+            chart_file(charts, key)
+    except BaseException:
+        discard_pending_charts(charts)
+        remove_professor_charts(work["chart_path"])
+        raise
+    work["charts"] = charts
+    return work
+
+
+def _assemble_report(state, work):
+    """
+    Pipeline stage 3: draw the pages into an in-memory PDF and drop the charts
+    """
+    if work["status"] != "generated":
+        return work
+    try:
+        buffer = io.BytesIO()
+        c = canvas.Canvas(buffer, pagesize=letter)
+        draw_professor_report(c, work.pop("aggregates"), work.pop("charts"), sections=state.get("sections"))
+        c.save()
+        work["pdf_bytes"] = buffer.getvalue()
+    finally:
+        remove_professor_charts(work["chart_path"])
+    return work
+
+
+def _commit_report(state, work):
+    """
+    Pipeline stage 4: publish the finished PDF and describe the outcome.
+    In archive mode the bytes are handed back to be added to the archive.
+    """
+    if work["status"] != "generated":
+        return {"status": work["status"]}
+    
+    professor, prof_data = work["professor"], work["prof_data"]
+    result = {"status": "generated", "total_students": int(len(prof_data)), "summaries": work.get("summaries"),
+              "reused_charts": work.get("reused_charts"), "statistics": work.get("statistics")}
+    if state["in_memory"]:
+        result["pdf_bytes"] = work["pdf_bytes"]
+        result["manifest_entry"] = build_manifest_entry(professor, None, prof_data, len(work["pdf_bytes"]))
     else:
-        professors = all_professors
+        # Write the individual PDF for this professor, directly at its final location
+        report_name = f"report_{sanitize_filename(professor)}.pdf"
+        if state["overwrite"]:
+            report_name = os.path.join(state["output_dir"], report_name)
+        else:
+            report_name = reserve_output_path(state["output_dir"], report_name)
+        with atomic_write(report_name, reserved=not state["overwrite"]) as tmp_pdf:
+            with open(tmp_pdf, 'wb') as f:
+                f.write(work["pdf_bytes"])
+        result["report"] = report_name
+    return result
+
+
+def professor_shard(professor, shard_count):
+    """
+    Return the 1-based shard a professor belongs to.
+    Uses CRC32 of the name, which (unlike hash()) is the same on every machine and run.
+    """
+    return zlib.crc32(str(professor).encode('utf-8')) % shard_count + 1
+
+
+def dataset_fingerprint(data):
+    """
+    Identify a workbook by its professors and row count, so manifests from
+    different machines can be checked to come from the same data
+    """
+    professors = sorted(str(prof) for prof in data['Level 2'].dropna().unique())
+    digest = zlib.crc32("\n".join(professors).encode('utf-8'))
+    return f"{len(data)}-{len(professors)}-{digest:08x}"
+
+
+def write_shard_manifest(manifest_dir, shard, data, report_status, archive_path=None):
+    """
+    Write the manifest of one shard run and return its path
+    """
+    shard_index, shard_count = shard
+    manifest = {
+        "shard_index": shard_index,
+        "shard_count": shard_count,
+        "dataset_fingerprint": dataset_fingerprint(data),
+        "generated_at": pd.Timestamp.now().isoformat(timespec='seconds'),
+        "archive": os.path.basename(archive_path) if archive_path else None,
+        "professors": report_status,
+    }
+    manifest_path = os.path.join(manifest_dir, f"shard_{shard_index}_of_{shard_count}_manifest.json")
+    with atomic_write(manifest_path) as tmp_path:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest_path
+
+
+def merge_shard_manifests(manifest_paths, data=None):
+    """
+    Combine the manifests written by the shards of one batch.
+    
+    Returns a summary with the generated reports and everything that is missing:
+    shards that never reported, professors that failed or have no report file,
+    and (when the workbook data is given) professors that no shard processed.
+    """
+    manifests = []
+    for path in manifest_paths:
+        with open(path, encoding='utf-8') as f:
+            manifest = json.load(f)
+        manifest["path"] = path
+        manifests.append(manifest)
+    
+    if not manifests:
+        raise ValueError("No shard manifests to merge")
+    
+    shard_counts = {m["shard_count"] for m in manifests}
+    fingerprints = {m["dataset_fingerprint"] for m in manifests}
+    if len(shard_counts) > 1:
+        raise ValueError(f"Manifests come from different shard layouts: {sorted(shard_counts)}")
+    if data is not None:
+        fingerprints.add(dataset_fingerprint(data))
+    if len(fingerprints) > 1:
+        raise ValueError("Manifests were produced from different workbooks")
+    shard_count = shard_counts.pop()
     
-    # Create pie charts for selected professor(s)
+    present_shards = {m["shard_index"] for m in manifests}
+    generated = {}
+    failed = {}
+    for manifest in manifests:
+        manifest_dir = os.path.dirname(manifest["path"])
+        for entry in manifest["professors"]:
+            if entry["status"] == "generated":
+                # Without an archive the report must still be next to the manifest
+                if manifest.get("archive") or os.path.exists(os.path.join(manifest_dir, entry["report"])):
+                    generated[entry["professor"]] = entry
+                else:
+                    failed[entry["professor"]] = dict(entry, status="missing_file")
+            elif entry["status"] == "error":
+                failed[entry["professor"]] = entry
+    
+    summary = {
+        "shard_count": shard_count,
+        "missing_shards": sorted(set(range(1, shard_count + 1)) - present_shards),
+        "generated": sorted(generated),
+        "failed": [failed[prof] for prof in sorted(failed)],
+    }
+    
+    if data is not None:
+        # Recompute the assignment to name the professors no shard has covered
+        processed = {entry["professor"] for m in manifests for entry in m["professors"]}
+        summary["unprocessed"] = sorted(str(prof) for prof in data['Level 2'].dropna().unique()
+                                        if str(prof) not in processed)
+    
+    return summary
+
+
+def unique_archive_name(archive, name):
+    """
+    Return name, or name with a numeric suffix if the archive already has an entry with it
+    """
+    existing = set(archive.namelist())
+    stem, suffix = os.path.splitext(name)
+    counter = 1
+    candidate = name
+    while candidate in existing:
+        candidate = f"{stem}_{counter}{suffix}"
+        counter += 1
+    return candidate
+
+
+def build_manifest_entry(professor, report_name, prof_data, size_bytes):
+    """
+    Describe one generated report for an archive manifest
+    """
+    entry = {
+        "professor": str(professor),
+        "file": report_name,
+        "total_students": int(len(prof_data)),
+        "size_bytes": int(size_bytes),
+        "generated_at": pd.Timestamp.now().isoformat(timespec='seconds'),
+    }
+    timestamp_col = 'Timestamp (dd/mm/yyyy)'
+    if timestamp_col in prof_data.columns:
+        dates = pd.to_datetime(prof_data[timestamp_col], errors='coerce', dayfirst=True).dropna()
+        if len(dates) > 0:
+            entry["first_response"] = dates.min().isoformat()
+            entry["last_response"] = dates.max().isoformat()
+    return entry
+
+
+# Function to build one combined PDF for the whole faculty
+def generate_faculty_pdf(data, output_path, progress_callback=None, professor_index=None, chart_executor=None,
+                         history_db=None, cycle=None, sections=None, render_cache=None, statistics_path=None,
+                         professors=None):
+    """
+    Write every professor's report (or only those in professors) into a single
+    PDF with a bookmark outline.
+    
+    Pages are drawn with the same logic as generate_professor_pdf. The logo and
+    fonts are registered once and shared by all pages, and each professor's
+    charts are deleted as soon as their pages have been emitted, so temporary
+    files and figures do not accumulate with the size of the faculty. The
+    document is written progressively (see streaming_canvas.py): each
+    professor's finished pages and charts go to the file before the next
+    professor is drawn, so memory stays flat however many professors there are.
+    With a chart_executor (see create_chart_pool) each professor's charts are
+    rendered in parallel while their pages are drawn. history_db, cycle,
+    sections, render_cache and statistics_path work as in create_professor_pie_charts.
+    """
+    sections = resolve_sections(sections)
+    prune_render_cache(render_cache)
+    inputs = section_inputs(sections, history=bool(history_db))
+    
+    level2_index = data.columns.get_loc('Level 2')
+    specialization_col = data.columns[level2_index - 1]
+    
+    if professor_index is None:
+        if not is_sorted_by_professor(data):
+            data = sort_by_professor(data)
+        professor_index = build_professor_index(data)
+    requested = set(professor_index if professors is None else professors)
+    professors = [prof for prof in professor_index if prof in requested]
+    
+    columns = resolve_report_columns(data)
+    question_texts = resolve_question_texts(data, columns["questions"])
+    rankings = compute_question_rankings(*question_means_matrix(data, columns))
+    
+    workspace = create_run_workspace()
+    tmp_output_path = temporary_path_for(output_path)
+    
+    c = StreamingCanvas(tmp_output_path, pagesize=letter)
+    c.setTitle("Faculty Performance Evaluation Report")
+    c.showOutline()  # Open the bookmark panel when the PDF is opened
+    
+    generated = 0
+    summaries = []
+    statistics = []
     for i, professor in enumerate(professors):
-        if pd.isna(professor):  # Skip if professor name is NaN
-            continue
+        # Prefix with the position so sanitized names can never collide
+        # (the canvas caches images by file name)
+        chart_filename = os.path.join(workspace, f"pie_chart_{i}_{sanitize_filename(professor)}.png")
         
         try:
-            # Update progress if callback is provided
             if progress_callback:
                 progress_callback(f"Processing professor {i+1}/{len(professors)}: {professor}")
-            
             print(f"Processing professor {i+1}/{len(professors)}: {professor}")
             
-            # Filter data for current professor
-            prof_data = data[data['Level 2'] == professor]
-            
-            # Count specializations for this professor
+            prof_data = professor_rows(data, professor_index, professor)
             spec_counts = prof_data[specialization_col].value_counts()
             
-            if len(spec_counts) > 0:  # Only create chart if there's data
-                # Create the pie chart
-                plt.figure(figsize=(12, 10))
-                wedges, texts, autotexts = plt.pie(spec_counts.values, labels=spec_counts.index, autopct='%1.1f%%', startangle=90)
-                
-                # Increase font sizes for better readability
-                for text in texts:
-                    text.set_fontsize(14)
-                    text.set_fontweight('bold')
-                for autotext in autotexts:
-                    autotext.set_fontsize(12)
-                    autotext.set_fontweight('bold')
-                    autotext.set_color('white')
-                
-                plt.title('Student Specialization Distribution', 
-                         fontsize=20, fontweight='bold', pad=30)
-                plt.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
-                
-                # Save chart with professor name (sanitize filename)
-                safe_filename = "".join(c for c in professor if c.isalnum() or c in (' ', '-', '_')).rstrip()
-                chart_filename = f"temp/pie_chart_{safe_filename}.png"
-                plt.savefig(chart_filename, bbox_inches='tight', dpi=150)
-                plt.close()  # Close the figure to free memory
-                plt.clf()    # Clear the current figure
-                
-                # Force garbage collection to free memory
-                gc.collect()
-                
-                # Generate individual PDF for this professor
-                pdf_filename = f"output/report_{safe_filename}.pdf"
-                generate_professor_pdf(pdf_filename, chart_filename, professor, spec_counts, len(prof_data), specialization_col, prof_data, data)
-                
-                if progress_callback:
-                    progress_callback(f"✓ Successfully generated report for {professor}")
-                print(f"✓ Successfully generated report for {professor}")
-            else:
+            if len(spec_counts) == 0:
                 if progress_callback:
                     progress_callback(f"⚠ No data found for professor: {professor}")
                 print(f"⚠ No data found for professor: {professor}")
-                
+                continue
+            
+            aggregates = compute_professor_aggregates(professor, prof_data, columns, question_texts, spec_counts, inputs)
+            attach_question_rankings(aggregates, rankings)
+            cycle_summaries = attach_cycle_history(aggregates, prof_data, columns, history_db, cycle) if history_db else []
+            charts, _ = render_section_charts(aggregates, sections, chart_filename, chart_executor, render_cache)
+            try:
+                draw_professor_report(c, aggregates, charts, outline_key=f"prof{i}", sections=sections)
+            finally:
+                discard_pending_charts(charts)
+            summaries.extend(cycle_summaries)
+            if statistics_path is not None:
+                statistics.append(report_statistics(aggregates))
+            c.showPage()  # Finish this professor's last page before the next one
+            c.flush()  # and write their pages and charts to the file
+            generated += 1
+            
+            if progress_callback:
+                progress_callback(f"✓ Added {professor} to the faculty report")
+            print(f"✓ Added {professor} to the faculty report")
+        
         except Exception as e:
             error_msg = f"✗ Error processing professor {professor}: {str(e)}"
             if progress_callback:
                 progress_callback(error_msg)
             print(error_msg)
-            # Continue with next professor instead of crashing
             continue
+        
+        finally:
+            # Drop this professor's charts right away instead of at the end of the run
+            remove_professor_charts(chart_filename)
+            gc.collect()
     
-    # Clean up temporary files after ALL professors are processed
-    cleanup_temp_folder()
-    completion_msg = f"✓ Completed processing {len(professors)} professors"
+    try:
+        c.save()
+        os.replace(tmp_output_path, output_path)
+        if summaries:
+            save_summaries(history_db, summaries)
+        if statistics_path is not None:
+            write_statistics(statistics_path, statistics, progress_callback)
+    except Exception:
+        c.close()
+        if os.path.exists(tmp_output_path):
+            os.unlink(tmp_output_path)
+        raise
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    
+    completion_msg = f"✓ Completed faculty report with {generated} professors: {output_path}"
     if progress_callback:
         progress_callback(completion_msg)
     print(completion_msg)
+    return generated
+
+
+def sanitize_filename(professor):
+    """
+    Strip characters that are not safe in file names from a professor name
+    """
+    return "".join(c for c in str(professor) if c.isalnum() or c in (' ', '-', '_')).rstrip()
+
+
+def remove_professor_charts(chart_path):
+    """
+    Delete the main chart of a professor and every chart derived from it
+    (e.g. pie_chart_X.png, pie_chart_X_years.png, pie_chart_X_question_1.png)
+    """
+    directory = os.path.dirname(chart_path) or "."
+    stem = os.path.splitext(os.path.basename(chart_path))[0]
+    if not os.path.isdir(directory):
+        return
+    for filename in os.listdir(directory):
+        if filename == f"{stem}.png" or (filename.startswith(f"{stem}_") and filename.endswith(".png")):
+            try:
+                os.unlink(os.path.join(directory, filename))
+            except OSError as e:
+                print(f'Failed to delete {filename}. Reason: {e}')
+
+
+def create_run_workspace():
+    """
+    Create a private temporary folder for the charts of one run.
+    Each run gets its own folder, so concurrent runs never share or delete each other's files.
+    """
+    os.makedirs("temp", exist_ok=True)
+    return tempfile.mkdtemp(prefix="run_", dir="temp")
+
+
+def temporary_path_for(final_path):
+    """
+    Create an empty temporary file next to final_path and return its path.
+    It lives in the same folder so it can later be renamed into place atomically.
+    Unlike tempfile.mkstemp (always 0600) it gets the usual permissions of a new
+    file under the umask, which the final file keeps after the rename.
+    """
+    directory = os.path.dirname(os.path.abspath(final_path))
+    os.makedirs(directory, exist_ok=True)
+    while True:
+        tmp_path = os.path.join(directory, f".{os.path.basename(final_path)}.{os.urandom(4).hex()}.tmp")
+        try:
+            os.close(os.open(tmp_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+            return tmp_path
+        except FileExistsError:
+            continue
+
+
+def reserve_output_path(directory, filename):
+    """
+    Atomically claim a file name in directory that no other run is using,
+    adding _1, _2, ... to the name on conflicts. Returns the reserved path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem, suffix = os.path.splitext(filename)
+    counter = 0
+    while True:
+        name = filename if counter == 0 else f"{stem}_{counter}{suffix}"
+        path = os.path.join(directory, name)
+        try:
+            os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            return path
+        except FileExistsError:
+            counter += 1
+
+
+@contextmanager
+def atomic_write(final_path, reserved=False):
+    """
+    Yield a temporary path to write to; it replaces final_path only if the block succeeds.
+    If reserved is True, final_path is a placeholder from reserve_output_path and is
+    removed again when writing fails.
+    """
+    tmp_path = temporary_path_for(final_path)
+    try:
+        yield tmp_path
+        os.replace(tmp_path, final_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        if reserved and os.path.exists(final_path):
+            os.unlink(final_path)
+        raise
+
+
+# Register the Unicode font once per process and reuse it for every document
+_unicode_font = None
+
+def get_unicode_font():
+    """
+    Return the name of the font to use for report text, registering it on first use
+    """
+    global _unicode_font
+    if _unicode_font is None:
+        try:
+            # Try to register a Unicode font (you may need to adjust the path)
+            pdfmetrics.registerFont(TTFont('Unicode', 'arial.ttf'))
+            _unicode_font = 'Unicode'
+        except:
+            # Fallback to built-in fonts with limited Unicode support
+            _unicode_font = 'Helvetica'
+    return _unicode_font
+
+
+def add_section_bookmark(c, outline_key, section_key, title, level=1):
+    """
+    Bookmark the current page and add it to the document outline.
+    Does nothing for standalone reports (outline_key is None).
+    """
+    if outline_key is None:
+        return
+    key = f"{outline_key}_{section_key}"
+    c.bookmarkPage(key)
+    c.addOutlineEntry(title, key, level=level)
             
 
 # Function to calculate proper image dimensions maintaining aspect ratio
@@ -168,150 +957,1059 @@ def parse_level3_data(level3_value):
     
     return course, year
 
-# Function to generate detailed PDF for each professor
-def generate_professor_pdf(output_path, chart_path, professor_name, spec_counts, total_students, specialization_col, prof_data, data=None):
-    c = canvas.Canvas(output_path, pagesize=letter)
-    
-    # If data is not provided, try to read it from the default location
-    if data is None:
-        try:
-            data = read_excel("assets/QuestionPro-SR-RawData.xlsx")
-        except:
-            data = prof_data  # Fallback to professor data
+# Function to find the columns used by the report, by their position around "Level 2" and "Level 3"
+def resolve_report_columns(data):
+    """
+    Locate the report columns in the workbook layout:
+    specialization is right before "Level 2"; attendance and workload follow "Level 3",
+    then 4 teaching method columns, 12 question columns and 3 comment columns.
+    The department is "Level 1" when the export has it.
+    """
+    # Find the column immediately before "Level 2" (specializations)
+    level2_index = data.columns.get_loc('Level 2')
+    specialization_col = data.columns[level2_index - 1]
     
-    # Register Arial Unicode MS or DejaVu fonts for UTF-8 support
-    try:
-        # Try to register a Unicode font (you may need to adjust the path)
-        pdfmetrics.registerFont(TTFont('Unicode', 'arial.ttf'))
-        unicode_font = 'Unicode'
-    except:
-        # Fallback to built-in fonts with limited Unicode support
-        unicode_font = 'Helvetica'
+    # Find the attendance column (immediately after "Level 3")
+    level3_index = data.columns.get_loc('Level 3')
+    attendance_col = data.columns[level3_index + 1]
+    workload_col = data.columns[level3_index + 2]
     
-    # NEW PAGE 1: TITLE PAGE WITH LOGO AND COMPLETION TRENDS
-    # Add university logo
-    logo_path = "assets/LOGO-ULBS_orizontal.png"
-    if os.path.exists(logo_path):
-        logo_width, logo_height = get_image_dimensions(logo_path, max_width=300)
-        # Center the logo horizontally
-        x_position = (letter[0] - logo_width) / 2
-        c.drawImage(logo_path, x_position, 650, width=logo_width, height=logo_height)
+    # Teaching method columns - the 4 columns immediately after workload
+    workload_index = data.columns.get_loc(workload_col)
+    teaching_method_cols = []
+    for i in range(1, 5):  # Get the next 4 columns after workload
+        if workload_index + i < len(data.columns):
+            teaching_method_cols.append(data.columns[workload_index + i])
     
-    # Professor name (emphasized)
-    c.setFont(unicode_font, 24)
-    c.drawString(50, 600, "Performance Evaluation Report")
+    # Question columns - the 12 columns immediately after teaching methods
+    question_cols = []
+    for i in range(5, 17):  # Get the next 12 columns after workload (positions 5-16 after workload)
+        if workload_index + i < len(data.columns):
+            question_cols.append(data.columns[workload_index + i])
     
-    c.setFont(unicode_font, 20)
-    c.drawString(50, 570, f"Professor: {professor_name}")
-    
-    # Student completion statistics
-    c.setFont(unicode_font, 14)
-    c.drawString(50, 530, f"Total Students who Completed the Form: {total_students}")
+    # Comment columns - the 3 columns immediately after question columns
+    comment_cols = []
+    for i in range(17, 20):  # Get the next 3 columns after questions (positions 17-19 after workload)
+        if workload_index + i < len(data.columns):
+            comment_cols.append(data.columns[workload_index + i])
     
-    # Generate daily completion trend chart
     timestamp_col = 'Timestamp (dd/mm/yyyy)'
-    if timestamp_col in data.columns:
-        # Get timestamp data for this professor
-        prof_timestamps = prof_data[timestamp_col].dropna()
+    
+    return {
+        "department": 'Level 1' if 'Level 1' in data.columns else None,
+        "specialization": specialization_col,
+        "attendance": attendance_col,
+        "workload": workload_col,
+        "teaching_methods": teaching_method_cols,
+        "questions": question_cols,
+        "comments": comment_cols,
+        "timestamp": timestamp_col if timestamp_col in data.columns else None,
+    }
+
+def resolve_question_texts(data, question_cols):
+    """
+    Get the question text of every question column from the second row (index 1) of the original data
+    """
+    if isinstance(data, SharedDataset):
+        data = data.rows(0, 2)
+    texts = []
+    for q_index, col in enumerate(question_cols):
+        if len(data) > 1:
+            texts.append(str(data.iloc[1, data.columns.get_loc(col)]))
+        else:
+            texts.append(f"Evaluation Question {q_index + 1}")
+    return texts
+
+# Teaching methods in the order of their 4 columns
+TEACHING_METHOD_NAMES = [
+    'Predare CLASICĂ',
+    'Predare online SINCRONĂ',
+    'Predare online ASINCRONĂ',
+    'Predare MIXTĂ'
+]
+
+# Custom order for workload levels
+WORKLOAD_ORDER = ["Foarte mic", "Mic", "Mediu", "Mare", "Foarte mare"]
+
+COMMENT_SECTION_NAMES = [
+    "Positive Aspects (Pros)",
+    "Negative Aspects (Cons)",
+    "Areas of Improvement"
+]
+
+# Parts of the aggregates that can be computed separately; "rollup" is only used for
+# the stored summaries, the others feed the report sections that declare them
+AGGREGATE_INPUTS = ("trend", "level3", "attendance", "workload", "teaching_methods", "questions", "comments", "rollup")
+
+# Function to compute every number shown in a professor's report
+def compute_professor_aggregates(professor_name, prof_data, columns, question_texts, spec_counts=None, inputs=None):
+    """
+    Compute the statistics of all report sections for one professor.
+    Nothing is drawn here; the result feeds both the charts and the PDF pages.
+    inputs limits the work to some of AGGREGATE_INPUTS (see section_inputs);
+    by default everything the report sections read is computed.
+    """
+    if inputs is None:
+        inputs = section_inputs()
+    
+    # Calculate total professor responses (will be used across all pages)
+    total_professor_responses = len(prof_data)
+    
+    if spec_counts is None:
+        spec_counts = prof_data[columns["specialization"]].value_counts()
+    
+    aggregates = {
+        "professor": professor_name,
+        "total_students": total_professor_responses,
+        "total_responses": total_professor_responses,
+        "spec_counts": spec_counts,
+        "department": professor_department(prof_data, columns),
+    }
+    
+    # Daily completion trend
+    if "trend" in inputs:
+        timestamp_col = columns["timestamp"]
+        if timestamp_col is None:
+            aggregates["trend"] = {"status": "missing_column"}
+        else:
+            # Get timestamp data for this professor
+            prof_timestamps = prof_data[timestamp_col].dropna()
+            if len(prof_timestamps) == 0:
+                aggregates["trend"] = {"status": "no_timestamps"}
+            else:
+                # Convert to datetime and extract dates
+                dates = pd.to_datetime(prof_timestamps, errors='coerce').dt.date
+                dates = dates.dropna()  # Remove any invalid dates
+                if len(dates) == 0:
+                    aggregates["trend"] = {"status": "no_valid_dates"}
+                else:
+                    # Use all available data without filtering
+                    aggregates["trend"] = {"status": "ok", "daily_counts": dates.value_counts().sort_index()}
+    
+    # Parse Level 3 data for course and year distributions
+    if "level3" in inputs:
+        courses = []
+        years = []
+        for level3_value in prof_data['Level 3']:
+            course, year = parse_level3_data(level3_value)
+            if course:
+                courses.append(course)
+            if year:
+                years.append(year)
+        aggregates["year_counts"] = pd.Series(years).value_counts()
+        aggregates["year_responses"] = len(years)
+        aggregates["course_counts"] = pd.Series(courses).value_counts()
+        aggregates["course_responses"] = len(courses)
+    
+    # Attendance distribution
+    if "attendance" in inputs:
+        attendance_data = prof_data[columns["attendance"]].dropna()
+        aggregates["attendance_counts"] = attendance_data.value_counts().sort_index()
+        aggregates["attendance_responses"] = len(attendance_data)
+    
+    # Workload distribution
+    if "workload" in inputs:
+        workload_data = prof_data[columns["workload"]].dropna()
+        
+        # Get value counts and reorder according to custom order
+        workload_counts_raw = workload_data.value_counts()
+        workload_counts = pd.Series(dtype='int64')
+        
+        # Reorder according to the specified order, including zeros for missing categories
+        for level in WORKLOAD_ORDER:
+            if level in workload_counts_raw.index:
+                workload_counts[level] = workload_counts_raw[level]
+            else:
+                workload_counts[level] = 0  # Add zero count for missing categories
+        
+        # Add any levels not in the predefined order at the end
+        for level in workload_counts_raw.index:
+            if level not in WORKLOAD_ORDER:
+                workload_counts[level] = workload_counts_raw[level]
         
-        if len(prof_timestamps) > 0:
-            # Convert timestamps to dates and count daily completions
-            import matplotlib.dates as mdates
-            from datetime import datetime, timedelta
+        aggregates["workload_counts"] = workload_counts
+        aggregates["workload_responses"] = len(workload_data)
+    
+    # Teaching methods: count non-null values (implemented methods) in each of the 4 columns
+    if "teaching_methods" in inputs:
+        teaching_method_cols = columns["teaching_methods"]
+        if teaching_method_cols and total_professor_responses > 0:
+            method_counts = {name: 0 for name in TEACHING_METHOD_NAMES}
+            for i, col in enumerate(teaching_method_cols):
+                if i < len(TEACHING_METHOD_NAMES):
+                    method_counts[TEACHING_METHOD_NAMES[i]] = int(prof_data[col].notna().sum())
+            aggregates["method_counts"] = method_counts
+        else:
+            aggregates["method_counts"] = None
+        aggregates["teaching_method_columns"] = len(teaching_method_cols)
+    
+    # Evaluation questions: grade distribution in Pareto order
+    if "questions" in inputs:
+        questions = []
+        for q_index, col in enumerate(columns["questions"]):
+            question = {"number": q_index + 1, "text": question_texts[q_index]}
             
-            # Convert to datetime and extract dates
-            dates = pd.to_datetime(prof_timestamps, errors='coerce').dt.date
-            dates = dates.dropna()  # Remove any invalid dates
+            # Get question data for this professor
+            question_data = prof_data[col].dropna()
+            question["responses"] = len(question_data)
             
-            if len(dates) > 0:
-                daily_counts = dates.value_counts().sort_index()
-                
-                # Get the actual date range from the data
-                min_date = daily_counts.index.min()
-                max_date = daily_counts.index.max()
-                
-                # Use all available data without filtering
-                period_data = daily_counts
+            if question["responses"] == 0:
+                question["status"] = "no_responses"
+            else:
+                # Convert to numeric and count grades 1-10
+                numeric_data = pd.to_numeric(question_data, errors='coerce').dropna()
                 
-                if len(period_data) > 0:
-                    # Create line chart for daily completions
-                    plt.figure(figsize=(14, 8))
-                    
-                    # Convert dates back to datetime for plotting
-                    plot_dates = [datetime.combine(date, datetime.min.time()) for date in period_data.index]
-                    
-                    plt.plot(plot_dates, period_data.values, marker='o', linewidth=3, markersize=8, color='#2E86C1')
-                    
-                    plt.title('Daily Form Completion Trends', 
-                             fontsize=18, fontweight='bold', pad=30)
-                    plt.xlabel('Date', fontsize=16, fontweight='bold')
-                    plt.ylabel('Number of Completions', fontsize=16, fontweight='bold')
+                if len(numeric_data) == 0:
+                    question["status"] = "no_numeric"
+                else:
+                    # Count occurrences of each grade (1-10)
+                    grade_counts = {}
+                    for grade in range(1, 11):
+                        count = int((numeric_data == grade).sum())
+                        if count > 0:  # Only include grades that have responses
+                            grade_counts[grade] = count
                     
-                    # Format x-axis with human-readable dates
-                    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+                    # Sort by count (descending for Pareto)
+                    sorted_grades = sorted(grade_counts.items(), key=lambda x: x[1], reverse=True)
                     
-                    # Adjust date locator based on data range
-                    date_range_days = (max_date - min_date).days
-                    if date_range_days <= 14:
-                        plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=1))
-                    elif date_range_days <= 30:
-                        plt.gca().xaxis.set_major_locator(mdates.DayLocator(interval=2))
+                    if len(sorted_grades) == 0:
+                        question["status"] = "no_valid_grades"
                     else:
-                        plt.gca().xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
-                    
-                    plt.xticks(rotation=45, fontsize=14)
-                    plt.yticks(fontsize=14)
-                    
-                    # Set y-axis to show only integer values
-                    plt.gca().yaxis.set_major_locator(plt.MaxNLocator(integer=True))
-                    
-                    # Add grid
-                    plt.grid(True, alpha=0.3)
-                    
-                    # Add value labels on points
-                    for i, (date, count) in enumerate(zip(plot_dates, period_data.values)):
-                        plt.annotate(f'{count}', (date, count), textcoords="offset points", 
-                                   xytext=(0,12), ha='center', fontsize=12, fontweight='bold')
-                    
-                    plt.tight_layout()
-                    
-                    completion_chart_path = chart_path.replace('.png', '_completion_trends.png')
-                    plt.savefig(completion_chart_path, bbox_inches='tight', dpi=150)
-                    plt.close()
-                    plt.clf()
-                    gc.collect()
-                    
-                    # Add the completion trends chart to PDF
-                    chart_width, chart_height = get_image_dimensions(completion_chart_path, max_width=500)
-                    c.drawImage(completion_chart_path, 50, 200, width=chart_width, height=chart_height)
-                    
-                    # Add summary statistics with human-readable format
-                    c.setFont(unicode_font, 10)
-                    peak_date_formatted = period_data.idxmax().strftime('%d %B')
-                    c.drawString(50, 180, f"Peak completion day: {peak_date_formatted} ({period_data.max()} completions)")
-                    c.drawString(50, 165, f"Average daily completions: {int(round(period_data.mean()))}")
-                    c.drawString(50, 150, f"Total days with responses: {len(period_data)}")
-                    c.drawString(50, 135, f"Data range: {min_date.strftime('%d %B')} to {max_date.strftime('%d %B')}")
-                else:
-                    c.setFont(unicode_font, 12)
-                    c.drawString(50, 400, "No completion data available")
-                    c.drawString(50, 380, f"Available data range: {min_date.strftime('%d %B')} to {max_date.strftime('%d %B')}")
-            else:
-                c.setFont(unicode_font, 12)
-                c.drawString(50, 400, "No valid timestamp data found for this professor")
+                        # Calculate cumulative percentages
+                        total_count = sum(count for _, count in sorted_grades)
+                        cumulative_percentages = []
+                        cumulative_sum = 0
+                        for _, count in sorted_grades:
+                            cumulative_sum += count
+                            cumulative_percentages.append((cumulative_sum / total_count) * 100 if total_count > 0 else 0)
+                        
+                        question["status"] = "ok"
+                        question["sorted_grades"] = sorted_grades
+                        question["cumulative_percentages"] = cumulative_percentages
+                        question["average"] = float(numeric_data.mean())
+            
+            questions.append(question)
+        aggregates["questions"] = questions
+    
+    # Comments: drop empty strings and whitespace-only comments
+    if "comments" in inputs:
+        comment_sections = []
+        for comment_index, col in enumerate(columns["comments"]):
+            comment_data = prof_data[col].dropna().astype(str)
+            comment_data = comment_data[comment_data.str.strip() != '']
+            comment_sections.append({"title": COMMENT_SECTION_NAMES[comment_index],
+                                     "comments": comment_data.tolist()})
+        aggregates["comment_sections"] = comment_sections
+    
+    # Counts per department and course/year, merged into department and faculty rollups
+    if "rollup" in inputs:
+        aggregates["rollup"] = professor_rollup_table(prof_data, columns)
+        aggregates["rollup_hash"] = rollup_input_hash(prof_data, columns)
+    
+    return aggregates
+
+
+ROLLUP_COLUMNS = ["department", "course", "year", "measure", "category", "count"]
+
+# Group name used for responses without a department, course or year
+UNSPECIFIED = "Unspecified"
+
+# Function to find the department of a professor
+def professor_department(prof_data, columns):
+    """
+    The department most of the professor's responses name (the first one
+    alphabetically on a tie), or UNSPECIFIED
+    """
+    department_col = columns.get("department")
+    if department_col is None or len(prof_data) == 0:
+        return UNSPECIFIED
+    return prof_data[department_col].fillna(UNSPECIFIED).astype(str).value_counts().sort_index().idxmax()
+
+# Function to fingerprint the rows a rollup table is counted from
+def rollup_input_hash(prof_data, columns):
+    """
+    Hash of every value professor_rollup_table reads from the professor's rows
+    (in any order, as the counts do not depend on it), so a stored table is only
+    reused for exactly the same responses
+    """
+    input_cols = ([columns.get("department"), 'Level 3', columns["attendance"], columns["workload"]]
+                  + list(columns["teaching_methods"]) + list(columns["questions"]))
+    values = prof_data[[col for col in input_cols if col is not None]].copy()
+    # Grades are read as numbers, so they match whether their column was loaded as int or float
+    values[columns["questions"]] = values[columns["questions"]].apply(pd.to_numeric, errors='coerce')
+    row_hashes = np.sort(pd.util.hash_pandas_object(values, index=False).to_numpy())
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:32]
+
+# Function to count a professor's responses per department and course/year
+def professor_rollup_table(prof_data, columns):
+    """
+    Count the professor's responses, attendance, workload, teaching methods and
+    question grades per (department, course, year), one row per
+    (measure, category). Tables of many professors are simply added together
+    to get department and faculty rollups (see rollups.py).
+    """
+    department_col = columns.get("department")
+    if department_col is None:
+        departments = pd.Series(UNSPECIFIED, index=prof_data.index)
+    else:
+        departments = prof_data[department_col].fillna(UNSPECIFIED).astype(str)
+    
+    # Parse each distinct Level 3 value once
+    level3 = prof_data['Level 3']
+    parsed = {value: parse_level3_data(value) for value in level3.dropna().unique()}
+    keys = pd.DataFrame({
+        "department": departments,
+        "course": level3.map({value: course for value, (course, _) in parsed.items()}).fillna(UNSPECIFIED),
+        "year": level3.map({value: year for value, (_, year) in parsed.items()}).fillna(UNSPECIFIED),
+    }, index=prof_data.index)
+    
+    parts = []
+    def count(measure, categories):
+        # categories is aligned with the rows; rows without a category are not counted
+        frame = keys.assign(category=categories).dropna(subset=["category"])
+        counts = frame.groupby(["department", "course", "year", "category"]).size()
+        parts.append(counts.rename("count").reset_index().assign(measure=measure))
+    
+    count("responses", pd.Series("", index=prof_data.index))
+    count("attendance", prof_data[columns["attendance"]].dropna().astype(str))
+    count("workload", prof_data[columns["workload"]].dropna().astype(str))
+    for i, col in enumerate(columns["teaching_methods"][:len(TEACHING_METHOD_NAMES)]):
+        count("method", pd.Series(TEACHING_METHOD_NAMES[i], index=prof_data[col].dropna().index))
+    for q_index, col in enumerate(columns["questions"]):
+        grades = pd.to_numeric(prof_data[col], errors='coerce')
+        grades = grades[grades.isin(range(1, 11))]
+        count(f"question_{q_index + 1}", grades.astype(int).astype(str))
+    
+    table = pd.concat(parts, ignore_index=True)[ROLLUP_COLUMNS]
+    table["count"] = table["count"].astype('int64')
+    return table
+
+
+# Function to summarize a report per evaluation cycle and look up the earlier cycles
+def attach_cycle_history(aggregates, prof_data, columns, history_db, cycle=None):
+    """
+    Add aggregates["history"]: the stored summaries of the professor's earlier cycles
+    plus the summaries of this report's rows. Returns those summaries, to be saved
+    once the report has been written.
+    
+    Without a cycle, every row's cycle is inferred from its timestamp. Rows from
+    several cycles (e.g. a report built from the response store) get one summary
+    per cycle, each computed from that cycle's rows only, so no cycle is stored
+    with the responses of another. When no cycle is given and none can be inferred
+    (no usable timestamps), nothing is returned to be saved and the history only
+    holds the stored cycles.
+    """
+    summaries = []
+    if cycle is None and columns["timestamp"] is not None:
+        row_cycles = infer_semesters(prof_data[columns["timestamp"]]).to_numpy()
+        cycles = sorted({name for name in row_cycles if isinstance(name, str)})
+        if len(cycles) == 1:
+            cycle = cycles[0]
+        elif cycles:
+            question_texts = [question["text"] for question in aggregates["questions"]]
+            inputs = ("questions", "rollup") if "rollup" in aggregates else ("questions",)
+            for name in cycles:
+                cycle_aggregates = compute_professor_aggregates(aggregates["professor"], prof_data[row_cycles == name],
+                                                                columns, question_texts, inputs=inputs)
+                summaries.append(summarize_aggregates(cycle_aggregates, name))
+    if not summaries:
+        if cycle is None:
+            print(f"⚠ No evaluation cycle for {aggregates['professor']}: the responses have no usable timestamps "
+                  f"and no cycle was given, so this report is not added to the history")
         else:
-            c.setFont(unicode_font, 12)
-            c.drawString(50, 400, "No timestamp data available for this professor")
+            summaries = [summarize_aggregates(aggregates, cycle)]
+    
+    history = load_history(history_db, aggregates["professor"])
+    for summary in summaries:
+        history = merge_history(history, summary)
+    aggregates["history"] = history
+    return summaries
+
+
+# Function to average every question of every professor in one pass over the table
+def question_means_matrix(data, columns):
+    """
+    Return (means, departments): the professors x questions matrix of average scores
+    (columns 1-12, averaged like the question pages do) and each professor's most
+    frequent department, or None when the export has no department column
+    """
+    professors = data['Level 2']
+    grades = data[columns["questions"]].apply(pd.to_numeric, errors='coerce')
+    grades.columns = range(1, len(columns["questions"]) + 1)
+    means = grades.groupby(professors).mean()
+    
+    departments = None
+    if columns.get("department") is not None:
+        counts = data.groupby([professors, data[columns["department"]]]).size()
+        if len(counts):
+            departments = counts.groupby(level=0).idxmax().map(lambda key: key[1])
+    return means, departments
+
+# Function to rank the question averages of all professors against each other
+def compute_question_rankings(means, departments=None):
+    """
+    Rank a professors x questions matrix of averages column by column, within the
+    faculty and within each department. Rank 1 is the highest average; the percentile
+    is the share of colleagues whose average is not higher.
+    Returns {professor: [ranking of question 1, ...]}, where a ranking is None when
+    the professor has no average for that question.
+    """
+    faculty_rank = means.rank(ascending=False, method='min').to_numpy()
+    faculty_percentile = (means.rank(method='max', pct=True) * 100).to_numpy()
+    faculty_count = means.notna().sum().to_numpy()
+    
+    if departments is not None:
+        professor_departments = departments.reindex(means.index)
+        grouped = means.groupby(professor_departments)
+        department_rank = grouped.rank(ascending=False, method='min').reindex(means.index).to_numpy()
+        department_percentile = (grouped.rank(method='max', pct=True) * 100).reindex(means.index).to_numpy()
+        department_count = grouped.transform('count').reindex(means.index).to_numpy()
+    
+    rankings = {}
+    for row, professor in enumerate(means.index):
+        ranks = []
+        for col in range(means.shape[1]):
+            if np.isnan(faculty_rank[row, col]):
+                ranks.append(None)
+                continue
+            ranking = {"faculty_rank": int(faculty_rank[row, col]),
+                       "faculty_count": int(faculty_count[col]),
+                       "faculty_percentile": float(faculty_percentile[row, col])}
+            if departments is not None and not np.isnan(department_rank[row, col]):
+                ranking.update({"department": professor_departments.iloc[row],
+                                "department_rank": int(department_rank[row, col]),
+                                "department_count": int(department_count[row, col]),
+                                "department_percentile": float(department_percentile[row, col])})
+            ranks.append(ranking)
+        rankings[professor] = ranks
+    return rankings
+
+def attach_question_rankings(aggregates, rankings):
+    """
+    Add each question's ranking (see compute_question_rankings) to the report aggregates
+    """
+    ranks = (rankings or {}).get(aggregates["professor"]) or []
+    for question, ranking in zip(aggregates.get("questions", []), ranks):
+        question["ranking"] = ranking
+
+
+# CHART RENDERING
+# Every chart is a module-level function of plain values, so it can run in a worker process.
+# Figures are created without pyplot, which keeps no global state between charts.
+
+def _save_figure(fig, output, dpi):
+    # .svg paths and text buffers (inline charts of the HTML report) get vector output
+    if isinstance(output, io.TextIOBase) or (isinstance(output, str) and output.endswith('.svg')):
+        fig.savefig(output, bbox_inches='tight', format='svg')
     else:
-        c.setFont(unicode_font, 12)
-        c.drawString(50, 400, f"Timestamp column '{timestamp_col}' not found in data")
+        fig.savefig(output, bbox_inches='tight', dpi=dpi)
+    return output
+
+def render_pie_chart(labels, values, title, output, dpi=150):
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=90)
+    
+    # Increase font sizes for better readability
+    for text in texts:
+        text.set_fontsize(14)
+        text.set_fontweight('bold')
+    for autotext in autotexts:
+        autotext.set_fontsize(12)
+        autotext.set_fontweight('bold')
+        autotext.set_color('white')
+    
+    ax.set_title(title, fontsize=20, fontweight='bold', pad=30)
+    ax.axis('equal')  # Equal aspect ratio ensures that pie is drawn as a circle
+    
+    return _save_figure(fig, output, dpi)
+
+def render_bar_chart(labels, values, title, xlabel, color, edgecolor, output, dpi=150):
+    fig = Figure(figsize=(12, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    bars = ax.bar(range(len(values)), values, color=color, edgecolor=edgecolor, linewidth=1.5)
+    
+    # Customize the chart
+    ax.set_title(title, fontsize=20, fontweight='bold', pad=30)
+    ax.set_xlabel(xlabel, fontsize=16, fontweight='bold')
+    ax.set_ylabel('Number of Students', fontsize=16, fontweight='bold')
+    
+    # Set x-axis labels
+    ax.set_xticks(range(len(values)))
+    ax.set_xticklabels(labels, rotation=45, fontsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    
+    # Add value labels on top of bars
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=12)
+    
+    # Add grid for better readability
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    fig.tight_layout()
+    return _save_figure(fig, output, dpi)
+
+def render_teaching_methods_chart(method_names, method_values, total_responses, output, dpi=150):
+    fig = Figure(figsize=(14, 10))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    bars = ax.bar(range(len(method_names)), method_values,
+                  color=['#4CAF50', '#2196F3', '#FF9800', '#9C27B0'],
+                  edgecolor='black', linewidth=1.5, alpha=0.8)
+    
+    # Customize the chart
+    ax.set_title('Teaching Methods Implementation', fontsize=20, fontweight='bold', pad=30)
+    ax.set_xlabel('Teaching Method', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Number of Students Reporting Method', fontsize=16, fontweight='bold')
+    
+    # Set x-axis labels
+    ax.set_xticks(range(len(method_names)))
+    ax.set_xticklabels(method_names, rotation=45, ha='right', fontsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    
+    # Add value labels on top of bars with percentages
+    for bar in bars:
+        height = bar.get_height()
+        percentage = (height / total_responses) * 100 if total_responses > 0 else 0
+        ax.text(bar.get_x() + bar.get_width()/2., height + 0.5,
+                f'{int(height)}\n({percentage:.1f}%)',
+                ha='center', va='bottom', fontweight='bold', fontsize=12)
+    
+    # Add grid for better readability
+    ax.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    fig.tight_layout()
+    return _save_figure(fig, output, dpi)
+
+def render_completion_trend_chart(dates, counts, output, dpi=150):
+    import matplotlib.dates as mdates
+    from datetime import datetime
+    
+    fig = Figure(figsize=(14, 8))
+    FigureCanvasAgg(fig)
+    ax = fig.add_subplot()
+    
+    # Convert dates back to datetime for plotting
+    plot_dates = [datetime.combine(date, datetime.min.time()) for date in dates]
+    
+    ax.plot(plot_dates, counts, marker='o', linewidth=3, markersize=8, color='#2E86C1')
+    
+    ax.set_title('Daily Form Completion Trends', fontsize=18, fontweight='bold', pad=30)
+    ax.set_xlabel('Date', fontsize=16, fontweight='bold')
+    ax.set_ylabel('Number of Completions', fontsize=16, fontweight='bold')
+    
+    # Format x-axis with human-readable dates
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%d %b'))
+    
+    # Adjust date locator based on data range
+    date_range_days = (max(dates) - min(dates)).days
+    if date_range_days <= 14:
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=1))
+    elif date_range_days <= 30:
+        ax.xaxis.set_major_locator(mdates.DayLocator(interval=2))
+    else:
+        ax.xaxis.set_major_locator(mdates.WeekdayLocator(interval=1))
+    
+    ax.tick_params(axis='x', labelrotation=45, labelsize=14)
+    ax.tick_params(axis='y', labelsize=14)
+    
+    # Set y-axis to show only integer values
+    ax.yaxis.set_major_locator(MaxNLocator(integer=True))
+    
+    # Add grid
+    ax.grid(True, alpha=0.3)
+    
+    # Add value labels on points
+    for date, count in zip(plot_dates, counts):
+        ax.annotate(f'{count}', (date, count), textcoords="offset points",
+                    xytext=(0,12), ha='center', fontsize=12, fontweight='bold')
+    
+    fig.tight_layout()
+    return _save_figure(fig, output, dpi)
+
+def render_pareto_chart(question_number, grades, counts, cumulative_percentages, output, dpi=150):
+    fig = Figure(figsize=(14, 10))
+    FigureCanvasAgg(fig)
+    ax1 = fig.add_subplot()
+    
+    # Bar chart for grade counts
+    bars = ax1.bar(range(len(grades)), counts, color='lightblue', alpha=0.8, edgecolor='darkblue', linewidth=1.5)
+    ax1.set_xlabel('Grade (1-10)', fontsize=16, fontweight='bold')
+    ax1.set_ylabel('Number of Students', fontsize=16, fontweight='bold', color='darkblue')
+    ax1.tick_params(axis='y', labelcolor='darkblue', labelsize=14)
+    ax1.tick_params(axis='x', labelsize=14)
+    
+    # Set x-axis labels
+    ax1.set_xticks(range(len(grades)))
+    ax1.set_xticklabels(grades)
+    
+    # Add value labels on bars
+    for bar in bars:
+        height = bar.get_height()
+        ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
+                 f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=12)
+    
+    # Line chart for cumulative percentage
+    ax2 = ax1.twinx()
+    ax2.plot(range(len(grades)), cumulative_percentages, color='red', marker='o',
+             linewidth=3, markersize=8, label='Cumulative %')
+    ax2.set_ylabel('Cumulative Percentage (%)', fontsize=16, fontweight='bold', color='red')
+    ax2.tick_params(axis='y', labelcolor='red', labelsize=14)
+    ax2.set_ylim(0, 100)
+    
+    # Add percentage labels on line points
+    for i, pct in enumerate(cumulative_percentages):
+        ax2.text(i, pct + 2, f'{pct:.1f}%', ha='center', va='bottom',
+                 fontweight='bold', fontsize=12, color='red')
+    
+    # Add grid
+    ax1.grid(axis='y', alpha=0.3, linestyle='--')
+    
+    # Title
+    ax2.set_title(f'Question {question_number} - Grade Distribution (Pareto Analysis)',
+                  fontsize=18, fontweight='bold', pad=30)
+    
+    fig.tight_layout()
+    return _save_figure(fig, output, dpi)
+
+def render_question_trends_chart(cycles, averages, output, dpi=150):
+    """
+    One small line chart per question with its average in each cycle
+    (averages[q][i] is the average of question q+1 in cycles[i], or None)
+    """
+    fig = Figure(figsize=(16, 12))
+    FigureCanvasAgg(fig)
+    axes = fig.subplots(3, 4, sharex=True, sharey=True)
+    positions = list(range(len(cycles)))
+    
+    for index, ax in enumerate(axes.flat):
+        if index >= len(averages):
+            ax.set_visible(False)
+            continue
+        values = [np.nan if value is None else value for value in averages[index]]
+        ax.plot(positions, values, marker='o', linewidth=2, markersize=6, color='#2E86C1')
+        ax.set_title(f'Question {index + 1}', fontsize=13, fontweight='bold')
+        ax.set_ylim(1, 10)
+        ax.grid(True, alpha=0.3)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(cycles, rotation=45, ha='right', fontsize=9)
+    
+    fig.suptitle('Question Averages by Evaluation Cycle', fontsize=20, fontweight='bold')
+    fig.tight_layout()
+    return _save_figure(fig, output, dpi)
+
+
+# Function to list the charts a report needs, as (key, function, arguments) jobs
+def plan_report_charts(aggregates, sections=None):
+    """
+    Describe every chart of the selected report sections (all by default) from
+    the aggregates. Each job is (key, render function, keyword arguments without
+    the output path).
+    """
+    jobs = []
+    for name, section in REPORT_SECTIONS.items():
+        if (sections is None or name in sections) and section["plan_charts"] is not None:
+            jobs.extend(section["plan_charts"](aggregates))
+    return jobs
+
+def _plan_trend_chart(aggregates):
+    trend = aggregates["trend"]
+    if trend["status"] != "ok":
+        return []
+    daily_counts = trend["daily_counts"]
+    return [("completion_trends", render_completion_trend_chart, {
+        "dates": list(daily_counts.index), "counts": daily_counts.values.tolist()})]
+
+def _plan_specialization_chart(aggregates):
+    spec_counts = aggregates["spec_counts"]
+    return [("specialization", render_pie_chart, {
+        "labels": list(spec_counts.index), "values": spec_counts.values.tolist(),
+        "title": 'Student Specialization Distribution'})]
+
+# Chart of each distribution page: (render function, fixed arguments)
+DISTRIBUTION_CHARTS = {
+    "years": (render_pie_chart, {"title": 'Academic Year Distribution'}),
+    "courses": (render_pie_chart, {"title": 'Courses Distribution'}),
+    "attendance": (render_bar_chart, {"title": 'Student Attendance Rate Distribution', "xlabel": 'Attendance Rate',
+                                      "color": 'skyblue', "edgecolor": 'navy'}),
+    "workload": (render_bar_chart, {"title": 'Student Workload Distribution', "xlabel": 'Workload Level',
+                                    "color": 'lightcoral', "edgecolor": 'darkred'}),
+}
+
+def _plan_distribution_chart(aggregates, page):
+    key, counts_key, responses_key = page[:3]
+    if not aggregates[responses_key]:
+        return []
+    counts = aggregates[counts_key]
+    render, kwargs = DISTRIBUTION_CHARTS[key]
+    return [(key, render, dict(kwargs, labels=list(counts.index), values=counts.values.tolist()))]
+
+def _plan_teaching_methods_chart(aggregates):
+    method_counts = aggregates["method_counts"]
+    if method_counts is None:
+        return []
+    return [("teaching_methods", render_teaching_methods_chart, {
+        "method_names": list(method_counts.keys()), "method_values": list(method_counts.values()),
+        "total_responses": aggregates["total_responses"]})]
+
+def _plan_question_charts(aggregates):
+    jobs = []
+    for question in aggregates["questions"]:
+        if question["status"] == "ok":
+            jobs.append((f"question_{question['number']}", render_pareto_chart, {
+                "question_number": question["number"],
+                "grades": [str(grade) for grade, _ in question["sorted_grades"]],
+                "counts": [count for _, count in question["sorted_grades"]],
+                "cumulative_percentages": question["cumulative_percentages"]}))
+    return jobs
+
+def _plan_cycle_trends_chart(aggregates):
+    history = aggregates.get("history") or []
+    if len(history) < 2:
+        return []
+    averages = [[next((q["average"] for q in item["questions"] if q["number"] == question["number"]), None)
+                 for item in history]
+                for question in aggregates["questions"]]
+    return [("question_trends", render_question_trends_chart, {
+        "cycles": [item["cycle"] for item in history], "averages": averages})]
+
+CHART_FILE_SUFFIXES = {
+    "completion_trends": "_completion_trends",
+    "years": "_years",
+    "courses": "_courses",
+    "attendance": "_attendance",
+    "workload": "_workload",
+    "teaching_methods": "_teaching_methods",
+}
+
+def chart_file_path(chart_path, key):
+    """
+    File name of a chart derived from the main chart path (e.g. pie_chart_X_years.png)
+    """
+    if key == "specialization":
+        return chart_path
+    if key.startswith("question_"):
+        return chart_path.replace('.png', f'_{key}.png')
+    return chart_path.replace('.png', f'{CHART_FILE_SUFFIXES[key]}.png')
+
+# Function to render the charts of a report, optionally in parallel
+def render_report_charts(chart_jobs, chart_path, chart_executor=None):
+    """
+    Render every chart job to its file and return {key: path}.
+    
+    With a chart_executor (see create_chart_pool) all charts are submitted at once
+    and the values are futures; chart_file() waits for each chart only when the
+    page that shows it is drawn, so the report is assembled as charts arrive.
+    """
+    charts = {}
+    for key, render, kwargs in chart_jobs:
+        output = chart_file_path(chart_path, key)
+        if chart_executor is None:
+            charts[key] = render(output=output, **kwargs)
+            gc.collect()
+        else:
+            charts[key] = chart_executor.submit(render, output=output, **kwargs)
+    return charts
+
+def chart_file(charts, key):
+    """
+    Path of a rendered chart, waiting for it if it is still being rendered
+    """
+    chart = charts[key]
+    if isinstance(chart, Future):
+        chart = chart.result()
+        charts[key] = chart
+    return chart
+
+def discard_pending_charts(charts):
+    """
+    Cancel or wait for charts that are still rendering, so none is written
+    after its report failed and its files were cleaned up
+    """
+    for chart in charts.values():
+        if isinstance(chart, Future):
+            chart.cancel()
+            try:
+                chart.result()
+            except Exception:
+                pass
+
+def _lower_process_priority():
+    """
+    Run the current process below normal priority, so its work only uses spare CPU time
+    """
+    try:
+        import psutil
+        psutil.Process().nice(psutil.BELOW_NORMAL_PRIORITY_CLASS if os.name == 'nt' else 10)
+        return
+    except ImportError:
+        pass
+    except Exception:
+        return
+    
+    if hasattr(os, "nice"):
+        try:
+            os.nice(10)
+        except OSError:
+            pass
+
+def create_chart_pool(workers=None, low_priority=False):
+    """
+    Create a pool of processes for rendering the charts of a report in parallel.
+    Keep it around between reports: starting the processes is the expensive part.
+    With low_priority the processes run below normal priority (for speculative work).
+    """
+    if workers is None:
+        workers = min(4, os.cpu_count() or 1)
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_lower_process_priority if low_priority else None)
+
+# Bump when the look of the charts changes, so cached charts are not reused
+RENDER_CACHE_VERSION = 2
+RENDER_CACHE_MAX_AGE_DAYS = 30
+
+def chart_input_hash(key, render, kwargs):
+    """
+    Hash of everything a chart is drawn from: its render function and arguments
+    """
+    payload = json.dumps([RENDER_CACHE_VERSION, key, render.__name__, kwargs],
+                         sort_keys=True, default=str, ensure_ascii=False)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:32]
+
+def _render_into_cache(render, output, kwargs):
+    """
+    Render a chart next to its cache entry and rename it into place once complete,
+    so a concurrent run never picks up a half-written file
+    """
+    fd, tmp_path = tempfile.mkstemp(suffix=".png", dir=os.path.dirname(output))
+    os.close(fd)
+    try:
+        render(output=tmp_path, **kwargs)
+        os.replace(tmp_path, output)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+    return output
+
+# Function to render the charts of a report, reusing the charts cached by earlier runs
+def render_section_charts(aggregates, sections, chart_path, chart_executor=None, render_cache=None):
+    """
+    Plan and render the charts of the selected sections and return (charts, reused),
+    where reused tells for every chart whether it came from the cache.
+    
+    Without render_cache this is render_report_charts(plan_report_charts(...)). With
+    a render_cache folder, each chart is stored there under the hash of its inputs
+    (see chart_input_hash); a later report reuses every chart whose inputs did not
+    change and renders only the others, e.g. only the Pareto chart of the one
+    question whose grades changed. The cached files are never deleted with the
+    report's charts.
+    """
+    if render_cache is None:
+        jobs = plan_report_charts(aggregates, sections)
+        return render_report_charts(jobs, chart_path, chart_executor), {}
+    
+    os.makedirs(render_cache, exist_ok=True)
+    charts = {}
+    reused = {}
+    for key, render, kwargs in plan_report_charts(aggregates, sections):
+        path = os.path.join(render_cache, f"{key}_{chart_input_hash(key, render, kwargs)}.png")
+        reused[key] = os.path.exists(path)
+        if reused[key]:
+            os.utime(path)  # Keep entries in use from being pruned
+            charts[key] = path
+        elif chart_executor is None:
+            charts[key] = _render_into_cache(render, path, kwargs)
+            gc.collect()
+        else:
+            charts[key] = chart_executor.submit(_render_into_cache, render, path, kwargs)
+    return charts, reused
+
+# Function to compute one professor's report numbers outside of a generation run
+def professor_report_aggregates(data, professor, professor_index, sections=None, history_db=None, cycle=None):
+    """
+    The aggregates a report of the professor is drawn from, computed the way a
+    report does (only the inputs of the selected sections, with the stored cycle
+    history when history_db is given). None when the professor has no responses.
+    """
+    sections = resolve_sections(sections)
+    prof_data = professor_rows(data, professor_index, professor)
+    columns = resolve_report_columns(data)
+    spec_counts = prof_data[columns["specialization"]].value_counts()
+    if len(spec_counts) == 0:
+        return None
+    
+    aggregates = compute_professor_aggregates(professor, prof_data, columns,
+                                              resolve_question_texts(data, columns["questions"]), spec_counts,
+                                              section_inputs(sections, history=bool(history_db)))
+    if history_db:
+        attach_cycle_history(aggregates, prof_data, columns, history_db, cycle)
+    return aggregates
+
+# Function to render a professor's charts ahead of time, while the user is still choosing options
+def prerender_professor_charts(data, professor, professor_index, chart_executor, render_cache, sections=None,
+                               history_db=None, cycle=None):
+    """
+    Compute the professor's aggregates the way a report does and submit the charts
+    of the selected sections to chart_executor, rendering into render_cache. A report
+    generated afterwards with the same render_cache and options finds them there
+    (see render_section_charts) and only has to assemble the pages.
+    
+    Returns the charts as {key: path or Future}; cancelling the futures drops the
+    charts that have not started yet.
+    """
+    sections = resolve_sections(sections)
+    aggregates = professor_report_aggregates(data, professor, professor_index, sections, history_db, cycle)
+    if aggregates is None:
+        return {}
+    charts, _ = render_section_charts(aggregates, sections, None, chart_executor, render_cache)
+    return charts
+
+def prune_render_cache(render_cache, max_age_days=RENDER_CACHE_MAX_AGE_DAYS):
+    """
+    Delete cached section charts that no report has used for max_age_days
+    (and leftovers of interrupted renders)
+    """
+    if not render_cache or not os.path.isdir(render_cache):
+        return 0
+    cutoff = time.time() - max_age_days * 86400
+    removed = 0
+    for filename in os.listdir(render_cache):
+        path = os.path.join(render_cache, filename)
+        try:
+            if filename.startswith("tmp") and os.path.getmtime(path) < time.time() - 3600 \
+                    or os.path.getmtime(path) < cutoff:
+                os.unlink(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# Function to generate detailed PDF for each professor
+def generate_professor_pdf(output_path, chart_path, professor_name, spec_counts, total_students, specialization_col, prof_data, data=None,
+                           chart_executor=None):
+    # If data is not provided, try to read it from the default location
+    if data is None:
+        try:
+            data = read_excel("assets/QuestionPro-SR-RawData.xlsx")
+        except:
+            data = prof_data  # Fallback to professor data
+    
+    columns = resolve_report_columns(data)
+    aggregates = compute_professor_aggregates(professor_name, prof_data, columns,
+                                              resolve_question_texts(data, columns["questions"]), spec_counts)
+    aggregates["total_students"] = total_students
+    
+    write_professor_report(output_path, aggregates, chart_path, chart_executor)
+
+# Function to render the charts of one professor and draw the report
+def write_professor_report(output, aggregates, chart_path, chart_executor=None, sections=None, render_cache=None):
+    """
+    Write a standalone report from its aggregates to output (a path or a file object).
+    Every chart is started before the first page is drawn, so with a chart_executor
+    they render while the text is laid out. sections limits the report to those sections;
+    with render_cache, unchanged charts are reused from the cache.
+    """
+    c = canvas.Canvas(output, pagesize=letter)
+    
+    charts, _ = render_section_charts(aggregates, sections, chart_path, chart_executor, render_cache)
+    try:
+        draw_professor_report(c, aggregates, charts, sections=sections)
+    finally:
+        discard_pending_charts(charts)
+    
+    c.save()
+
+# Function to draw all report pages of one professor onto a canvas
+def draw_professor_report(c, aggregates, charts, outline_key=None, sections=None):
+    """
+    Draw the pages of one professor's report onto an existing canvas: the title
+    page, then every registered section (or only the given ones) in page order.
+    The last page is left open; the caller decides when to save or start the next page.
+    When outline_key is given, a bookmark is added for the professor and each section.
+    """
+    # Register Arial Unicode MS or DejaVu fonts for UTF-8 support
+    unicode_font = get_unicode_font()
+    
+    add_section_bookmark(c, outline_key, "title", str(aggregates["professor"]), level=0)
+    _draw_title_page(c, unicode_font, aggregates)
+    for name, section in REPORT_SECTIONS.items():
+        if sections is None or name in sections:
+            section["draw"](c, unicode_font, aggregates, charts, outline_key)
+
+def _draw_centered_chart(c, chart_path, y=50, max_width=400):
+    chart_width, chart_height = get_image_dimensions(chart_path, max_width=max_width)
+    x_position = (letter[0] - chart_width) / 2  # Center horizontally
+    c.drawImage(chart_path, x_position, y, width=chart_width, height=chart_height)
+
+def _draw_title_page(c, unicode_font, aggregates):
+    # NEW PAGE 1: TITLE PAGE WITH LOGO (the completion trends are drawn onto it as a section)
+    # Add university logo
+    logo_path = "assets/LOGO-ULBS_orizontal.png"
+    if os.path.exists(logo_path):
+        logo_width, logo_height = get_image_dimensions(logo_path, max_width=300)
+        # Center the logo horizontally
+        x_position = (letter[0] - logo_width) / 2
+        c.drawImage(logo_path, x_position, 650, width=logo_width, height=logo_height)
+    
+    # Professor name (emphasized)
+    c.setFont(unicode_font, 24)
+    c.drawString(50, 600, "Performance Evaluation Report")
+    
+    c.setFont(unicode_font, 20)
+    c.drawString(50, 570, f"Professor: {aggregates['professor']}")
+    
+    # Student completion statistics
+    c.setFont(unicode_font, 14)
+    c.drawString(50, 530, f"Total Students who Completed the Form: {aggregates['total_students']}")
     
     # Footer for title page
     c.setFont(unicode_font, 8)
     c.drawString(50, 50, f"Generated on: {pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+def _draw_completion_trends(c, unicode_font, aggregates, charts, outline_key):
+    # Daily completion trend chart, on the title page
+    add_section_bookmark(c, outline_key, "trends", "Completion Trends")
     
+    trend = aggregates["trend"]
+    if trend["status"] == "ok":
+        period_data = trend["daily_counts"]
+        min_date = period_data.index.min()
+        max_date = period_data.index.max()
+        
+        # Add the completion trends chart to PDF
+        completion_chart_path = chart_file(charts, "completion_trends")
+        chart_width, chart_height = get_image_dimensions(completion_chart_path, max_width=500)
+        c.drawImage(completion_chart_path, 50, 200, width=chart_width, height=chart_height)
+        
+        # Add summary statistics with human-readable format
+        c.setFont(unicode_font, 10)
+        peak_date_formatted = period_data.idxmax().strftime('%d %B')
+        c.drawString(50, 180, f"Peak completion day: {peak_date_formatted} ({period_data.max()} completions)")
+        c.drawString(50, 165, f"Average daily completions: {int(round(period_data.mean()))}")
+        c.drawString(50, 150, f"Total days with responses: {len(period_data)}")
+        c.drawString(50, 135, f"Data range: {min_date.strftime('%d %B')} to {max_date.strftime('%d %B')}")
+    else:
+        c.setFont(unicode_font, 12)
+        if trend["status"] == "no_valid_dates":
+            c.drawString(50, 400, "No valid timestamp data found for this professor")
+        elif trend["status"] == "no_timestamps":
+            c.drawString(50, 400, "No timestamp data available for this professor")
+        else:
+            c.drawString(50, 400, "Timestamp column 'Timestamp (dd/mm/yyyy)' not found in data")
+
+def _draw_specialization_page(c, unicode_font, aggregates, charts, outline_key):
     # PAGE 2: SPECIALIZATION REPORT (formerly page 1)
     c.showPage()  # Start new page for specialization report
+    add_section_bookmark(c, outline_key, "specializations", "Student Specializations")
+    
+    spec_counts = aggregates["spec_counts"]
+    total_students = aggregates["total_students"]
     
     # Title
     c.setFont(unicode_font, 26)
@@ -319,7 +2017,7 @@ def generate_professor_pdf(output_path, chart_path, professor_name, spec_counts,
     
     # Professor name
     c.setFont(unicode_font, 16)
-    c.drawString(50, 720, f"Professor: {professor_name}")
+    c.drawString(50, 720, f"Professor: {aggregates['professor']}")
     
     # Report details
     c.setFont(unicode_font, 12)
@@ -341,762 +2039,393 @@ def generate_professor_pdf(output_path, chart_path, professor_name, spec_counts,
             break
     
     # Add the main specialization chart (centered)
-    chart_width, chart_height = get_image_dimensions(chart_path)
-    x_position = (letter[0] - chart_width) / 2  # Center horizontally
-    c.drawImage(chart_path, x_position, 50, width=chart_width, height=chart_height)
-    
-    # Parse Level 3 data for additional charts
-    courses = []
-    years = []
+    _draw_centered_chart(c, chart_file(charts, "specialization"))
+
+# Pages 3-6 share one layout: (chart key, bookmark title, page title, response label, breakdown title, item unit)
+DISTRIBUTION_PAGES = [
+    ("years", "year_counts", "year_responses", "Academic Years", "Year Responses", "Academic Year Breakdown:", "students"),
+    ("courses", "course_counts", "course_responses", "Courses", "Course Responses", "Courses Breakdown:", "evaluations"),
+    ("attendance", "attendance_counts", "attendance_responses", "Student Attendance", "Attendance Responses", "Attendance Rate Breakdown:", "students"),
+    ("workload", "workload_counts", "workload_responses", "Student Workload", "Workload Responses", "Workload Level Breakdown:", "students"),
+]
+
+def _draw_distribution_page(c, unicode_font, aggregates, charts, outline_key, page):
+    # PAGES 3-6: YEAR, COURSE, ATTENDANCE OR WORKLOAD DISTRIBUTION
+    total_professor_responses = aggregates["total_responses"]
+    key, counts_key, responses_key, title, responses_label, breakdown_title, unit = page
     
-    # Calculate total professor responses (will be used across all pages)
-    total_professor_responses = len(prof_data)
+    counts = aggregates[counts_key]
+    responses = aggregates[responses_key]
+    if responses == 0:
+        return
     
-    # Find the attendance column (immediately after "Level 3")
-    level3_index = data.columns.get_loc('Level 3')
-    attendance_col = data.columns[level3_index + 1]
-    workload_col = data.columns[level3_index + 2]
+    c.showPage()  # Start new page
+    add_section_bookmark(c, outline_key, key, title)
     
-    # Teaching method columns - the 4 columns immediately after workload
-    workload_index = data.columns.get_loc(workload_col)
-    teaching_method_cols = []
-    for i in range(1, 5):  # Get the next 4 columns after workload
-        if workload_index + i < len(data.columns):
-            teaching_method_cols.append(data.columns[workload_index + i])
+    no_response = total_professor_responses - responses
     
-    # Question columns - the 12 columns immediately after teaching methods
-    question_cols = []
-    for i in range(5, 17):  # Get the next 12 columns after workload (positions 5-16 after workload)
-        if workload_index + i < len(data.columns):
-            question_cols.append(data.columns[workload_index + i])
-    
-    # Comment columns - the 3 columns immediately after question columns
-    comment_cols = []
-    for i in range(17, 20):  # Get the next 3 columns after questions (positions 17-19 after workload)
-        if workload_index + i < len(data.columns):
-            comment_cols.append(data.columns[workload_index + i])
-    
-    for level3_value in prof_data['Level 3']:
-        course, year = parse_level3_data(level3_value)
-        if course:
-            courses.append(course)
-        if year:
-            years.append(year)
-    
-    # PAGE 3: YEAR DISTRIBUTION
-    if years:
-        c.showPage()  # Start new page
-        year_counts = pd.Series(years).value_counts()
-        
-        # Create year distribution chart
-        plt.figure(figsize=(12, 10))
-        wedges, texts, autotexts = plt.pie(year_counts.values, labels=year_counts.index, autopct='%1.1f%%', startangle=90)
-        
-        # Increase font sizes for better readability
-        for text in texts:
-            text.set_fontsize(14)
-            text.set_fontweight('bold')
-        for autotext in autotexts:
-            autotext.set_fontsize(12)
-            autotext.set_fontweight('bold')
-            autotext.set_color('white')
-        
-        plt.title('Academic Year Distribution', 
-                 fontsize=20, fontweight='bold', pad=30)
-        plt.axis('equal')
-        
-        # Add subtitle with additional information
-        years_no_response = total_professor_responses - len(years)
-        
-        year_chart_path = chart_path.replace('.png', '_years.png')
-        plt.savefig(year_chart_path, bbox_inches='tight', dpi=150)
-        plt.close()
-        plt.clf()
-        gc.collect()
-        
-        # Page 3 content
-        c.setFont(unicode_font, 26)
-        c.drawString(50, 750, "Academic Years")
-        
-        c.setFont(unicode_font, 16)
-        c.drawString(50, 720, f"Professor: {professor_name}")
-        
-        c.setFont(unicode_font, 12)
-        c.drawString(50, 690, f"Total Students for Professor: {total_professor_responses}")
-        c.drawString(50, 670, f"Year Responses: {len(years)}")
-        c.drawString(50, 650, f"Students with No Response: {years_no_response}")
-        c.drawString(50, 630, f"Response Rate: {(len(years)/total_professor_responses)*100:.1f}%")
-        
-        # Year breakdown
-        c.setFont(unicode_font, 14)
-        c.drawString(50, 600, "Academic Year Breakdown:")
-        
-        c.setFont(unicode_font, 10)
-        y_position = 580
-        for year, count in year_counts.items():
-            percentage_of_responses = (count / len(years)) * 100
-            percentage_of_total = (count / total_professor_responses) * 100
-            text = f"• {year}: {count} students ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total)"
-            c.drawString(70, y_position, text)
-            y_position -= 15
-            if y_position < 320:  # Leave space for chart
-                break
-        
-        # Add no response information
-        if years_no_response > 0:
-            percentage_no_response = (years_no_response / total_professor_responses) * 100
-            c.drawString(70, y_position, f"• No Response: {years_no_response} students ({percentage_no_response:.1f}% of total)")
-        
-        year_chart_width, year_chart_height = get_image_dimensions(year_chart_path)
-        x_position = (letter[0] - year_chart_width) / 2  # Center horizontally
-        c.drawImage(year_chart_path, x_position, 50, width=year_chart_width, height=year_chart_height)
-    
-    # PAGE 4: COURSE DISTRIBUTION
-    if courses:
-        c.showPage()  # Start new page
-        course_counts = pd.Series(courses).value_counts()
-        
-        # Create course distribution chart
-        plt.figure(figsize=(12, 10))
-        wedges, texts, autotexts = plt.pie(course_counts.values, labels=course_counts.index, autopct='%1.1f%%', startangle=90)
-        
-        # Increase font sizes for better readability
-        for text in texts:
-            text.set_fontsize(14)
-            text.set_fontweight('bold')
-        for autotext in autotexts:
-            autotext.set_fontsize(12)
-            autotext.set_fontweight('bold')
-            autotext.set_color('white')
-        
-        plt.title('Courses Distribution', 
-                 fontsize=20, fontweight='bold', pad=30)
-        plt.axis('equal')
-        
-        # Add subtitle with additional information
-        courses_no_response = total_professor_responses - len(courses)
-        
-        course_chart_path = chart_path.replace('.png', '_courses.png')
-        plt.savefig(course_chart_path, bbox_inches='tight', dpi=150)
-        plt.close()
-        plt.clf()
-        gc.collect()
-        
-        # Page 4 content
-        c.setFont(unicode_font, 26)
-        c.drawString(50, 750, "Courses")
-        
-        c.setFont(unicode_font, 16)
-        c.drawString(50, 720, f"Professor: {professor_name}")
-        
-        c.setFont(unicode_font, 12)
-        c.drawString(50, 690, f"Total Students for Professor: {total_professor_responses}")
-        c.drawString(50, 670, f"Course Responses: {len(courses)}")
-        c.drawString(50, 650, f"Students with No Response: {courses_no_response}")
-        c.drawString(50, 630, f"Response Rate: {(len(courses)/total_professor_responses)*100:.1f}%")
-        
-        # Course breakdown
-        c.setFont(unicode_font, 14)
-        c.drawString(50, 600, "Courses Breakdown:")
-        
-        c.setFont(unicode_font, 10)
-        y_position = 580
-        for course, count in course_counts.items():
-            percentage_of_responses = (count / len(courses)) * 100
-            percentage_of_total = (count / total_professor_responses) * 100
-            text = f"• {course}: {count} evaluations ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total)"
-            c.drawString(70, y_position, text)
-            y_position -= 15
-            if y_position < 320:  # Leave space for chart
-                break
-        
-        # Add no response information
-        if courses_no_response > 0:
-            percentage_no_response = (courses_no_response / total_professor_responses) * 100
-            c.drawString(70, y_position, f"• No Response: {courses_no_response} students ({percentage_no_response:.1f}% of total)")
-        
-        course_chart_width, course_chart_height = get_image_dimensions(course_chart_path)
-        x_position = (letter[0] - course_chart_width) / 2  # Center horizontally
-        c.drawImage(course_chart_path, x_position, 50, width=course_chart_width, height=course_chart_height)
+    c.setFont(unicode_font, 26)
+    c.drawString(50, 750, title)
     
-    # PAGE 5: ATTENDANCE DISTRIBUTION
-    # Get attendance data for this professor
-    attendance_data = prof_data[attendance_col].dropna()
-    total_professor_responses = len(prof_data)
-    attendance_no_response = total_professor_responses - len(attendance_data)
+    c.setFont(unicode_font, 16)
+    c.drawString(50, 720, f"Professor: {aggregates['professor']}")
     
-    if len(attendance_data) > 0:
-        c.showPage()  # Start new page
-        attendance_counts = attendance_data.value_counts().sort_index()
-        
-        # Create attendance distribution bar chart
-        plt.figure(figsize=(12, 10))
-        bars = plt.bar(range(len(attendance_counts)), attendance_counts.values, 
-                      color='skyblue', edgecolor='navy', linewidth=1.5)
-        
-        # Customize the chart
-        plt.title('Student Attendance Rate Distribution', 
-                 fontsize=20, fontweight='bold', pad=30)
-        plt.xlabel('Attendance Rate', fontsize=16, fontweight='bold')
-        plt.ylabel('Number of Students', fontsize=16, fontweight='bold')
-        
-        # Set x-axis labels
-        plt.xticks(range(len(attendance_counts)), attendance_counts.index, rotation=45, fontsize=14)
-        plt.yticks(fontsize=14)
-        
-        # Add value labels on top of bars
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=12)
-        
-        # Add grid for better readability
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        
-        attendance_chart_path = chart_path.replace('.png', '_attendance.png')
-        plt.savefig(attendance_chart_path, bbox_inches='tight', dpi=150)
-        plt.close()
-        plt.clf()
-        gc.collect()
-        
-        # Page 5 content
-        c.setFont(unicode_font, 26)
-        c.drawString(50, 750, "Student Attendance")
-        
-        c.setFont(unicode_font, 16)
-        c.drawString(50, 720, f"Professor: {professor_name}")
-        
-        c.setFont(unicode_font, 12)
-        c.drawString(50, 690, f"Total Students for Professor: {total_professor_responses}")
-        c.drawString(50, 670, f"Attendance Responses: {len(attendance_data)}")
-        c.drawString(50, 650, f"Students with No Response: {attendance_no_response}")
-        c.drawString(50, 630, f"Response Rate: {(len(attendance_data)/total_professor_responses)*100:.1f}%")
-        
-        # Attendance breakdown
-        c.setFont(unicode_font, 14)
-        c.drawString(50, 600, "Attendance Rate Breakdown:")
-        
-        c.setFont(unicode_font, 10)
-        y_position = 580
-        for attendance_rate, count in attendance_counts.items():
-            percentage_of_responses = (count / len(attendance_data)) * 100
-            percentage_of_total = (count / total_professor_responses) * 100
-            text = f"• {attendance_rate}: {count} students ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total)"
-            c.drawString(70, y_position, text)
-            y_position -= 15
-            if y_position < 320:  # Leave space for chart
-                break
-        
-        # Add no response information
-        if attendance_no_response > 0:
-            percentage_no_response = (attendance_no_response / total_professor_responses) * 100
-            c.drawString(70, y_position, f"• No Response: {attendance_no_response} students ({percentage_no_response:.1f}% of total)")
-        
-        attendance_chart_width, attendance_chart_height = get_image_dimensions(attendance_chart_path)
-        x_position = (letter[0] - attendance_chart_width) / 2  # Center horizontally
-        c.drawImage(attendance_chart_path, x_position, 50, width=attendance_chart_width, height=attendance_chart_height)
+    c.setFont(unicode_font, 12)
+    c.drawString(50, 690, f"Total Students for Professor: {total_professor_responses}")
+    c.drawString(50, 670, f"{responses_label}: {responses}")
+    c.drawString(50, 650, f"Students with No Response: {no_response}")
+    c.drawString(50, 630, f"Response Rate: {(responses/total_professor_responses)*100:.1f}%")
     
-    # PAGE 6: WORKLOAD DISTRIBUTION
-    # Get workload data for this professor
-    workload_data = prof_data[workload_col].dropna()
-    workload_no_response = total_professor_responses - len(workload_data)
+    # Breakdown
+    c.setFont(unicode_font, 14)
+    c.drawString(50, 600, breakdown_title)
     
-    if len(workload_data) > 0:
-        c.showPage()  # Start new page
-        
-        # Define custom order for workload levels
-        workload_order = ["Foarte mic", "Mic", "Mediu", "Mare", "Foarte mare"]
-        
-        # Get value counts and reorder according to custom order
-        workload_counts_raw = workload_data.value_counts()
-        workload_counts = pd.Series(dtype='int64')
-        
-        # Reorder according to the specified order, including zeros for missing categories
-        for level in workload_order:
-            if level in workload_counts_raw.index:
-                workload_counts[level] = workload_counts_raw[level]
-            else:
-                workload_counts[level] = 0  # Add zero count for missing categories
-        
-        # Add any levels not in the predefined order at the end
-        for level in workload_counts_raw.index:
-            if level not in workload_order:
-                workload_counts[level] = workload_counts_raw[level]
-        
-        # Create workload distribution bar chart
-        plt.figure(figsize=(12, 10))
-        bars = plt.bar(range(len(workload_counts)), workload_counts.values, 
-                      color='lightcoral', edgecolor='darkred', linewidth=1.5)
-        
-        # Customize the chart
-        plt.title('Student Workload Distribution', 
-                 fontsize=20, fontweight='bold', pad=30)
-        plt.xlabel('Workload Level', fontsize=16, fontweight='bold')
-        plt.ylabel('Number of Students', fontsize=16, fontweight='bold')
-        
-        # Set x-axis labels
-        plt.xticks(range(len(workload_counts)), workload_counts.index, rotation=45, fontsize=14)
-        plt.yticks(fontsize=14)
-        
-        # Add value labels on top of bars
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            plt.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                    f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=12)
-        
-        # Add grid for better readability
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
-        
-        plt.tight_layout()
-        
-        workload_chart_path = chart_path.replace('.png', '_workload.png')
-        plt.savefig(workload_chart_path, bbox_inches='tight', dpi=150)
-        plt.close()
-        plt.clf()
-        gc.collect()
-        
-        # Page 6 content
-        c.setFont(unicode_font, 26)
-        c.drawString(50, 750, "Student Workload")
-        
-        c.setFont(unicode_font, 16)
-        c.drawString(50, 720, f"Professor: {professor_name}")
-        
-        c.setFont(unicode_font, 12)
-        c.drawString(50, 690, f"Total Students for Professor: {total_professor_responses}")
-        c.drawString(50, 670, f"Workload Responses: {len(workload_data)}")
-        c.drawString(50, 650, f"Students with No Response: {workload_no_response}")
-        c.drawString(50, 630, f"Response Rate: {(len(workload_data)/total_professor_responses)*100:.1f}%")
-        
-        # Workload breakdown
-        c.setFont(unicode_font, 14)
-        c.drawString(50, 600, "Workload Level Breakdown:")
-        
-        c.setFont(unicode_font, 10)
-        y_position = 580
-        for workload_level, count in workload_counts.items():
-            percentage_of_responses = (count / len(workload_data)) * 100
-            percentage_of_total = (count / total_professor_responses) * 100
-            text = f"• {workload_level}: {count} students ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total)"
-            c.drawString(70, y_position, text)
-            y_position -= 15
-            if y_position < 320:  # Leave space for chart
-                break
-        
-        # Add no response information
-        if workload_no_response > 0:
-            percentage_no_response = (workload_no_response / total_professor_responses) * 100
-            c.drawString(70, y_position, f"• No Response: {workload_no_response} students ({percentage_no_response:.1f}% of total)")
-        
-        workload_chart_width, workload_chart_height = get_image_dimensions(workload_chart_path)
-        x_position = (letter[0] - workload_chart_width) / 2  # Center horizontally
-        c.drawImage(workload_chart_path, x_position, 50, width=workload_chart_width, height=workload_chart_height)
+    c.setFont(unicode_font, 10)
+    y_position = 580
+    for label, count in counts.items():
+        percentage_of_responses = (count / responses) * 100
+        percentage_of_total = (count / total_professor_responses) * 100
+        text = f"• {label}: {count} {unit} ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total)"
+        c.drawString(70, y_position, text)
+        y_position -= 15
+        if y_position < 320:  # Leave space for chart
+            break
+    
+    # Add no response information
+    if no_response > 0:
+        percentage_no_response = (no_response / total_professor_responses) * 100
+        c.drawString(70, y_position, f"• No Response: {no_response} students ({percentage_no_response:.1f}% of total)")
     
+    _draw_centered_chart(c, chart_file(charts, key))
+
+def _draw_teaching_methods_page(c, unicode_font, aggregates, charts, outline_key):
     # PAGE 7: TEACHING METHODS DISTRIBUTION
-    # Analyze teaching methods from the 4 columns after workload
-    if teaching_method_cols and len(prof_data) > 0:
-        c.showPage()  # Start new page
-        
-        total_responses = len(prof_data)
-        
-        # Count each teaching method type from the 4 columns
-        method_counts = {
-            'Predare CLASICĂ': 0,
-            'Predare online SINCRONĂ': 0,
-            'Predare online ASINCRONĂ': 0,
-            'Predare MIXTĂ': 0
-        }
-        
-        method_names_mapping = [
-            'Predare CLASICĂ',
-            'Predare online SINCRONĂ',
-            'Predare online ASINCRONĂ',
-            'Predare MIXTĂ'
-        ]
-        
-        # Count non-null values in each teaching method column
-        for i, col in enumerate(teaching_method_cols):
-            if i < len(method_names_mapping):
-                method_name = method_names_mapping[i]
-                # Count non-null values (implemented methods)
-                implemented_count = prof_data[col].notna().sum()
-                method_counts[method_name] = implemented_count
-        
-        # Create teaching methods distribution bar chart
-        method_names = list(method_counts.keys())
-        method_values = list(method_counts.values())
+    method_counts = aggregates["method_counts"]
+    if method_counts is None:
+        return
+    
+    c.showPage()  # Start new page
+    add_section_bookmark(c, outline_key, "teaching_methods", "Teaching Methods")
+    
+    total_responses = aggregates["total_responses"]
+    
+    # Page 7 content
+    c.setFont(unicode_font, 26)
+    c.drawString(50, 750, "Teaching Methods")
+    
+    c.setFont(unicode_font, 16)
+    c.drawString(50, 720, f"Professor: {aggregates['professor']}")
+    
+    c.setFont(unicode_font, 12)
+    c.drawString(50, 690, f"Total Student Responses: {total_responses}")
+    c.drawString(50, 670, f"Number of Teaching Methods Analyzed: {aggregates['teaching_method_columns']}")
+    
+    # Calculate overall statistics
+    total_method_implementations = sum(method_counts.values())
+    
+    c.drawString(50, 650, f"Total Method Implementations: {total_method_implementations}")
+    
+    # Teaching methods breakdown
+    c.setFont(unicode_font, 14)
+    c.drawString(50, 620, "Teaching Methods Breakdown:")
+    
+    c.setFont(unicode_font, 10)
+    y_position = 600
+    for method_name, count in method_counts.items():
+        percentage = (count / total_responses) * 100 if total_responses > 0 else 0
         
-        plt.figure(figsize=(14, 10))
-        bars = plt.bar(range(len(method_names)), method_values, 
-                      color=['#4CAF50', '#2196F3', '#FF9800', '#9C27B0'], 
-                      edgecolor='black', linewidth=1.5, alpha=0.8)
+        text = f"• {method_name}:"
+        c.drawString(70, y_position, text)
+        y_position -= 12
+        c.drawString(90, y_position, f"Used by: {count} students ({percentage:.1f}%)")
+        y_position -= 18
         
-        # Customize the chart
-        plt.title('Teaching Methods Implementation', 
-                 fontsize=20, fontweight='bold', pad=30)
-        plt.xlabel('Teaching Method', fontsize=16, fontweight='bold')
-        plt.ylabel('Number of Students Reporting Method', fontsize=16, fontweight='bold')
+        if y_position < 320:  # Leave space for chart
+            break
+    
+    _draw_centered_chart(c, chart_file(charts, "teaching_methods"))
+
+def _draw_question_pages(c, unicode_font, aggregates, charts, outline_key):
+    # PAGES 8-19: INDIVIDUAL EVALUATION QUESTIONS ANALYSIS (PARETO CHARTS)
+    # Create a separate page for each of the 12 evaluation questions
+    total_students = aggregates["total_responses"]
+    if total_students == 0:
+        return
+    
+    for question in aggregates["questions"]:
+        number = question["number"]
+        question_text = question["text"]
         
-        # Set x-axis labels
-        plt.xticks(range(len(method_names)), method_names, rotation=45, ha='right', fontsize=14)
-        plt.yticks(fontsize=14)
+        c.showPage()  # Start new page for each question
+        add_section_bookmark(c, outline_key, f"question_{number}", f"Question {number}")
         
-        # Add value labels on top of bars with percentages
-        for i, bar in enumerate(bars):
-            height = bar.get_height()
-            percentage = (height / total_responses) * 100 if total_responses > 0 else 0
-            plt.text(bar.get_x() + bar.get_width()/2., height + 0.5,
-                    f'{int(height)}\n({percentage:.1f}%)', 
-                    ha='center', va='bottom', fontweight='bold', fontsize=12)
+        if question["status"] == "ok":
+            responses = question["responses"]
+            no_response_count = total_students - responses
+            
+            # Page content
+            c.setFont(unicode_font, 24)
+            c.drawString(50, 750, f"Question {number} - Grade Distribution Analysis")
+            
+            c.setFont(unicode_font, 16)
+            c.drawString(50, 720, f"Professor: {aggregates['professor']}")
+            
+            # Question text (truncated if too long)
+            c.setFont(unicode_font, 11)
+            if len(question_text) > 80:
+                question_text_display = question_text[:77] + "..."
+            else:
+                question_text_display = question_text
+            c.drawString(50, 690, f"Question: {question_text_display}")
+            
+            c.setFont(unicode_font, 12)
+            c.drawString(50, 660, f"Total Students for Professor: {total_students}")
+            c.drawString(50, 640, f"Students who Responded: {responses}")
+            c.drawString(50, 620, f"Students with No Response: {no_response_count}")
+            c.drawString(50, 600, f"Response Rate: {(responses/total_students)*100:.1f}%")
+            c.drawString(50, 580, f"Average Score: {question['average']:.2f}/10")
+            
+            # Standing among colleagues (computed for all professors before generation)
+            ranking = question.get("ranking")
+            if ranking is not None:
+                c.setFont(unicode_font, 11)
+                c.drawString(330, 640, f"Faculty rank: {ranking['faculty_rank']} of {ranking['faculty_count']} "
+                                       f"(percentile {ranking['faculty_percentile']:.0f})")
+                if "department_rank" in ranking:
+                    c.drawString(330, 620, f"Department rank: {ranking['department_rank']} of {ranking['department_count']} "
+                                           f"(percentile {ranking['department_percentile']:.0f})")
+            
+            # Grade distribution breakdown
+            c.setFont(unicode_font, 14)
+            c.drawString(50, 550, "Grade Distribution (Pareto Order):")
+            
+            c.setFont(unicode_font, 10)
+            y_position = 530
+            for i, (grade, count) in enumerate(question["sorted_grades"]):  # All grades shown have responses > 0
+                percentage_of_responses = (count / responses) * 100
+                percentage_of_total = (count / total_students) * 100
+                cumulative_pct = question["cumulative_percentages"][i]
+                
+                text = f"• Grade {grade}: {count} students ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total) - Cumulative: {cumulative_pct:.1f}%"
+                c.drawString(70, y_position, text)
+                y_position -= 15
+                
+                if y_position < 340:  # Leave space for chart
+                    break
+            
+            _draw_centered_chart(c, chart_file(charts, f"question_{number}"))
         
-        # Add grid for better readability
-        plt.grid(axis='y', alpha=0.3, linestyle='--')
+        else:
+            if question["status"] == "no_valid_grades":
+                # No grades with responses (should not happen if there are responses)
+                title = f"Question {number} - No Valid Grades"
+                message = "No valid grades found for this question."
+            elif question["status"] == "no_numeric":
+                # No valid numeric data for this question
+                title = f"Question {number} - No Valid Data"
+                message = "No valid numeric responses found for this question."
+            else:
+                # No responses for this question
+                title = f"Question {number} - No Responses"
+                message = "No responses found for this question."
+            
+            c.setFont(unicode_font, 24)
+            c.drawString(50, 750, title)
+            
+            c.setFont(unicode_font, 16)
+            c.drawString(50, 720, f"Professor: {aggregates['professor']}")
+            
+            c.setFont(unicode_font, 12)
+            c.drawString(50, 690, f"Question: {question_text}")
+            c.drawString(50, 660, message)
+
+def _draw_cycle_trends_page(c, unicode_font, aggregates, charts, outline_key):
+    # TRENDS ACROSS EVALUATION CYCLES (only when earlier cycles are stored)
+    history = aggregates.get("history") or []
+    if len(history) < 2:
+        return
+    
+    c.showPage()
+    add_section_bookmark(c, outline_key, "cycle_trends", "Trends Across Cycles")
+    
+    c.setFont(unicode_font, 26)
+    c.drawString(50, 750, "Trends Across Evaluation Cycles")
+    
+    c.setFont(unicode_font, 16)
+    c.drawString(50, 720, f"Professor: {aggregates['professor']}")
+    
+    c.setFont(unicode_font, 12)
+    c.drawString(50, 690, f"Evaluation Cycles Compared: {len(history)}")
+    
+    # One line per cycle: students and the mean of the question averages
+    c.setFont(unicode_font, 14)
+    c.drawString(50, 660, "Cycle Summary:")
+    
+    c.setFont(unicode_font, 10)
+    y_position = 640
+    for item in history:
+        averages = [question["average"] for question in item["questions"] if question["average"] is not None]
+        overall = f"{sum(averages) / len(averages):.2f}/10" if averages else "n/a"
+        c.drawString(70, y_position, f"• {item['cycle']}: {item['total_students']} students, average score {overall}")
+        y_position -= 15
+        if y_position < 450:  # Leave space for chart
+            break
+    
+    _draw_centered_chart(c, chart_file(charts, "question_trends"), max_width=500)
+
+# Comment text: 10pt lines 12pt apart, from the indent at x=70 to the right margin,
+# with 15pt between comments and nothing below the footer space
+COMMENT_FONT_SIZE = 10
+COMMENT_LEADING = 12
+COMMENT_TEXT_WIDTH = letter[0] - 70 - 50
+COMMENT_GAP = 15
+COMMENT_PAGE_BOTTOM = 80
+
+def _draw_comment_pages(c, unicode_font, aggregates, charts, outline_key):
+    # PAGES 20-22: COMMENTS ANALYSIS
+    # Create pages for Pros, Cons, and "May Need Improvements" comments
+    total_students = aggregates["total_responses"]
+    if total_students == 0:
+        return
+    
+    # Widths are cached for this report's comments only
+    layout = TextLayout(unicode_font, COMMENT_FONT_SIZE, COMMENT_LEADING)
+    
+    for comment_index, section in enumerate(aggregates["comment_sections"]):
+        c.showPage()  # Start new page for each comment section
         
-        plt.tight_layout()
+        section_name = section["title"]
+        add_section_bookmark(c, outline_key, f"comments_{comment_index + 1}", section_name)
         
-        teaching_chart_path = chart_path.replace('.png', '_teaching_methods.png')
-        plt.savefig(teaching_chart_path, bbox_inches='tight', dpi=150)
-        plt.close()
-        plt.clf()
-        gc.collect()
+        comments = section["comments"]
+        total_comments = len(comments)
+        no_comment_count = total_students - total_comments
         
-        # Page 7 content
+        # Page header
         c.setFont(unicode_font, 26)
-        c.drawString(50, 750, "Teaching Methods")
+        c.drawString(50, 750, f"{section_name}")
         
         c.setFont(unicode_font, 16)
-        c.drawString(50, 720, f"Professor: {professor_name}")
+        c.drawString(50, 720, f"Professor: {aggregates['professor']}")
         
         c.setFont(unicode_font, 12)
-        c.drawString(50, 690, f"Total Student Responses: {total_responses}")
-        c.drawString(50, 670, f"Number of Teaching Methods Analyzed: {len(teaching_method_cols)}")
-        
-        # Calculate overall statistics
-        total_method_implementations = sum(method_values)
+        c.drawString(50, 690, f"Total Students for Professor: {total_students}")
+        c.drawString(50, 670, f"Students with Comments: {total_comments}")
+        c.drawString(50, 650, f"Students with No Comments: {no_comment_count}")
+        c.drawString(50, 630, f"Comment Rate: {(total_comments/total_students)*100:.1f}%")
         
-        c.drawString(50, 650, f"Total Method Implementations: {total_method_implementations}")
-        
-        # Teaching methods breakdown
+        # Comments section header
         c.setFont(unicode_font, 14)
-        c.drawString(50, 620, "Teaching Methods Breakdown:")
-        
-        c.setFont(unicode_font, 10)
-        y_position = 600
-        for i, (method_name, count) in enumerate(method_counts.items()):
-            percentage = (count / total_responses) * 100 if total_responses > 0 else 0
-            
-            text = f"• {method_name}:"
-            c.drawString(70, y_position, text)
-            y_position -= 12
-            c.drawString(90, y_position, f"Used by: {count} students ({percentage:.1f}%)")
-            y_position -= 18
-            
-            if y_position < 320:  # Leave space for chart
-                break
+        c.drawString(50, 600, f"{section_name} - Student Comments:")
         
-        teaching_chart_width, teaching_chart_height = get_image_dimensions(teaching_chart_path)
-        x_position = (letter[0] - teaching_chart_width) / 2  # Center horizontally
-        c.drawImage(teaching_chart_path, x_position, 50, width=teaching_chart_width, height=teaching_chart_height)
-    
-    # PAGES 8-19: INDIVIDUAL EVALUATION QUESTIONS ANALYSIS (PARETO CHARTS)
-    # Create a separate page for each of the 12 evaluation questions
-    if question_cols and len(prof_data) > 0:
+        # Display comments, wrapped by their measured width and placed page by page
+        y_position = 570
         
-        for q_index, col in enumerate(question_cols):
-            c.showPage()  # Start new page for each question
+        if total_comments > 0:
+            comment_lines = layout.wrap_all(comments, COMMENT_TEXT_WIDTH)
+            pages = paginate(comment_lines, COMMENT_LEADING, y_position, 690, COMMENT_PAGE_BOTTOM, COMMENT_GAP)
             
-            # Get the question text from the second row (index 1) of the original data
-            if len(data) > 1:
-                question_text = str(data.iloc[1, data.columns.get_loc(col)])
-            else:
-                question_text = f"Evaluation Question {q_index + 1}"
-            
-            # Get question data for this professor
-            question_data = prof_data[col].dropna()
-            total_responses_for_question = len(question_data)
-            no_response_count = len(prof_data) - total_responses_for_question
-            
-            if total_responses_for_question > 0:
-                # Convert to numeric and count grades 1-10
-                numeric_data = pd.to_numeric(question_data, errors='coerce').dropna()
-                
-                if len(numeric_data) > 0:
-                    # Count occurrences of each grade (1-10)
-                    grade_counts = {}
-                    for grade in range(1, 11):
-                        count = (numeric_data == grade).sum()
-                        if count > 0:  # Only include grades that have responses
-                            grade_counts[grade] = count
-                    
-                    # Sort by count (descending for Pareto)
-                    sorted_grades = sorted(grade_counts.items(), key=lambda x: x[1], reverse=True)
+            for page_number, placements in enumerate(pages):
+                if page_number > 0:
+                    c.showPage()
                     
-                    if len(sorted_grades) > 0:  # Only proceed if there are grades with responses
-                        # Prepare data for Pareto chart
-                        grades = [str(item[0]) for item in sorted_grades]
-                        counts = [item[1] for item in sorted_grades]
-                        
-                        # Calculate cumulative percentages
-                        total_count = sum(counts)
-                        cumulative_percentages = []
-                        cumulative_sum = 0
-                        for count in counts:
-                            cumulative_sum += count
-                            cumulative_percentages.append((cumulative_sum / total_count) * 100 if total_count > 0 else 0)
-                        
-                        # Create Pareto chart
-                        fig, ax1 = plt.subplots(figsize=(14, 10))
-                        
-                        # Bar chart for grade counts
-                        bars = ax1.bar(range(len(grades)), counts, color='lightblue', alpha=0.8, edgecolor='darkblue', linewidth=1.5)
-                        ax1.set_xlabel('Grade (1-10)', fontsize=16, fontweight='bold')
-                        ax1.set_ylabel('Number of Students', fontsize=16, fontweight='bold', color='darkblue')
-                        ax1.tick_params(axis='y', labelcolor='darkblue', labelsize=14)
-                        ax1.tick_params(axis='x', labelsize=14)
-                        
-                        # Set x-axis labels
-                        ax1.set_xticks(range(len(grades)))
-                        ax1.set_xticklabels(grades)
-                        
-                        # Add value labels on bars
-                        for i, bar in enumerate(bars):
-                            height = bar.get_height()
-                            ax1.text(bar.get_x() + bar.get_width()/2., height + 0.1,
-                                    f'{int(height)}', ha='center', va='bottom', fontweight='bold', fontsize=12)
-                        
-                        # Line chart for cumulative percentage
-                        ax2 = ax1.twinx()
-                        line = ax2.plot(range(len(grades)), cumulative_percentages, color='red', marker='o', 
-                                       linewidth=3, markersize=8, label='Cumulative %')
-                        ax2.set_ylabel('Cumulative Percentage (%)', fontsize=16, fontweight='bold', color='red')
-                        ax2.tick_params(axis='y', labelcolor='red', labelsize=14)
-                        ax2.set_ylim(0, 100)
-                        
-                        # Add percentage labels on line points
-                        for i, pct in enumerate(cumulative_percentages):
-                            ax2.text(i, pct + 2, f'{pct:.1f}%', ha='center', va='bottom', 
-                                    fontweight='bold', fontsize=12, color='red')
-                        
-                        # Add grid
-                        ax1.grid(axis='y', alpha=0.3, linestyle='--')
-                        
-                        # Title
-                        plt.title(f'Question {q_index + 1} - Grade Distribution (Pareto Analysis)', 
-                                 fontsize=18, fontweight='bold', pad=30)
-                        
-                        # Calculate average score
-                        avg_score = numeric_data.mean()
-                        
-                        plt.tight_layout()
-                        
-                        question_chart_path = chart_path.replace('.png', f'_question_{q_index + 1}.png')
-                        plt.savefig(question_chart_path, bbox_inches='tight', dpi=150)
-                        plt.close()
-                        plt.clf()
-                        gc.collect()
-                        
-                        # Page content
-                        c.setFont(unicode_font, 24)
-                        c.drawString(50, 750, f"Question {q_index + 1} - Grade Distribution Analysis")
-                        
-                        c.setFont(unicode_font, 16)
-                        c.drawString(50, 720, f"Professor: {professor_name}")
-                        
-                        # Question text (truncated if too long)
-                        c.setFont(unicode_font, 11)
-                        if len(question_text) > 80:
-                            question_text_display = question_text[:77] + "..."
-                        else:
-                            question_text_display = question_text
-                        c.drawString(50, 690, f"Question: {question_text_display}")
-                        
-                        c.setFont(unicode_font, 12)
-                        c.drawString(50, 660, f"Total Students for Professor: {len(prof_data)}")
-                        c.drawString(50, 640, f"Students who Responded: {total_responses_for_question}")
-                        c.drawString(50, 620, f"Students with No Response: {no_response_count}")
-                        c.drawString(50, 600, f"Response Rate: {(total_responses_for_question/len(prof_data))*100:.1f}%")
-                        c.drawString(50, 580, f"Average Score: {avg_score:.2f}/10")
-                        
-                        # Grade distribution breakdown
-                        c.setFont(unicode_font, 14)
-                        c.drawString(50, 550, "Grade Distribution (Pareto Order):")
-                        
-                        c.setFont(unicode_font, 10)
-                        y_position = 530
-                        for i, (grade, count) in enumerate(sorted_grades):  # All grades shown have responses > 0
-                            percentage_of_responses = (count / total_responses_for_question) * 100
-                            percentage_of_total = (count / len(prof_data)) * 100
-                            cumulative_pct = cumulative_percentages[i]
-                            
-                            text = f"• Grade {grade}: {count} students ({percentage_of_responses:.1f}% of responses, {percentage_of_total:.1f}% of total) - Cumulative: {cumulative_pct:.1f}%"
-                            c.drawString(70, y_position, text)
-                            y_position -= 15
-                            
-                            if y_position < 340:  # Leave space for chart
-                                break
-                        
-                        question_chart_width, question_chart_height = get_image_dimensions(question_chart_path)
-                        x_position = (letter[0] - question_chart_width) / 2  # Center horizontally
-                        c.drawImage(question_chart_path, x_position, 50, width=question_chart_width, height=question_chart_height)
-                    
-                    else:
-                        # No grades with responses (should not happen if total_responses_for_question > 0)
-                        c.setFont(unicode_font, 24)
-                        c.drawString(50, 750, f"Question {q_index + 1} - No Valid Grades")
-                        
-                        c.setFont(unicode_font, 16)
-                        c.drawString(50, 720, f"Professor: {professor_name}")
-                        
-                        c.setFont(unicode_font, 12)
-                        c.drawString(50, 690, f"Question: {question_text}")
-                        c.drawString(50, 660, f"No valid grades found for this question.")
-                
-                else:
-                    # No valid numeric data for this question
-                    c.setFont(unicode_font, 24)
-                    c.drawString(50, 750, f"Question {q_index + 1} - No Valid Data")
+                    # Repeat header on new page
+                    c.setFont(unicode_font, 26)
+                    c.drawString(50, 750, f"{section_name} (continued)")
                     
                     c.setFont(unicode_font, 16)
-                    c.drawString(50, 720, f"Professor: {professor_name}")
-                    
-                    c.setFont(unicode_font, 12)
-                    c.drawString(50, 690, f"Question: {question_text}")
-                    c.drawString(50, 660, f"No valid numeric responses found for this question.")
-            
-            else:
-                # No responses for this question
-                c.setFont(unicode_font, 24)
-                c.drawString(50, 750, f"Question {q_index + 1} - No Responses")
+                    c.drawString(50, 720, f"Professor: {aggregates['professor']}")
                 
-                c.setFont(unicode_font, 16)
-                c.drawString(50, 720, f"Professor: {professor_name}")
-                
-                c.setFont(unicode_font, 12)
-                c.drawString(50, 690, f"Question: {question_text}")
-                c.drawString(50, 660, f"No responses found for this question.")
-    
-    # PAGES 20-22: COMMENTS ANALYSIS
-    # Create pages for Pros, Cons, and "May Need Improvements" comments
-    if comment_cols and len(prof_data) > 0:
-        comment_section_names = [
-            "Positive Aspects (Pros)",
-            "Negative Aspects (Cons)", 
-            "Areas of Improvement"
-        ]
+                # A blue bullet at the first line of each comment, the text indented next to it;
+                # one text object for all bullets and one for all comment text of the page
+                draw_text_blocks(c, [(50, y, ["•"]) for _, y, _, continued in placements if not continued],
+                                 unicode_font, 14, color=(0.2, 0.4, 0.8))
+                draw_text_blocks(c, [(70, y, lines) for _, y, lines, _ in placements],
+                                 unicode_font, COMMENT_FONT_SIZE, COMMENT_LEADING)
         
-        for comment_index, col in enumerate(comment_cols):
-            c.showPage()  # Start new page for each comment section
-            
-            section_name = comment_section_names[comment_index]
-            
-            # Get comment data for this professor
-            comment_data = prof_data[col].dropna()
-            # Remove empty strings and whitespace-only comments
-            comment_data = comment_data[comment_data.str.strip() != '']
-            
-            total_comments = len(comment_data)
-            no_comment_count = len(prof_data) - total_comments
-            
-            # Page header
-            c.setFont(unicode_font, 26)
-            c.drawString(50, 750, f"{section_name}")
-            
-            c.setFont(unicode_font, 16)
-            c.drawString(50, 720, f"Professor: {professor_name}")
-            
+        else:
+            # No comments found
             c.setFont(unicode_font, 12)
-            c.drawString(50, 690, f"Total Students for Professor: {len(prof_data)}")
-            c.drawString(50, 670, f"Students with Comments: {total_comments}")
-            c.drawString(50, 650, f"Students with No Comments: {no_comment_count}")
-            c.drawString(50, 630, f"Comment Rate: {(total_comments/len(prof_data))*100:.1f}%")
-            
-            # Comments section header
-            c.setFont(unicode_font, 14)
-            c.drawString(50, 600, f"{section_name} - Student Comments:")
-            
-            # Display comments
-            y_position = 570
-            page_height_limit = 80  # Leave space for footer
-            
-            if total_comments > 0:
-                for comment in comment_data.reset_index(drop=True):
-                    # Calculate lines needed for this comment
-                    comment_str = str(comment)
-                    max_chars_per_line = 85  # Approximate characters per line
-                    
-                    # Split long comments into multiple lines
-                    comment_lines = []
-                    words = comment_str.split()
-                    current_line = ""
-                    
-                    for word in words:
-                        if len(current_line + " " + word) <= max_chars_per_line:
-                            if current_line:
-                                current_line += " " + word
-                            else:
-                                current_line = word
-                        else:
-                            if current_line:
-                                comment_lines.append(current_line)
-                            current_line = word
-                    
-                    if current_line:
-                        comment_lines.append(current_line)
-                    
-                    # Check if we need a new page
-                    lines_needed = len(comment_lines) + 2  # +2 for bullet and spacing
-                    if y_position - (lines_needed * 12) < page_height_limit:
-                        c.showPage()
-                        
-                        # Repeat header on new page
-                        c.setFont(unicode_font, 26)
-                        c.drawString(50, 750, f"{section_name} (continued)")
-                        
-                        c.setFont(unicode_font, 16)
-                        c.drawString(50, 720, f"Professor: {professor_name}")
-                        
-                        y_position = 690
-                    
-                    # Draw bullet point with emphasis
-                    c.setFont(unicode_font, 14)
-                    c.setFillColorRGB(0.2, 0.4, 0.8)  # Blue color for bullet
-                    c.drawString(50, y_position, "•")
-                    c.setFillColorRGB(0, 0, 0)  # Reset to black
-                    
-                    # Draw comment text with proper indentation (aligned with bullet)
-                    c.setFont(unicode_font, 10)
-                    
-                    for line_index, line in enumerate(comment_lines):
-                        if line_index == 0:
-                            # First line aligned horizontally with bullet
-                            c.drawString(70, y_position, line)
-                        else:
-                            # Subsequent lines align with first line
-                            c.drawString(70, y_position, line)
-                        y_position -= 12
-                    
-                    # Add spacing between comments
-                    y_position -= 15
-            
-            else:
-                # No comments found
-                c.setFont(unicode_font, 12)
-                c.setFillColorRGB(0.5, 0.5, 0.5)  # Gray color for "no comments"
-                c.drawString(70, y_position, "No comments provided by students for this section.")
-                c.setFillColorRGB(0, 0, 0)  # Reset to black
-            
-            # Footer
-            c.setFont(unicode_font, 8)
-    
-    c.save()
+            c.setFillColorRGB(0.5, 0.5, 0.5)  # Gray color for "no comments"
+            c.drawString(70, y_position, "No comments provided by students for this section.")
+            c.setFillColorRGB(0, 0, 0)  # Reset to black
+        
+        # Footer
+        c.setFont(unicode_font, 8)
+
+
+
+# REPORT SECTIONS
+# Each section declares the aggregates it reads and the charts it needs, so a report
+# of only some sections computes and renders only what those sections use.
+
+REPORT_SECTIONS = {}
+
+def register_report_section(name, draw, inputs=(), plan_charts=None):
+    """
+    Add a section to the professor report. draw(c, unicode_font, aggregates, charts,
+    outline_key) draws its pages, starting each one with c.showPage() (except a
+    section drawn onto the title page); inputs names the AGGREGATE_INPUTS it reads;
+    plan_charts(aggregates) returns its chart jobs (see plan_report_charts).
+    Sections are drawn in the order they are registered.
+    """
+    REPORT_SECTIONS[name] = {"draw": draw, "inputs": tuple(inputs), "plan_charts": plan_charts}
+
+register_report_section("trends", _draw_completion_trends, ["trend"], _plan_trend_chart)
+register_report_section("specialization", _draw_specialization_page, [], _plan_specialization_chart)
+for _page, _inputs in zip(DISTRIBUTION_PAGES, (["level3"], ["level3"], ["attendance"], ["workload"])):
+    register_report_section(_page[0], functools.partial(_draw_distribution_page, page=_page), _inputs,
+                            functools.partial(_plan_distribution_chart, page=_page))
+register_report_section("teaching_methods", _draw_teaching_methods_page, ["teaching_methods"],
+                        _plan_teaching_methods_chart)
+register_report_section("questions", _draw_question_pages, ["questions"], _plan_question_charts)
+register_report_section("cycle_trends", _draw_cycle_trends_page, ["questions"], _plan_cycle_trends_chart)
+register_report_section("comments", _draw_comment_pages, ["comments"])
+
+# Names that select several sections at once
+SECTION_GROUPS = {
+    "distributions": ["specialization", "years", "courses", "attendance", "workload", "teaching_methods"],
+    "grades": ["questions", "cycle_trends"],
+}
+
+def resolve_sections(names):
+    """
+    Turn section and group names into the section names to draw, in page order.
+    None (or no names) means the whole report.
+    """
+    if not names:
+        return None
+    selected = set()
+    for name in names:
+        if name in SECTION_GROUPS:
+            selected.update(SECTION_GROUPS[name])
+        elif name in REPORT_SECTIONS:
+            selected.add(name)
+        else:
+            raise ValueError(f"Unknown report section '{name}' (expected one of "
+                             f"{', '.join(list(REPORT_SECTIONS) + list(SECTION_GROUPS))})")
+    return [name for name in REPORT_SECTIONS if name in selected]
+
+def section_inputs(sections=None, history=False):
+    """
+    The AGGREGATE_INPUTS needed to draw the given sections (every section for None).
+    With history, the inputs of the stored cycle summary are added; only the
+    summary reads the rollup table, so it is left out otherwise.
+    """
+    if sections is None:
+        sections = REPORT_SECTIONS
+    inputs = {name for section in sections for name in REPORT_SECTIONS[section]["inputs"]}
+    if history:
+        inputs.update(["questions", "rollup"])
+    return tuple(name for name in AGGREGATE_INPUTS if name in inputs)
 
-def cleanup_temp_folder():
+
+def cleanup_temp_folder(temp_dir="temp"):
     """
-    Clean up the temp folder by removing all files inside it
+    Clean up the temp folder by removing all files inside it.
+    Note: this also removes the workspaces of runs that are still in progress;
+    runs clean up their own workspace, so only call this when nothing is running.
     """
-    temp_dir = "temp"
     if os.path.exists(temp_dir):
         # Remove all files and subdirectories in temp folder
         for filename in os.listdir(temp_dir):
@@ -1110,15 +2439,106 @@ def cleanup_temp_folder():
                 print(f'Failed to delete {file_path}. Reason: {e}')
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate professor evaluation PDF reports")
+    parser.add_argument("--excel", default="assets/QuestionPro-SR-RawData.xlsx", help="Workbook to read")
+    parser.add_argument("--professor", help="Generate only this professor's report")
+    parser.add_argument("--professors", nargs="+", metavar="NAME",
+                        help="Generate the reports of exactly these professors as one batch")
+    parser.add_argument("--all", action="store_true", help="Generate reports for all professors")
+    parser.add_argument("--shard", help="Process only shard I of N of the professors, e.g. 2/4")
+    parser.add_argument("--output-dir", default="output", help="Folder for the generated PDFs")
+    parser.add_argument("--workers", type=int, help="Render reports in this many recycled worker processes")
+    parser.add_argument("--reports-per-worker", type=int, default=25,
+                        help="Replace a worker process after this many reports")
+    parser.add_argument("--worker-memory-mb", type=int,
+                        help="Replace a worker once it uses more memory than this (MB)")
+    parser.add_argument("--chart-workers", type=int,
+                        help="Render the charts of each report in this many processes (without --workers)")
+    parser.add_argument("--stage-workers", nargs="+", metavar="STAGE=N", default=[],
+                        help="Threads per pipeline stage (aggregate, render, assemble, commit), e.g. render=2")
+    parser.add_argument("--merge-manifests", nargs="+", metavar="MANIFEST",
+                        help="Merge shard manifests and list missing reports instead of generating")
+    parser.add_argument("--db", help="SQLite response store to generate reports from")
+    parser.add_argument("--import-excel", action="store_true",
+                        help="Import the --excel workbook into the --db store and exit")
+    parser.add_argument("--semester", help="Evaluation cycle of the imported rows (inferred from timestamps by default)")
+    parser.add_argument("--history-db", help="Save report aggregates per evaluation cycle here and add a trend section")
+    parser.add_argument("--cycle", help="Evaluation cycle the reports are saved under (inferred from timestamps by default)")
+    parser.add_argument("--search-comments", metavar="QUERY",
+                        help="Search the student comments in the --db store and exit")
+    parser.add_argument("--sections", nargs="+", metavar="SECTION",
+                        help="Draw only these report sections or groups "
+                             "(e.g. comments, grades, distributions, questions, trends)")
+    parser.add_argument("--render-cache", metavar="DIR",
+                        help="Keep the report charts in this folder and re-render only the "
+                             "charts whose inputs changed since an earlier run")
+    parser.add_argument("--export-stats", action="store_true",
+                        help="Also export every report's statistics as JSON and CSV (and Parquet with pyarrow) "
+                             "to <output-dir>/statistics*")
+    parser.add_argument("--html", action="store_true",
+                        help="Write the reports as a static HTML site (<output-dir>/html/index.html) instead of PDFs")
+    parser.add_argument("--rollup", action="store_true",
+                        help="Write a department and faculty summary PDF from the stored aggregates "
+                             "(--history-db or --db; of --cycle, or each professor's latest cycle) and exit")
+    args = parser.parse_args()
+    if args.search_comments and not args.db:
+        parser.error("--search-comments requires --db")
+    
     # Create necessary directories
     os.makedirs("temp", exist_ok=True)
     os.makedirs("assets", exist_ok=True)
-    os.makedirs("output", exist_ok=True)
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    excel_file = args.excel
+    
+    if args.rollup:
+        import rollups
+        history_db = args.history_db or args.db
+        # Without stored aggregates, count the professors of the workbook instead
+        rollup_data = None if history_db else read_excel(excel_file)
+        rollups.generate_rollup_report(os.path.join(args.output_dir, "faculty_summary.pdf"), history_db,
+                                       args.cycle, rollup_data)
+        raise SystemExit(0)
     
-    excel_file = "assets/QuestionPro-SR-RawData.xlsx"
+    if args.db and args.search_comments:
+        import comment_index
+        comment_index.update_comment_index(args.db)
+        matches = comment_index.search_comments(args.db, args.search_comments, professor=args.professor,
+                                                 semester=args.semester)
+        for match in matches:
+            print(f"{match['professor']} | {match['semester']} | {match['section']}: {match['comment']}")
+        print(f"✓ {len(matches)} comments found")
+        raise SystemExit(0)
+    
+    statistics_path = os.path.join(args.output_dir, "statistics") if args.export_stats else None
+    
+    if args.db:
+        import response_store
+        if args.import_excel:
+            response_store.import_workbook(args.db, excel_file, semester=args.semester)
+        else:
+            # Query only the requested professors' rows instead of loading the workbook
+            professors = None if args.all or not (args.professor or args.professors) else \
+                args.professors or [args.professor]
+            response_store.generate_reports_from_store(args.db, professors, output_dir=args.output_dir,
+                                                       sections=args.sections, render_cache=args.render_cache,
+                                                       statistics_path=statistics_path)
+        raise SystemExit(0)
 
-    # Read data from Excel
+    # Read data from Excel and reject a malformed workbook before any report is started
     data = read_excel(excel_file)
+    try:
+        print(format_validation_report(validate_workbook(data)))
+    except WorkbookValidationError as e:
+        print(e)
+        raise SystemExit(1)
+    
+    if args.merge_manifests:
+        summary = merge_shard_manifests(args.merge_manifests, data)
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+        complete = not (summary["missing_shards"] or summary["failed"] or summary["unprocessed"])
+        print("✓ All reports present" if complete else "✗ Batch is incomplete")
+        raise SystemExit(0 if complete else 1)
 
     # Configuration: Choose to generate for all professors or a specific one
     # Set specific_professor to None for all professors, or provide a professor name
@@ -1126,9 +2546,30 @@ if __name__ == "__main__":
     specific_professor = "OPREANA ALIN"  # Change this to a professor name if you want only one
     
     # Example: specific_professor = None  # Uncomment and modify to generate for specific professor
+    if args.professor:
+        specific_professor = args.professor
+    if args.all or args.shard or args.professors:
+        specific_professor = None
+    
+    shard = None
+    if args.shard:
+        shard_index, shard_count = (int(part) for part in args.shard.split("/"))
+        shard = (shard_index, shard_count)
+    
+    if args.html:
+        import html_report
+        html_report.generate_html_site(data, os.path.join(args.output_dir, "html"), specific_professor,
+                                       sections=args.sections, history_db=args.history_db, cycle=args.cycle,
+                                       professors=args.professors)
+        raise SystemExit(0)
     
     # Create pie charts for selected professor(s) and generate individual PDFs
-    create_professor_pie_charts(data, specific_professor)
-
-    # Clean up temporary files
-    cleanup_temp_folder()
+    # (temporary charts are cleaned up by the run itself)
+    create_professor_pie_charts(data, specific_professor, output_dir=args.output_dir, shard=shard,
+                                workers=args.workers, max_reports_per_worker=args.reports_per_worker,
+                                max_worker_rss_mb=args.worker_memory_mb, chart_workers=args.chart_workers,
+                                stage_workers=dict((stage, int(count)) for stage, count in
+                                                   (item.split("=") for item in args.stage_workers)),
+                                history_db=args.history_db, cycle=args.cycle, sections=args.sections,
+                                render_cache=args.render_cache, statistics_path=statistics_path,
+                                professors=args.professors)
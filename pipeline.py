@@ -0,0 +1,111 @@
+"""
+Staged producer/consumer pipeline with bounded queues.
+
+Each stage runs in its own thread(s) and hands its output to the next stage
+through a bounded queue. A slow stage makes the earlier stages block instead
+of piling up work, so only a handful of items are in flight at any time and
+memory stays flat however many items go through.
+"""
+import queue
+import threading
+
+# Marks the end of the input of a stage
+_DONE = object()
+
+
+class Stage:
+    """
+    One step of a pipeline: fn(value) -> value, run by `workers` threads
+    """
+    def __init__(self, name, fn, workers=1):
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+
+
+def run_pipeline(items, stages, queue_size=2):
+    """
+    Pass every item through the stages and yield (item, result, error) tuples
+    as items leave the last stage (in completion order).
+
+    The first stage receives the item itself, every later stage the value returned
+    by the stage before. If a stage raises, the item skips the remaining stages and
+    is yielded with the error message. At most queue_size items wait between two
+    stages. Closing the generator early stops all stages.
+    """
+    stop = threading.Event()
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    def put(q, packet):
+        # Block while the next stage is busy, but give up once the pipeline is stopped
+        while not stop.is_set():
+            try:
+                q.put(packet, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def feed():
+        for item in items:
+            if not put(queues[0], (item, item, None)):
+                return
+        for _ in range(stages[0].workers):
+            put(queues[0], _DONE)
+
+    def get(q):
+        # Wait for the previous stage, but give up once the pipeline is stopped
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return None
+
+    def work(index, stage, remaining, lock):
+        inbox, outbox = queues[index], queues[index + 1]
+        while True:
+            packet = get(inbox)
+            if packet is None:
+                return
+            if packet is _DONE:
+                break
+            item, value, error = packet
+            if error is None:
+                try:
+                    value = stage.fn(value)
+                except Exception as e:
+                    value, error = None, str(e)
+            if not put(outbox, (item, value, error)):
+                return
+        # The last worker of a stage to finish tells the next stage there is no more input
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            next_workers = stages[index + 1].workers if index + 1 < len(stages) else 1
+            for _ in range(next_workers):
+                put(outbox, _DONE)
+
+    threads = [threading.Thread(target=feed, name="pipeline-feed", daemon=True)]
+    for index, stage in enumerate(stages):
+        remaining, lock = [stage.workers], threading.Lock()
+        for n in range(stage.workers):
+            threads.append(threading.Thread(target=work, args=(index, stage, remaining, lock),
+                                            name=f"pipeline-{stage.name}-{n + 1}", daemon=True))
+    for thread in threads:
+        thread.start()
+
+    try:
+        while True:
+            packet = queues[-1].get()
+            if packet is _DONE:
+                break
+            yield packet
+    finally:
+        # Stop every stage; items that are in the middle of a stage finish it first
+        stop.set()
+        for thread in threads:
+            thread.join()
@@ -0,0 +1,487 @@
+"""
+SQLite store of evaluation responses.
+
+import_workbook loads an exported workbook into a local database, with the report
+columns resolved the same way the PDF generator resolves them (by position around
+"Level 2" and "Level 3"). Responses are indexed by professor, course and semester,
+so one professor's report can be built from their rows alone, however many
+workbooks have been imported.
+
+Several workbooks (one export per faculty per semester) form one dataset. Each
+import only parses the new file: a workbook that was already imported is
+recognised by its checksum and skipped, and rows that earlier imports already
+stored (e.g. in overlapping exports) are skipped by their row hash; identical
+rows within one workbook are all kept. The comments of new rows are added to the
+comment search index (comment_index.py).
+"""
+import os
+import json
+import shutil
+import hashlib
+import sqlite3
+import numpy as np
+import pandas as pd
+
+from aggregate_store import infer_semesters, save_summaries
+from comment_index import update_comment_index
+from validation import validate_workbook, format_validation_report
+from stats_export import report_statistics, write_statistics
+from main import (read_excel, sort_by_professor, resolve_report_columns, resolve_question_texts, parse_level3_data,
+                  compute_professor_aggregates, attach_cycle_history,
+                  compute_question_rankings, attach_question_rankings, resolve_sections, section_inputs,
+                  write_professor_report, create_run_workspace, remove_professor_charts, sanitize_filename,
+                  atomic_write, prune_render_cache)
+
+N_METHODS = 4
+N_QUESTIONS = 12
+N_COMMENTS = 3
+
+METHOD_FIELDS = [f"method_{i}" for i in range(1, N_METHODS + 1)]
+QUESTION_FIELDS = [f"question_{i}" for i in range(1, N_QUESTIONS + 1)]
+COMMENT_FIELDS = [f"comment_{i}" for i in range(1, N_COMMENTS + 1)]
+
+# Answer columns are declared without a type so values keep the type they had in the workbook
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS workbooks (
+    id INTEGER PRIMARY KEY,
+    file_name TEXT NOT NULL,
+    sha256 TEXT NOT NULL UNIQUE,
+    imported_at TEXT NOT NULL,
+    semester TEXT,
+    row_count INTEGER NOT NULL DEFAULT 0,
+    duplicate_count INTEGER NOT NULL DEFAULT 0,
+    layout TEXT
+);
+CREATE TABLE IF NOT EXISTS responses (
+    id INTEGER PRIMARY KEY,
+    workbook_id INTEGER REFERENCES workbooks (id),
+    row_hash TEXT,
+    row_number INTEGER NOT NULL,
+    professor TEXT NOT NULL,
+    specialization,
+    level3,
+    course TEXT,
+    year TEXT,
+    semester TEXT,
+    submitted_at,
+    attendance,
+    workload,
+    {", ".join(METHOD_FIELDS)},
+    {", ".join(QUESTION_FIELDS)},
+    {", ".join(COMMENT_FIELDS)},
+    department TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_responses_professor ON responses (professor, row_number);
+CREATE INDEX IF NOT EXISTS idx_responses_course ON responses (course);
+CREATE INDEX IF NOT EXISTS idx_responses_semester ON responses (semester);
+CREATE INDEX IF NOT EXISTS idx_responses_row_hash ON responses (row_hash);
+CREATE TABLE IF NOT EXISTS store_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS question_totals (
+    professor TEXT NOT NULL,
+    question INTEGER NOT NULL,
+    total REAL NOT NULL,
+    responses INTEGER NOT NULL,
+    PRIMARY KEY (professor, question)
+);
+CREATE TABLE IF NOT EXISTS professor_departments (
+    professor TEXT NOT NULL,
+    department TEXT NOT NULL,
+    responses INTEGER NOT NULL,
+    PRIMARY KEY (professor, department)
+);
+"""
+
+RESPONSE_FIELDS = (["row_number", "professor", "specialization", "level3", "course", "year", "semester",
+                    "submitted_at", "attendance", "workload"]
+                   + METHOD_FIELDS + QUESTION_FIELDS + COMMENT_FIELDS + ["department"])
+
+
+def open_store(db_path):
+    """
+    Open (and create if needed) the response store at db_path
+    """
+    directory = os.path.dirname(os.path.abspath(db_path))
+    os.makedirs(directory, exist_ok=True)
+    conn = sqlite3.connect(db_path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def file_sha256(path):
+    """
+    Checksum of a file's contents, used to recognise a workbook that was already imported
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def row_hash(record):
+    """
+    Identify a response by its professor, course, timestamp and answers, so the same
+    response found in two exports is stored once. The position, the derived
+    course/year/semester fields and the department are left out.
+    """
+    _, professor, specialization, level3, _, _, _, *answers, _ = record
+    payload = json.dumps([professor, specialization, level3, *answers], ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def _workbook_layout(data, columns):
+    """
+    The workbook's column names and question texts, kept so rows read back
+    from the store have the layout the report generator expects
+    """
+    layout = {
+        "timestamp": columns["timestamp"],
+        "department": columns["department"],
+        "specialization": columns["specialization"],
+        "attendance": columns["attendance"],
+        "workload": columns["workload"],
+        "teaching_methods": list(columns["teaching_methods"]),
+        "questions": list(columns["questions"]),
+        "comments": list(columns["comments"]),
+        "question_texts": resolve_question_texts(data, columns["questions"]),
+    }
+    return json.dumps(layout, ensure_ascii=False, default=str)
+
+
+def _stored_hashes(conn, hashes):
+    """
+    The row hashes among hashes that rows already in the store have
+    """
+    conn.execute("CREATE TEMP TABLE IF NOT EXISTS import_hashes (row_hash TEXT PRIMARY KEY)")
+    conn.executemany("INSERT OR IGNORE INTO import_hashes (row_hash) VALUES (?)", ((value,) for value in hashes))
+    found = {value for (value,) in conn.execute(
+        "SELECT DISTINCT row_hash FROM responses WHERE row_hash IN (SELECT row_hash FROM import_hashes)")}
+    conn.execute("DROP TABLE import_hashes")
+    return found
+
+
+def _response_records(data, columns, semester=None, first_row_number=0):
+    """
+    Turn the workbook rows that name a professor into tuples in RESPONSE_FIELDS
+    order, with missing values as None
+    """
+    has_professor = data['Level 2'].notna().to_numpy()
+    rows = data[has_professor]
+    frame = pd.DataFrame(index=rows.index)
+    frame["row_number"] = first_row_number + np.flatnonzero(has_professor)
+    frame["professor"] = rows['Level 2'].astype(str)
+    frame["specialization"] = rows[columns["specialization"]]
+    frame["level3"] = rows['Level 3']
+
+    # Course and year are parsed once per distinct Level 3 value
+    codes, levels = pd.factorize(rows['Level 3'])
+    parsed = [parse_level3_data(level) for level in levels] + [(None, None)]
+    frame["course"] = np.array([course for course, _ in parsed], dtype=object)[codes]
+    frame["year"] = np.array([year for _, year in parsed], dtype=object)[codes]
+
+    timestamp_col = columns["timestamp"]
+    if timestamp_col is not None:
+        timestamps = pd.to_datetime(rows[timestamp_col], errors='coerce', dayfirst=True)
+        frame["semester"] = infer_semesters(timestamps) if semester is None else semester
+        frame["submitted_at"] = timestamps
+    else:
+        frame["semester"] = semester
+        frame["submitted_at"] = None
+
+    for field, col in ([("attendance", columns["attendance"]), ("workload", columns["workload"])]
+                       + list(zip(METHOD_FIELDS, columns["teaching_methods"]))
+                       + list(zip(QUESTION_FIELDS, columns["questions"]))
+                       + list(zip(COMMENT_FIELDS, columns["comments"]))):
+        frame[field] = rows[col]
+    department_col = columns["department"]
+    if department_col is not None:
+        frame["department"] = rows[department_col].astype(str).where(rows[department_col].notna())
+
+    # Answer columns keep the type they had in the workbook; timestamps are stored
+    # as ISO 8601 as parsed here (day first), not as the workbook's text
+    for field in frame.select_dtypes('datetime').columns:
+        frame[field] = frame[field].dt.round('s').dt.strftime('%Y-%m-%dT%H:%M:%S')
+    frame = frame.reindex(columns=RESPONSE_FIELDS).astype(object)
+    return list(frame.where(frame.notna(), None).itertuples(index=False, name=None))
+
+
+def import_workbook(db_path, excel_path, semester=None, progress_callback=None):
+    """
+    Add a workbook to the store. Only this file is parsed; a workbook that was
+    imported before is skipped, and rows already in the store are not added again.
+    semester names the evaluation cycle of every row; by default it is inferred
+    from each response's timestamp. Returns the number of new rows.
+    """
+    def report_progress(message):
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+
+    file_name = os.path.basename(excel_path)
+    digest = file_sha256(excel_path)
+
+    conn = open_store(db_path)
+    try:
+        if conn.execute("SELECT 1 FROM workbooks WHERE sha256 = ?", (digest,)).fetchone():
+            report_progress(f"⚠ {file_name} was already imported; skipping it")
+            return 0
+
+        data = read_excel(excel_path)
+        # A malformed workbook is rejected before any of its rows are stored
+        report_progress(format_validation_report(validate_workbook(data)))
+        columns = resolve_report_columns(data)
+        layout = _workbook_layout(data, columns)
+
+        with conn:
+            workbook_id = conn.execute(
+                "INSERT INTO workbooks (file_name, sha256, imported_at, semester, layout) VALUES (?, ?, ?, ?, ?)",
+                (file_name, digest, pd.Timestamp.now().isoformat(timespec='seconds'), semester, layout)).lastrowid
+            # The newest workbook's layout is used to read rows back
+            conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('layout', ?)", (layout,))
+
+            # New rows continue the numbering, so every professor's rows keep their import order
+            first_row_number = conn.execute("SELECT COALESCE(MAX(row_number) + 1, 0) FROM responses").fetchone()[0]
+            fields = ["workbook_id", "row_hash"] + RESPONSE_FIELDS
+            placeholders = ", ".join("?" for _ in fields)
+            records = _response_records(data, columns, semester, first_row_number)
+            hashes = [row_hash(record) for record in records]
+            # Only rows that earlier imports stored are duplicates; identical rows
+            # within this workbook are different students and are all kept
+            stored = _stored_hashes(conn, hashes)
+            new_rows = [(workbook_id, digest, *record) for digest, record in zip(hashes, records) if digest not in stored]
+            conn.executemany(f"INSERT INTO responses ({', '.join(fields)}) VALUES ({placeholders})", new_rows)
+            imported = len(new_rows)
+            duplicates = len(records) - imported
+            conn.execute("UPDATE workbooks SET row_count = ?, duplicate_count = ? WHERE id = ?",
+                         (imported, duplicates, workbook_id))
+            _update_question_totals(conn, workbook_id)
+    finally:
+        conn.close()
+
+    message = f"✓ Imported {imported} new responses from {file_name} into {db_path}"
+    if duplicates:
+        message += f" ({duplicates} already in the store were skipped)"
+    report_progress(message)
+
+    # Only the responses that were just added are indexed
+    update_comment_index(db_path, progress_callback)
+    return imported
+
+
+def list_workbooks(db_path):
+    """
+    Describe the workbooks that make up the dataset, in import order
+    """
+    conn = open_store(db_path)
+    try:
+        rows = conn.execute("""SELECT file_name, imported_at, semester, row_count, duplicate_count
+                               FROM workbooks ORDER BY id""").fetchall()
+    finally:
+        conn.close()
+    return [{"file_name": file_name, "imported_at": imported_at, "semester": semester,
+             "rows": row_count, "duplicates": duplicate_count}
+            for file_name, imported_at, semester, row_count, duplicate_count in rows]
+
+
+def list_professors(db_path):
+    """
+    Return the professors in the store, in alphabetical order
+    """
+    conn = open_store(db_path)
+    try:
+        return [row[0] for row in conn.execute("SELECT DISTINCT professor FROM responses ORDER BY professor")]
+    finally:
+        conn.close()
+
+
+def _read_layout(conn):
+    row = conn.execute("SELECT value FROM store_meta WHERE key = 'layout'").fetchone()
+    if row is None:
+        raise ValueError("The response store is empty; import a workbook first")
+    return json.loads(row[0])
+
+
+def _rows_to_frame(rows, layout):
+    """
+    Rebuild rows read from the store as a DataFrame with the workbook's column names,
+    in the positional order resolve_report_columns expects
+    """
+    frame = pd.DataFrame.from_records(rows, columns=["professor", "specialization", "level3", "submitted_at",
+                                                     "attendance", "workload"]
+                                      + METHOD_FIELDS + QUESTION_FIELDS + COMMENT_FIELDS + ["department"])
+    columns = {}
+    if layout["timestamp"] is not None:
+        columns[layout["timestamp"]] = pd.to_datetime(frame["submitted_at"], errors='coerce', format='ISO8601')
+    if layout["department"] is not None:
+        columns['Level 1'] = frame["department"]
+    columns[layout["specialization"]] = frame["specialization"]
+    columns['Level 2'] = frame["professor"]
+    columns['Level 3'] = frame["level3"]
+    columns[layout["attendance"]] = frame["attendance"]
+    columns[layout["workload"]] = frame["workload"]
+    for names, fields in ((layout["teaching_methods"], METHOD_FIELDS),
+                          (layout["questions"], QUESTION_FIELDS),
+                          (layout["comments"], COMMENT_FIELDS)):
+        for name, field in zip(names, fields):
+            columns[name] = frame[field]
+    return pd.DataFrame(columns)
+
+
+def load_professor_rows(db_path, professor):
+    """
+    Query one professor's responses through the professor index.
+    Returns (rows, question_texts); rows has the same column layout as the workbook.
+    """
+    conn = open_store(db_path)
+    try:
+        layout = _read_layout(conn)
+        rows = conn.execute(
+            f"""SELECT professor, specialization, level3, submitted_at, attendance, workload,
+                       {", ".join(METHOD_FIELDS + QUESTION_FIELDS + COMMENT_FIELDS)}, department
+                FROM responses WHERE professor = ? ORDER BY row_number""",
+            (str(professor),)).fetchall()
+    finally:
+        conn.close()
+    return _rows_to_frame(rows, layout), layout["question_texts"]
+
+
+def load_dataset(db_path):
+    """
+    Read every workbook in the store as one table, in the layout and order
+    read_excel returns (sorted by professor), ready for the report generator
+    """
+    conn = open_store(db_path)
+    try:
+        layout = _read_layout(conn)
+        rows = conn.execute(
+            f"""SELECT professor, specialization, level3, submitted_at, attendance, workload,
+                       {", ".join(METHOD_FIELDS + QUESTION_FIELDS + COMMENT_FIELDS)}, department
+                FROM responses ORDER BY row_number""").fetchall()
+    finally:
+        conn.close()
+    return sort_by_professor(_rows_to_frame(rows, layout)).reset_index(drop=True)
+
+
+def _update_question_totals(conn, workbook_id):
+    """
+    Add the grades of a workbook's new rows to the per-professor question totals and
+    department counts the rankings are computed from, inside the import's transaction
+    """
+    rows = conn.execute(f"SELECT professor, department, {', '.join(QUESTION_FIELDS)} FROM responses "
+                        "WHERE workbook_id = ?", (workbook_id,)).fetchall()
+    if not rows:
+        return
+
+    # Grades are averaged like question_means_matrix does: every numeric value counts
+    frame = pd.DataFrame.from_records(rows, columns=["professor", "department"] + QUESTION_FIELDS)
+    grouped = frame[QUESTION_FIELDS].apply(pd.to_numeric, errors='coerce').groupby(frame["professor"])
+    totals = grouped.sum()
+    counts = grouped.count()
+    conn.executemany(
+        """INSERT INTO question_totals (professor, question, total, responses) VALUES (?, ?, ?, ?)
+           ON CONFLICT (professor, question) DO UPDATE
+           SET total = total + excluded.total, responses = responses + excluded.responses""",
+        [(professor, number, float(totals.at[professor, field]), int(counts.at[professor, field]))
+         for professor in totals.index for number, field in enumerate(QUESTION_FIELDS, start=1)])
+
+    departments = frame.dropna(subset=["department"]).groupby(["professor", "department"]).size()
+    conn.executemany(
+        """INSERT INTO professor_departments (professor, department, responses) VALUES (?, ?, ?)
+           ON CONFLICT (professor, department) DO UPDATE SET responses = responses + excluded.responses""",
+        [(professor, department, int(count)) for (professor, department), count in departments.items()])
+
+
+def load_question_rankings(db_path):
+    """
+    Rank every professor's question averages against their colleagues
+    (see compute_question_rankings). The averages come from the totals kept up to
+    date by import_workbook, so this reads one row per professor and question
+    instead of the responses.
+    """
+    conn = open_store(db_path)
+    try:
+        totals = conn.execute("SELECT professor, question, total, responses FROM question_totals").fetchall()
+        # Most responses first, so each professor's first row is their department
+        departments = conn.execute("""SELECT professor, department FROM professor_departments
+                                      ORDER BY professor, responses DESC, department""").fetchall()
+    finally:
+        conn.close()
+
+    frame = pd.DataFrame.from_records(totals, columns=["professor", "question", "total", "responses"])
+    frame["average"] = frame["total"] / frame["responses"].where(frame["responses"] > 0)
+    means = frame.pivot(index="professor", columns="question", values="average")
+    department_of = None
+    if departments:
+        department_of = pd.DataFrame.from_records(departments, columns=["professor", "department"]) \
+            .drop_duplicates("professor").set_index("professor")["department"]
+    return compute_question_rankings(means, department_of)
+
+
+def generate_reports_from_store(db_path, professors=None, output_dir="output", progress_callback=None, sections=None,
+                                render_cache=None, statistics_path=None):
+    """
+    Generate professor reports straight from the store, querying only each
+    professor's rows. professors defaults to everyone in the store.
+    Each report's aggregates are saved in the store for the cycle trend section.
+    sections limits the reports to those sections (see resolve_sections), and
+    render_cache keeps the charts of unchanged sections between runs, and
+    statistics_path exports every report's numbers (see stats_export.py).
+    Returns the paths of the reports that were written.
+    """
+    sections = resolve_sections(sections)
+    inputs = section_inputs(sections, history=True)
+    prune_render_cache(render_cache)
+    if professors is None:
+        professors = list_professors(db_path)
+
+    def report_progress(message):
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+
+    # Ranks need every professor's averages, so they are computed once up front
+    rankings = load_question_rankings(db_path)
+
+    workspace = create_run_workspace()
+    generated_reports = []
+    statistics = []
+    try:
+        for i, professor in enumerate(professors):
+            report_progress(f"Processing professor {i+1}/{len(professors)}: {professor}")
+            chart_path = os.path.join(workspace, f"pie_chart_{i}_{sanitize_filename(professor)}.png")
+            try:
+                prof_data, question_texts = load_professor_rows(db_path, professor)
+                if len(prof_data) == 0:
+                    report_progress(f"⚠ No data found for professor: {professor}")
+                    continue
+
+                columns = resolve_report_columns(prof_data)
+                aggregates = compute_professor_aggregates(professor, prof_data, columns, question_texts,
+                                                          inputs=inputs)
+                attach_question_rankings(aggregates, rankings)
+                summaries = attach_cycle_history(aggregates, prof_data, columns, db_path)
+                report_name = os.path.join(output_dir, f"report_{sanitize_filename(professor)}.pdf")
+                with atomic_write(report_name) as tmp_pdf:
+                    write_professor_report(tmp_pdf, aggregates, chart_path, sections=sections, render_cache=render_cache)
+                save_summaries(db_path, summaries)
+                if statistics_path is not None:
+                    statistics.append(report_statistics(aggregates))
+                generated_reports.append(report_name)
+                report_progress(f"✓ Successfully generated report for {professor}")
+
+            except Exception as e:
+                # Continue with next professor instead of crashing
+                report_progress(f"✗ Error processing professor {professor}: {str(e)}")
+
+            finally:
+                remove_professor_charts(chart_path)
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+
+    if statistics_path is not None:
+        write_statistics(statistics_path, statistics, progress_callback)
+    report_progress(f"✓ Completed processing {len(professors)} professors")
+    return generated_reports
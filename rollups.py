@@ -0,0 +1,271 @@
+"""
+Department and faculty rollups built from per-professor aggregate tables.
+
+Every report's aggregates include a small table of counts per department and
+course/year (see professor_rollup_table in main.py), and that table is saved with
+the report's summary. A rollup adds these tables together, so a faculty summary
+of any number of responses is computed from a few rows per professor instead of
+from the workbook rows, and only the rollup's own handful of charts is rendered.
+"""
+import os
+import shutil
+import pandas as pd
+from reportlab.pdfgen import canvas
+from reportlab.lib.pagesizes import letter
+
+from aggregate_store import infer_cycle, load_summaries
+from main import (ROLLUP_COLUMNS, UNSPECIFIED, WORKLOAD_ORDER, TEACHING_METHOD_NAMES, professor_rollup_table,
+                  rollup_input_hash, resolve_report_columns, build_professor_index, professor_rows,
+                  is_sorted_by_professor, sort_by_professor, render_teaching_methods_chart, create_run_workspace,
+                  atomic_write, get_unicode_font, add_section_bookmark, get_image_dimensions)
+
+N_QUESTIONS = 12
+
+
+def summary_rollup_table(summary):
+    """
+    The rollup table stored with a report summary
+    """
+    return pd.DataFrame(summary["rollup"], columns=ROLLUP_COLUMNS).assign(professor=summary["professor"])
+
+
+def collect_rollup_tables(history_db=None, cycle=None, data=None, professor_index=None, progress_callback=None):
+    """
+    Gather one rollup table per professor.
+
+    Without data, the tables stored in history_db for the cycle (or each professor's
+    latest cycle) are used. With data, the rollup covers the professors of data:
+    each professor's stored table of the data's cycle is used when it was computed
+    from exactly the professor's rows in data (see rollup_input_hash), and the
+    others (no stored table, or one left from an earlier import of changed data)
+    are counted from their rows.
+    """
+    def report_progress(message):
+        if progress_callback:
+            progress_callback(message)
+        print(message)
+
+    if data is None:
+        summaries = load_summaries(history_db, cycle) if history_db else []
+        tables = [summary_rollup_table(summary) for summary in summaries]
+        report_progress(f"✓ Loaded stored aggregates of {len(tables)} professors")
+        return tables
+
+    columns = resolve_report_columns(data)
+    if professor_index is None:
+        if not is_sorted_by_professor(data):
+            data = sort_by_professor(data)
+        professor_index = build_professor_index(data)
+    if cycle is None and columns["timestamp"] is not None:
+        cycle = infer_cycle(data[columns["timestamp"]])
+
+    stored = {}
+    if history_db and cycle is not None:
+        stored = {summary["professor"]: summary for summary in load_summaries(history_db, cycle)}
+
+    tables = []
+    computed = 0
+    for professor in professor_index:
+        summary = stored.get(str(professor))
+        prof_data = professor_rows(data, professor_index, professor)
+        if summary is not None and summary["rollup_hash"] == rollup_input_hash(prof_data, columns):
+            table = summary_rollup_table(summary)
+        else:
+            table = professor_rollup_table(prof_data, columns).assign(professor=str(professor))
+            computed += 1
+        tables.append(table)
+    report_progress(f"✓ Collected aggregates of {len(tables)} professors ({len(tables) - computed} stored, {computed} counted)")
+    return tables
+
+
+def merge_rollup_tables(tables):
+    """
+    Add the professors' tables together into one table with a row per
+    (professor, department, course, year, measure, category)
+    """
+    if not tables:
+        return pd.DataFrame(columns=["professor"] + ROLLUP_COLUMNS)
+    table = pd.concat(tables, ignore_index=True)
+    return table.groupby(["professor"] + ROLLUP_COLUMNS[:-1], as_index=False, sort=False)["count"].sum()
+
+
+def _scope_summary(table):
+    """
+    The numbers of one rollup page from the part of the merged table it covers
+    """
+    def counts(measure):
+        rows = table[table["measure"] == measure]
+        return rows.groupby("category")["count"].sum().sort_values(ascending=False)
+
+    responses = table[table["measure"] == "responses"]
+    workload = counts("workload")
+    # Workload in its usual order, other levels after it
+    workload = workload.reindex([level for level in WORKLOAD_ORDER if level in workload.index]
+                                + [level for level in workload.index if level not in WORKLOAD_ORDER])
+    methods = counts("method").reindex(TEACHING_METHOD_NAMES, fill_value=0)
+
+    questions = []
+    for number in range(1, N_QUESTIONS + 1):
+        rows = table[table["measure"] == f"question_{number}"]
+        total = int(rows["count"].sum())
+        average = float((rows["category"].astype(int) * rows["count"]).sum() / total) if total else None
+        questions.append({"number": number, "responses": total, "average": average})
+
+    return {
+        "professors": int(responses["professor"].nunique()),
+        "responses": int(responses["count"].sum()),
+        "courses": int(responses[["course", "year"]].drop_duplicates().shape[0]),
+        "attendance_counts": counts("attendance").sort_index(),
+        "workload_counts": workload,
+        "method_counts": methods,
+        "questions": questions,
+    }
+
+
+def _course_table(table):
+    """
+    Responses, professors and mean grade (over all questions) per course and year
+    """
+    responses = table[table["measure"] == "responses"]
+    keys = ["course", "year"]
+    courses = responses.groupby(keys).agg(responses=("count", "sum"), professors=("professor", "nunique"))
+
+    grades = table[table["measure"].str.startswith("question_")]
+    grades = grades.assign(points=grades["category"].astype(int) * grades["count"])
+    totals = grades.groupby(keys)[["points", "count"]].sum()
+    courses["average"] = totals["points"] / totals["count"]
+    return courses.reset_index().sort_values(keys)
+
+
+def build_rollups(table):
+    """
+    Faculty and department rollups of a merged table: {"faculty": summary,
+    "departments": {department: summary}, "courses": {department: course table}}
+    """
+    rollups = {"faculty": _scope_summary(table), "departments": {}, "courses": {}}
+    for department, rows in table.groupby("department", sort=True):
+        rollups["departments"][department] = _scope_summary(rows)
+        rollups["courses"][department] = _course_table(rows)
+    return rollups
+
+
+def _draw_scope_page(c, unicode_font, title, summary, chart_path, outline_key):
+    c.setFont(unicode_font, 26)
+    c.drawString(50, 750, title)
+    add_section_bookmark(c, "rollup", outline_key, title, level=0)
+
+    c.setFont(unicode_font, 12)
+    c.drawString(50, 715, f"Professors: {summary['professors']}")
+    c.drawString(50, 695, f"Total Responses: {summary['responses']}")
+    c.drawString(50, 675, f"Courses (course and year): {summary['courses']}")
+
+    # Attendance and workload side by side
+    for x, heading, counts in ((50, "Attendance Rate:", summary["attendance_counts"]),
+                               (320, "Workload Level:", summary["workload_counts"])):
+        c.setFont(unicode_font, 14)
+        c.drawString(x, 640, heading)
+        c.setFont(unicode_font, 10)
+        y_position = 620
+        answered = counts.sum()
+        for label, count in counts.items():
+            c.drawString(x + 20, y_position, f"• {label}: {count} ({(count / answered) * 100:.1f}%)")
+            y_position -= 15
+            if y_position < 350:  # Leave space for chart
+                break
+
+    if chart_path is not None:
+        chart_width, chart_height = get_image_dimensions(chart_path, max_width=400)
+        c.drawImage(chart_path, (letter[0] - chart_width) / 2, 50, width=chart_width, height=chart_height)
+
+
+def _draw_grades_page(c, unicode_font, title, summary, courses):
+    c.showPage()
+    c.setFont(unicode_font, 22)
+    c.drawString(50, 750, f"{title} - Grades and Courses")
+
+    c.setFont(unicode_font, 14)
+    c.drawString(50, 715, "Question Averages:")
+    c.setFont(unicode_font, 10)
+    y_position = 695
+    for question in summary["questions"]:
+        average = f"{question['average']:.2f}/10" if question["average"] is not None else "n/a"
+        c.drawString(70, y_position, f"• Question {question['number']}: {average} ({question['responses']} responses)")
+        y_position -= 15
+
+    if courses is None:
+        return
+
+    y_position -= 15
+    c.setFont(unicode_font, 14)
+    c.drawString(50, y_position, "Courses by Year:")
+    y_position -= 20
+    c.setFont(unicode_font, 10)
+    for course in courses.itertuples(index=False):
+        if y_position < 60:
+            c.showPage()
+            c.setFont(unicode_font, 22)
+            c.drawString(50, 750, f"{title} - Courses (continued)")
+            c.setFont(unicode_font, 10)
+            y_position = 715
+        average = f"{course.average:.2f}" if pd.notna(course.average) else "n/a"
+        year = "" if course.year == UNSPECIFIED else f" ({course.year})"
+        c.drawString(70, y_position, f"• {course.course}{year}: {course.responses} responses, "
+                                     f"{course.professors} professors, average {average}")
+        y_position -= 15
+
+
+def write_rollup_pdf(output_path, table, title="Faculty Summary"):
+    """
+    Write the faculty page and one page set per department from a merged
+    rollup table (see merge_rollup_tables). Returns the rollups.
+    """
+    rollups = build_rollups(table)
+    unicode_font = get_unicode_font()
+    workspace = create_run_workspace()
+    try:
+        with atomic_write(output_path) as tmp_path:
+            c = canvas.Canvas(tmp_path, pagesize=letter)
+            c.setTitle(title)
+            c.showOutline()
+
+            # With a single department the faculty pages already cover it
+            departments = list(rollups["departments"])
+            if len(departments) == 1:
+                scopes = [(title, rollups["faculty"], rollups["courses"][departments[0]])]
+            else:
+                scopes = [(title, rollups["faculty"], None)]
+                scopes += [(f"Department: {department}", rollups["departments"][department], rollups["courses"][department])
+                           for department in departments]
+
+            for i, (scope_title, summary, courses) in enumerate(scopes):
+                if i > 0:
+                    c.showPage()
+                chart_path = None
+                if summary["responses"] > 0:
+                    chart_path = render_teaching_methods_chart(
+                        list(summary["method_counts"].index), summary["method_counts"].tolist(),
+                        summary["responses"], output=os.path.join(workspace, f"rollup_methods_{i}.png"))
+                _draw_scope_page(c, unicode_font, scope_title, summary, chart_path, f"scope{i}")
+                _draw_grades_page(c, unicode_font, scope_title, summary, courses)
+            c.save()
+    finally:
+        shutil.rmtree(workspace, ignore_errors=True)
+    return rollups
+
+
+def generate_rollup_report(output_path, history_db=None, cycle=None, data=None, professor_index=None,
+                           progress_callback=None):
+    """
+    Collect the professors' rollup tables (see collect_rollup_tables) and write the
+    department and faculty summary PDF. Returns the number of professors covered.
+    """
+    tables = collect_rollup_tables(history_db, cycle, data, professor_index, progress_callback)
+    if not tables:
+        raise ValueError("No aggregates to summarize; generate reports with a history database first")
+    write_rollup_pdf(output_path, merge_rollup_tables(tables))
+
+    message = f"✓ Wrote department and faculty summary of {len(tables)} professors: {output_path}"
+    if progress_callback:
+        progress_callback(message)
+    print(message)
+    return len(tables)
@@ -18,6 +18,7 @@ Features:
 
 import sys
 import os
+import multiprocessing
 
 # Add current directory to Python path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
@@ -26,6 +27,9 @@ try:
     from gui_app import main
     
     if __name__ == "__main__":
+        # Needed for the report worker processes in the packaged executable
+        multiprocessing.freeze_support()
+        
         print("Starting Professor Evaluation Report Generator...")
         print("GUI interface loading...")
         main()
@@ -0,0 +1,149 @@
+"""
+Response table shared with worker processes through memory-mapped NumPy files.
+
+export_shared_dataset writes every column of the loaded DataFrame once to a
+folder; SharedDataset maps those files read-only in each worker. The operating
+system shares the mapped pages between processes, so starting a worker does not
+copy (or pickle) the table and total memory does not grow with the number of
+workers. Rows are only turned back into a DataFrame for the slice a worker asks for.
+
+Column storage:
+- numeric and boolean columns: the values as one array
+- datetime columns: int64 ticks in the column's own unit plus a mask of missing values
+- text columns: UTF-8 bytes of all values, end offsets and a mask of missing values
+- anything else (mixed types): a pickled object array, loaded in full by each worker
+"""
+import os
+import json
+import tempfile
+import shutil
+import numpy as np
+import pandas as pd
+
+META_FILE = "meta.json"
+
+
+def _is_text_column(series):
+    if pd.api.types.is_string_dtype(series.dtype) and not pd.api.types.is_object_dtype(series.dtype):
+        return True
+    if pd.api.types.is_object_dtype(series.dtype):
+        return all(isinstance(value, str) for value in series.dropna())
+    return False
+
+
+def export_shared_dataset(data, directory=None):
+    """
+    Write data to a folder of memory-mappable column files and return the folder path.
+    Without a directory, a new folder is created under temp/; remove it with
+    remove_shared_dataset when the workers are done.
+    """
+    if directory is None:
+        os.makedirs("temp", exist_ok=True)
+        directory = tempfile.mkdtemp(prefix="dataset_", dir="temp")
+    else:
+        os.makedirs(directory, exist_ok=True)
+
+    columns = []
+    for position, name in enumerate(data.columns):
+        series = data.iloc[:, position]
+        stem = f"col_{position}"
+        if pd.api.types.is_bool_dtype(series.dtype) or pd.api.types.is_numeric_dtype(series.dtype):
+            kind = "numeric"
+            np.save(os.path.join(directory, f"{stem}.npy"), series.to_numpy())
+        elif pd.api.types.is_datetime64_dtype(series.dtype):
+            kind = "datetime"
+            missing = series.isna().to_numpy()
+            values = series.to_numpy()
+            unit = str(values.dtype)
+            values = values.view("int64")
+            np.save(os.path.join(directory, f"{stem}.npy"), values)
+            np.save(os.path.join(directory, f"{stem}_missing.npy"), missing)
+        elif _is_text_column(series):
+            kind = "text"
+            missing = series.isna().to_numpy()
+            encoded = [b"" if is_missing else value.encode("utf-8")
+                       for value, is_missing in zip(series.to_numpy(dtype=object), missing)]
+            offsets = np.cumsum([len(value) for value in encoded], dtype=np.int64)
+            blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+            np.save(os.path.join(directory, f"{stem}.npy"), blob)
+            np.save(os.path.join(directory, f"{stem}_offsets.npy"), offsets)
+            np.save(os.path.join(directory, f"{stem}_missing.npy"), missing)
+        else:
+            kind = "object"
+            np.save(os.path.join(directory, f"{stem}.npy"), series.to_numpy(dtype=object), allow_pickle=True)
+        column = {"name": name, "kind": kind, "file": stem}
+        if kind == "datetime":
+            column["dtype"] = unit
+        columns.append(column)
+
+    meta = {"rows": int(len(data)), "columns": columns}
+    with open(os.path.join(directory, META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, default=str)
+    return directory
+
+
+def remove_shared_dataset(directory):
+    """
+    Delete a folder written by export_shared_dataset
+    """
+    shutil.rmtree(directory, ignore_errors=True)
+
+
+class SharedDataset:
+    """
+    Read-only view of an exported response table. Only the metadata is read
+    when it is opened; rows(start, stop) builds a DataFrame of just those rows.
+    """
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            meta = json.load(f)
+        self._rows = meta["rows"]
+        self._columns = meta["columns"]
+        self.columns = pd.Index([column["name"] for column in self._columns])
+        self._arrays = {}
+
+    def __len__(self):
+        return self._rows
+
+    def _load(self, name, allow_pickle=False):
+        if name not in self._arrays:
+            path = os.path.join(self.directory, f"{name}.npy")
+            if allow_pickle:
+                self._arrays[name] = np.load(path, allow_pickle=True)
+            else:
+                self._arrays[name] = np.load(path, mmap_mode="r")
+        return self._arrays[name]
+
+    def _column_slice(self, column, start, stop):
+        stem = column["file"]
+        kind = column["kind"]
+        if kind == "numeric":
+            return np.array(self._load(stem)[start:stop])
+        if kind == "datetime":
+            values = np.array(self._load(stem)[start:stop]).view(column["dtype"])
+            return pd.Series(values).mask(np.asarray(self._load(f"{stem}_missing")[start:stop])).to_numpy()
+        if kind == "text":
+            blob = self._load(stem)
+            offsets = self._load(f"{stem}_offsets")
+            missing = self._load(f"{stem}_missing")
+            values = np.empty(stop - start, dtype=object)
+            begin = int(offsets[start - 1]) if start > 0 else 0
+            for i in range(start, stop):
+                end = int(offsets[i])
+                values[i - start] = None if missing[i] else blob[begin:end].tobytes().decode("utf-8")
+                begin = end
+            return values
+        return self._load(stem, allow_pickle=True)[start:stop]
+
+    def rows(self, start, stop):
+        """
+        Return rows start..stop as a DataFrame indexed like data.iloc[start:stop]
+        """
+        start = max(0, start)
+        stop = min(self._rows, stop)
+        frame = pd.DataFrame({position: self._column_slice(column, start, stop)
+                              for position, column in enumerate(self._columns)},
+                             index=pd.RangeIndex(start, stop))
+        frame.columns = self.columns
+        return frame
@@ -0,0 +1,160 @@
+"""
+Machine-readable export of the statistics shown in the professor reports.
+
+report_statistics turns the aggregates a report is drawn from into plain numbers
+(specializations, years, courses, attendance, workload, teaching methods, and for
+every question its response rate, average and Pareto order), so they are taken
+from the same aggregation pass as the PDF. statistics_files lays the statistics of
+a run out as one JSON document and two flat tables (one row per counted category,
+one row per question) as CSV, and as Parquet when pyarrow is installed.
+"""
+import io
+import json
+import os
+import pandas as pd
+
+# (measure, aggregates key of the counts, aggregates key of the number of responses)
+DISTRIBUTIONS = [
+    ("specialization", "spec_counts", "total_responses"),
+    ("years", "year_counts", "year_responses"),
+    ("courses", "course_counts", "course_responses"),
+    ("attendance", "attendance_counts", "attendance_responses"),
+    ("workload", "workload_counts", "workload_responses"),
+]
+
+COUNT_COLUMNS = ["professor", "department", "measure", "category", "count", "responses", "percentage"]
+QUESTION_COLUMNS = ["professor", "department", "question", "text", "status", "responses", "response_rate",
+                    "average", "faculty_rank", "faculty_percentile", "department_rank", "department_percentile"]
+
+
+def _percentage(part, whole):
+    return round(part / whole * 100, 2) if whole else None
+
+
+def report_statistics(aggregates):
+    """
+    The statistics of one report as plain Python values, from its aggregates.
+    Sections whose aggregates were not computed are left out.
+    """
+    total = int(aggregates["total_responses"])
+    stats = {
+        "professor": str(aggregates["professor"]),
+        "department": str(aggregates["department"]),
+        "total_students": total,
+        "distributions": {},
+    }
+
+    for measure, counts_key, responses_key in DISTRIBUTIONS:
+        if counts_key not in aggregates:
+            continue
+        responses = int(aggregates[responses_key])
+        stats["distributions"][measure] = {
+            "responses": responses,
+            "counts": [{"category": str(label), "count": int(count), "percentage": _percentage(count, responses)}
+                       for label, count in aggregates[counts_key].items()],
+        }
+
+    # Teaching methods are a share of all responses, as on the report page
+    if aggregates.get("method_counts") is not None:
+        stats["distributions"]["teaching_methods"] = {
+            "responses": total,
+            "counts": [{"category": str(name), "count": int(count), "percentage": _percentage(count, total)}
+                       for name, count in aggregates["method_counts"].items()],
+        }
+
+    if "questions" in aggregates:
+        stats["questions"] = []
+        for question in aggregates["questions"]:
+            grades = [{"grade": int(grade), "count": int(count), "cumulative_percentage": round(float(cumulative), 2)}
+                      for (grade, count), cumulative in zip(question.get("sorted_grades", []),
+                                                            question.get("cumulative_percentages", []))]
+            stats["questions"].append({
+                "number": question["number"],
+                "text": question["text"],
+                "status": question["status"],
+                "responses": int(question["responses"]),
+                "response_rate": _percentage(question["responses"], total),
+                "average": question.get("average"),
+                "pareto": grades,
+                "ranking": question.get("ranking"),
+            })
+
+    if "comment_sections" in aggregates:
+        stats["comments"] = {section["title"]: len(section["comments"]) for section in aggregates["comment_sections"]}
+    return stats
+
+
+def statistics_tables(statistics):
+    """
+    Flatten the statistics of several reports into (counts, questions) tables
+    """
+    counts = []
+    questions = []
+    for stats in statistics:
+        key = [stats["professor"], stats["department"]]
+        for measure, distribution in stats["distributions"].items():
+            for row in distribution["counts"]:
+                counts.append(key + [measure, row["category"], row["count"], distribution["responses"],
+                                     row["percentage"]])
+        for question in stats.get("questions", []):
+            ranking = question["ranking"] or {}
+            questions.append(key + [question["number"], question["text"], question["status"], question["responses"],
+                                    question["response_rate"], question["average"],
+                                    ranking.get("faculty_rank"), ranking.get("faculty_percentile"),
+                                    ranking.get("department_rank"), ranking.get("department_percentile")])
+    return pd.DataFrame(counts, columns=COUNT_COLUMNS), pd.DataFrame(questions, columns=QUESTION_COLUMNS)
+
+
+def parquet_available():
+    try:
+        import pyarrow  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+def statistics_files(statistics, prefix="statistics"):
+    """
+    The export files of a run as {file name: bytes}: <prefix>.json with every
+    report's statistics, and <prefix>_counts / <prefix>_questions as CSV (and
+    Parquet when pyarrow is installed)
+    """
+    statistics = sorted(statistics, key=lambda stats: stats["professor"])
+    files = {f"{prefix}.json": json.dumps({
+        "generated_at": pd.Timestamp.now().isoformat(timespec='seconds'),
+        "report_count": len(statistics),
+        "reports": statistics,
+    }, ensure_ascii=False, indent=2).encode('utf-8')}
+
+    counts, questions = statistics_tables(statistics)
+    for name, table in (("counts", counts), ("questions", questions)):
+        files[f"{prefix}_{name}.csv"] = table.to_csv(index=False).encode('utf-8')
+        if parquet_available():
+            buffer = io.BytesIO()
+            table.to_parquet(buffer, index=False)
+            files[f"{prefix}_{name}.parquet"] = buffer.getvalue()
+    return files
+
+
+def write_statistics(path_prefix, statistics, progress_callback=None):
+    """
+    Write the export files next to each other; path_prefix is e.g. output/statistics.
+    Each file replaces an older one only once it is complete. Returns the paths.
+    """
+    # main imports this module, so its helper is imported on use
+    from main import atomic_write
+
+    directory = os.path.dirname(path_prefix) or "."
+    paths = []
+    for name, content in statistics_files(statistics, os.path.basename(path_prefix)).items():
+        path = os.path.join(directory, name)
+        with atomic_write(path) as tmp_path:
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+        paths.append(path)
+
+    message = f"✓ Exported statistics of {len(statistics)} reports: {', '.join(os.path.basename(p) for p in paths)}"
+    if progress_callback:
+        progress_callback(message)
+    print(message)
+    return paths
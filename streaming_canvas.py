@@ -0,0 +1,124 @@
+"""
+A ReportLab canvas that writes its pages to the file while drawing continues.
+
+reportlab's Canvas keeps every finished page and image in memory until save().
+StreamingCanvas.flush() writes the pages finished so far (with their content
+streams) and the images drawn so far straight to the output file and keeps only a
+small placeholder for each, so memory does not grow with the length of the
+document. An image drawn again after a flush (e.g. the logo) still refers to the
+copy already in the file. Objects that can change until the end (the page tree,
+outline, fonts and document info) are written by save(), followed by the
+cross-reference table of every object.
+"""
+from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+
+
+class _WrittenObject(pdfdoc.PDFObject):
+    """Stands in for an object already in the file; images keep their size for drawImage"""
+
+    def __init__(self, width=None, height=None):
+        self.width = width
+        self.height = height
+
+
+class StreamingDocument(pdfdoc.PDFDocument):
+    """
+    A PDFDocument that writes objects to an open binary file as soon as they are
+    final instead of formatting the whole document at save time
+    """
+
+    def __init__(self, file, **kwargs):
+        super().__init__(**kwargs)
+        self._file = file
+        self._offset = 0
+        self._flushed_pages = 0
+        self._next_number = 1  # First object number flush() has not looked at yet
+        self._write(pdfdoc.PDFFile(self._pdfVersion).format(self))
+
+    def _write(self, data):
+        self._file.write(data)
+        self._offset += len(data)
+
+    def _write_object(self, name):
+        obj = self.idToObject[name]
+        self.idToOffset[name] = self._offset
+        self._write(pdfdoc.PDFIndirectObject(name, obj).format(self))
+        self.idToObject[name] = _WrittenObject(getattr(obj, 'width', None), getattr(obj, 'height', None))
+
+    def flush(self):
+        """Write the pages finished so far, their content streams and every image drawn so far"""
+        pages = self.Pages.pages
+        for index in range(self._flushed_pages, len(pages)):
+            page = pages[index]
+            name = page.__InternalName__
+            # Formatting the page registers its content stream, which is final as well
+            self._write_object(name)
+            self._write_object(page.Contents.__InternalName__)
+            pages[index] = pdfdoc.PDFObjectReference(name)
+        self._flushed_pages = len(pages)
+
+        while self._next_number <= self.objectcounter:
+            name = self.numberToId[self._next_number]
+            if name not in self.idToOffset and isinstance(self.idToObject[name], pdfdoc.PDFImageXObject):
+                self._write_object(name)
+            self._next_number += 1
+        self._file.flush()
+
+    def format(self):
+        # Same layout as PDFDocument.format, but objects already flushed keep their offsets
+        self.Reference(self.Catalog)
+        self.Reference(self.info)
+        number = 1
+        # New objects may be registered while others are formatted
+        while number in self.numberToId:
+            name = self.numberToId[number]
+            if name not in self.idToOffset:
+                self._write_object(name)
+            number += 1
+        ids = [self.numberToId[n] for n in range(1, number)]
+
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xref_offset = self._offset
+        self._write(xref.format(self))
+        trailer = pdfdoc.PDFTrailer(startxref=xref_offset, Size=len(ids) + 1, Root=self.Reference(self.Catalog),
+                                    Info=self.Reference(self.info), ID=self.ID())
+        self._write(trailer.format(self))
+        return b''
+
+    def SaveToFile(self, filename, canvas):
+        try:
+            self.GetPDFData(canvas)
+        finally:
+            self._file.close()
+
+
+class StreamingCanvas(canvas.Canvas):
+    """
+    A Canvas for a file path that writes finished pages to the file on flush().
+    Encryption is not supported, and getpdfdata() returns nothing (the document is
+    in the file).
+    """
+
+    def __init__(self, filename, **kwargs):
+        if kwargs.get('encrypt'):
+            raise ValueError("StreamingCanvas does not support encryption")
+        super().__init__(filename, **kwargs)
+        document = self._doc
+        self._doc = StreamingDocument(open(filename, 'wb'), compression=document.compression,
+                                      invariant=document.invariant, pdfVersion=document._pdfVersion,
+                                      lang=kwargs.get('lang'))
+        # The preamble registered the initial font with the document it replaces
+        self._make_preamble()
+
+    def flush(self):
+        """
+        Write every page finished with showPage() and every image drawn so far to the
+        file. Finished pages can no longer be changed afterwards (the current page can).
+        """
+        self._doc.flush()
+
+    def close(self):
+        """Close the file without finishing the document (after an error)"""
+        self._doc._file.close()
@@ -0,0 +1,32 @@
+from comment_index import fold_text, search_comments, update_comment_index
+from response_store import import_workbook
+from workbooks import make_workbook, write_workbook
+
+
+def test_fold_text_strips_diacritics_of_both_cedilla_forms():
+    assert fold_text("Întârziere ŞI Știință") == "intarziere si stiinta"
+
+
+def test_search_matches_folded_word_prefixes(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    import_workbook(db_path, write_workbook(tmp_path / "first.xlsx", make_workbook(
+        ["01/03/2024", "02/03/2024", "03/03/2024"], professors=["PROF A", "PROF B", "PROF A"],
+        comments=["Microfonul nu funcționează", "Explică foarte clar", "Întârzie la curs"])))
+
+    assert [match["comment"] for match in search_comments(db_path, "microfon functioneaza")] == [
+        "Microfonul nu funcționează"]
+    assert [match["professor"] for match in search_comments(db_path, "intarz")] == ["PROF A"]
+    assert search_comments(db_path, "clar", professor="PROF A") == []
+    assert search_comments(db_path, "microfon clar") == []
+    assert search_comments(db_path, "clar")[0]["section"] == "Pros"
+
+
+def test_index_only_reads_new_responses(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    import_workbook(db_path, write_workbook(tmp_path / "first.xlsx", make_workbook(
+        ["01/03/2024"], comments=["Cursuri interesante"])))
+    assert update_comment_index(db_path) == 0
+
+    import_workbook(db_path, write_workbook(tmp_path / "second.xlsx", make_workbook(
+        ["02/03/2024"], comments=["Laboratoare interesante"])))
+    assert len(search_comments(db_path, "interesant")) == 2
@@ -0,0 +1,48 @@
+from aggregate_store import load_history, save_summaries
+from main import (attach_cycle_history, compute_professor_aggregates, resolve_question_texts, resolve_report_columns,
+                  section_inputs)
+from validation import TIMESTAMP_COLUMN
+from workbooks import make_workbook
+
+
+def report_aggregates(data):
+    columns = resolve_report_columns(data)
+    question_texts = resolve_question_texts(data, columns["questions"])
+    return compute_professor_aggregates("PROF A", data, columns, question_texts), columns
+
+
+def test_rows_of_several_cycles_get_one_summary_each(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    data = make_workbook(["20/11/2023 10:00", "21/11/2023 10:00", "10/04/2024 10:00"], grades=[6, 8, 10])
+    aggregates, columns = report_aggregates(data)
+
+    summaries = attach_cycle_history(aggregates, data, columns, db_path)
+    assert [(summary["cycle"], summary["total_students"]) for summary in summaries] == [("2023-2024 S1", 2),
+                                                                                        ("2023-2024 S2", 1)]
+    assert [summary["questions"][0]["average"] for summary in summaries] == [7.0, 10.0]
+
+
+def test_rows_without_timestamps_are_not_saved_under_a_made_up_cycle(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    data = make_workbook(["20/11/2023 10:00", "10/04/2024 10:00"])
+    aggregates, columns = report_aggregates(data)
+    save_summaries(db_path, attach_cycle_history(aggregates, data, columns, db_path))
+
+    undated = make_workbook(["", ""]).drop(columns=TIMESTAMP_COLUMN)
+    aggregates, columns = report_aggregates(undated)
+    assert attach_cycle_history(aggregates, undated, columns, db_path) == []
+    assert [item["cycle"] for item in aggregates["history"]] == ["2023-2024 S1", "2023-2024 S2"]
+
+    # An explicit cycle is still saved
+    summaries = attach_cycle_history(aggregates, undated, columns, db_path, cycle="2024-2025 S1")
+    assert [summary["cycle"] for summary in summaries] == ["2024-2025 S1"]
+    assert [item["cycle"] for item in load_history(db_path, "PROF A")] == ["2023-2024 S1", "2023-2024 S2"]
+
+
+def test_rollup_is_only_computed_for_the_history():
+    data = make_workbook(["20/11/2023 10:00"], departments=["Inginerie"])
+    aggregates, _ = report_aggregates(data)
+    assert "rollup" not in aggregates
+    assert aggregates["department"] == "Inginerie"
+    assert "rollup" in section_inputs(history=True)
+    assert "rollup" in section_inputs(["comments"], history=True)
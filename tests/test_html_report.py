@@ -0,0 +1,23 @@
+import re
+
+from aggregate_store import save_summaries
+from html_report import generate_html_site
+from main import attach_cycle_history, compute_professor_aggregates, resolve_question_texts, resolve_report_columns
+from validation import TIMESTAMP_COLUMN
+from workbooks import make_workbook
+
+
+def test_trend_section_lists_only_stored_cycles_for_undated_rows(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    dated = make_workbook(["20/11/2023 10:00", "10/04/2024 10:00"])
+    columns = resolve_report_columns(dated)
+    aggregates = compute_professor_aggregates("PROF A", dated, columns,
+                                              resolve_question_texts(dated, columns["questions"]))
+    save_summaries(db_path, attach_cycle_history(aggregates, dated, columns, db_path))
+
+    undated = make_workbook(["", "", ""]).drop(columns=TIMESTAMP_COLUMN)
+    for _ in range(2):
+        [page] = generate_html_site(undated, str(tmp_path / "site"), sections=["cycle_trends"], history_db=db_path)
+    with open(page, encoding='utf-8') as f:
+        html = f.read()
+    assert re.findall(r"([^>]+): \d+ students, average score", html) == ["2023-2024 S1", "2023-2024 S2"]
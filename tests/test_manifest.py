@@ -0,0 +1,10 @@
+from main import build_manifest_entry
+from workbooks import make_workbook
+
+
+def test_manifest_date_range_reads_timestamps_day_first():
+    data = make_workbook(["01/03/2024 14:30", "13/02/2024 02:00", "28/02/2024 09:15"])
+    entry = build_manifest_entry("PROF A", "report_PROF A.pdf", data, 1024)
+    assert entry["first_response"] == "2024-02-13T02:00:00"
+    assert entry["last_response"] == "2024-03-01T14:30:00"
+    assert entry["total_students"] == 3
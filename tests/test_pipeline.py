@@ -0,0 +1,44 @@
+import itertools
+import threading
+
+import pytest
+
+from pipeline import Stage, run_pipeline
+
+
+def _fail_on_three(value):
+    if value == 3:
+        raise ValueError("three")
+    return value * 10
+
+
+def test_items_go_through_every_stage():
+    stages = [Stage("double", lambda value: value * 2, workers=2), Stage("tag", lambda value: f"#{value}")]
+    results = sorted(run_pipeline(range(5), stages))
+    assert results == [(item, f"#{item * 2}", None) for item in range(5)]
+
+
+def test_an_error_skips_the_remaining_stages():
+    seen = []
+    stages = [Stage("check", _fail_on_three), Stage("record", lambda value: seen.append(value) or value)]
+    results = {item: (value, error) for item, value, error in run_pipeline([1, 3, 5], stages)}
+    assert results == {1: (10, None), 3: (None, "three"), 5: (50, None)}
+    assert sorted(seen) == [10, 50]
+
+
+def test_closing_early_stops_the_stages():
+    fed = []
+    items = (fed.append(n) or n for n in itertools.count())
+    before = threading.active_count()
+    results = run_pipeline(items, [Stage("pass", lambda value: value)], queue_size=2)
+    assert next(results)[0] == 0
+    results.close()
+    # Only a bounded number of items were read, and every pipeline thread has exited
+    assert len(fed) < 20
+    assert threading.active_count() == before
+    assert not [thread for thread in threading.enumerate() if thread.name.startswith("pipeline-")]
+
+
+def test_stage_needs_a_worker():
+    with pytest.raises(ValueError):
+        Stage("empty", lambda value: value, workers=0)
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from main import compute_question_rankings, question_means_matrix, resolve_report_columns
+from response_store import import_workbook, load_dataset, load_question_rankings
+from workbooks import make_workbook, write_workbook
+
+
+def test_rankings_within_faculty_and_department():
+    means = pd.DataFrame({1: [9.0, 7.0, 7.0, 5.0], 2: [8.0, None, 6.0, 6.0]},
+                         index=["PROF A", "PROF B", "PROF C", "PROF D"])
+    departments = pd.Series(["CS", "CS", "MATH", "MATH"], index=means.index)
+    rankings = compute_question_rankings(means, departments)
+
+    # Ties share the better rank; the percentile counts colleagues that are not higher
+    assert [rankings[prof][0]["faculty_rank"] for prof in means.index] == [1, 2, 2, 4]
+    assert rankings["PROF B"][0]["faculty_percentile"] == pytest.approx(75.0)
+    assert rankings["PROF D"][0]["faculty_percentile"] == pytest.approx(25.0)
+    assert rankings["PROF C"][0]["department_rank"] == 1
+    assert rankings["PROF C"][0]["department_count"] == 2
+
+    # A professor without grades for a question is left out of its ranking
+    assert rankings["PROF B"][1] is None
+    assert rankings["PROF A"][1]["faculty_count"] == 3
+    assert rankings["PROF C"][1]["faculty_rank"] == 2
+
+
+def test_stored_totals_rank_like_the_responses(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    import_workbook(db_path, write_workbook(tmp_path / "first.xlsx", make_workbook(
+        ["01/03/2024", "02/03/2024", "03/03/2024"], professors=["PROF A", "PROF B", "PROF C"],
+        grades=[9, 7, 8], departments=["CS", "CS", "MATH"])))
+    import_workbook(db_path, write_workbook(tmp_path / "second.xlsx", make_workbook(
+        ["03/03/2024", "04/03/2024", "05/03/2024"], professors=["PROF C", "PROF A", "PROF B"],
+        grades=[8, 5, 10], departments=["MATH", "CS", "CS"])))
+
+    data = load_dataset(db_path)
+    expected = compute_question_rankings(*question_means_matrix(data, resolve_report_columns(data)))
+    rankings = load_question_rankings(db_path)
+    assert rankings == expected
+    # PROF B averages 8.5 over both imports, ahead of PROF C (8) and PROF A (7)
+    assert [rankings[prof][0]["faculty_rank"] for prof in ("PROF A", "PROF B", "PROF C")] == [3, 1, 2]
@@ -0,0 +1,19 @@
+import pandas as pd
+
+from main import read_excel, read_excel_streaming
+from workbooks import make_workbook, write_workbook
+
+
+def test_streaming_read_matches_read_excel(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    data = make_workbook(["01/03/2024 14:30", "02/03/2024 09:00", "03/03/2024 10:15", "04/03/2024 11:00"],
+                         professors=["PROF C", "PROF A", None, "PROF B"], grades=[8, 9, 10, 7],
+                         departments=["CS", "CS", "MATH", "MATH"], comments=["Bine", "", "Ok", "Clar"])
+    path = write_workbook(tmp_path / "export.xlsx", data)
+
+    batches = []
+    streamed = read_excel_streaming(path, on_rows=lambda rows, names: batches.append((rows, names)), batch_rows=2)
+    pd.testing.assert_frame_equal(streamed, read_excel(path))
+    # The professors are reported once each, as they are read
+    assert batches[-1][0] == 4
+    assert sorted(name for _, names in batches for name in names) == ["PROF A", "PROF B", "PROF C"]
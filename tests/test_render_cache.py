@@ -0,0 +1,27 @@
+from main import build_professor_index, professor_report_aggregates, render_section_charts
+from workbooks import make_workbook
+
+
+def render_questions(data, render_cache):
+    aggregates = professor_report_aggregates(data, "PROF A", build_professor_index(data), ["questions"])
+    return render_section_charts(aggregates, ["questions"], None, render_cache=render_cache)
+
+
+def test_only_the_chart_of_a_changed_question_is_rendered_again(tmp_path):
+    render_cache = str(tmp_path / "render_cache")
+    data = make_workbook(["01/03/2024", "02/03/2024", "03/03/2024"], grades=[8, 9, 10])
+
+    first, reused = render_questions(data, render_cache)
+    assert reused and not any(reused.values())
+
+    again, reused = render_questions(data, render_cache)
+    assert all(reused.values())
+    assert again == first
+
+    data.loc[0, 'Question 3'] = 4
+    changed, reused = render_questions(data, render_cache)
+    stale = [key for key, hit in reused.items() if not hit]
+    assert stale == ["question_3"]
+    assert changed["question_3"] != first["question_3"]
+    assert {key: path for key, path in changed.items() if key not in stale} == \
+        {key: path for key, path in first.items() if key not in stale}
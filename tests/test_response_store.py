@@ -0,0 +1,52 @@
+import sqlite3
+
+import pandas as pd
+
+from response_store import import_workbook, list_workbooks, load_professor_rows
+from validation import TIMESTAMP_COLUMN
+from workbooks import make_workbook, write_workbook
+
+
+def stored_rows(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute("SELECT professor, submitted_at, question_1 FROM responses ORDER BY row_number").fetchall()
+    finally:
+        conn.close()
+
+
+def test_identical_rows_within_a_workbook_are_all_kept(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    # Two students with the same answers at the same (date-only) time
+    first = write_workbook(tmp_path / "first.xlsx", make_workbook(["01/03/2024", "01/03/2024", "02/03/2024"]))
+    assert import_workbook(db_path, first) == 3
+    assert len(stored_rows(db_path)) == 3
+
+
+def test_rows_from_earlier_imports_are_skipped(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    first = write_workbook(tmp_path / "first.xlsx", make_workbook(["01/03/2024", "02/03/2024"]))
+    import_workbook(db_path, first)
+
+    # Overlaps the first export by one row (twice) and adds two identical new rows
+    second = write_workbook(tmp_path / "second.xlsx",
+                            make_workbook(["02/03/2024", "02/03/2024", "03/03/2024", "03/03/2024"]))
+    assert import_workbook(db_path, second) == 2
+    assert [row[1] for row in stored_rows(db_path)] == ["2024-03-01T00:00:00", "2024-03-02T00:00:00",
+                                                         "2024-03-03T00:00:00", "2024-03-03T00:00:00"]
+    assert [(entry["rows"], entry["duplicates"]) for entry in list_workbooks(db_path)] == [(2, 0), (2, 2)]
+
+    # The same file is recognised by its checksum
+    assert import_workbook(db_path, second) == 0
+    assert len(list_workbooks(db_path)) == 2
+
+
+def test_timestamps_are_stored_day_first_and_read_back(tmp_path):
+    db_path = str(tmp_path / "store.db")
+    timestamps = ["01/03/2024 14:30", "13/02/2024 02:00"]
+    path = write_workbook(tmp_path / "book.xlsx", make_workbook(timestamps, professors=["PROF A", "PROF B"]))
+    import_workbook(db_path, path)
+
+    assert [row[1] for row in stored_rows(db_path)] == ["2024-03-01T14:30:00", "2024-02-13T02:00:00"]
+    rows, _ = load_professor_rows(db_path, "PROF A")
+    assert rows[TIMESTAMP_COLUMN].tolist() == [pd.Timestamp(2024, 3, 1, 14, 30)]
@@ -0,0 +1,40 @@
+from main import (attach_cycle_history, build_professor_index, compute_professor_aggregates, resolve_question_texts,
+                  resolve_report_columns, section_inputs)
+from aggregate_store import save_summaries
+from rollups import collect_rollup_tables
+from workbooks import make_workbook
+
+
+def save_history(db_path, data):
+    columns = resolve_report_columns(data)
+    aggregates = compute_professor_aggregates("PROF A", data, columns,
+                                              resolve_question_texts(data, columns["questions"]),
+                                              inputs=section_inputs(history=True))
+    save_summaries(db_path, attach_cycle_history(aggregates, data, columns, db_path))
+
+
+def attendance_counts(table):
+    rows = table[table["measure"] == "attendance"]
+    return dict(zip(rows["category"], rows["count"]))
+
+
+def test_stored_table_is_reused_only_for_the_same_rows(tmp_path, capsys):
+    db_path = str(tmp_path / "history.db")
+    data = make_workbook(["20/11/2023 10:00", "21/11/2023 10:00"])
+    save_history(db_path, data)
+
+    [table] = collect_rollup_tables(db_path, data=data, professor_index=build_professor_index(data))
+    assert "(1 stored, 0 counted)" in capsys.readouterr().out
+    assert attendance_counts(table) == {"80%": 2}
+
+    # The row order does not matter
+    reordered = data.iloc[::-1].reset_index(drop=True)
+    collect_rollup_tables(db_path, data=reordered, professor_index=build_professor_index(reordered))
+    assert "(1 stored, 0 counted)" in capsys.readouterr().out
+
+    # Same number of responses, different answers: the stored table is stale
+    edited = data.copy()
+    edited.loc[1, 'Attendance'] = '60%'
+    [table] = collect_rollup_tables(db_path, data=edited, professor_index=build_professor_index(edited))
+    assert "(0 stored, 1 counted)" in capsys.readouterr().out
+    assert attendance_counts(table) == {"60%": 1, "80%": 1}
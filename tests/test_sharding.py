@@ -0,0 +1,69 @@
+import pytest
+
+from main import merge_shard_manifests, professor_shard, write_shard_manifest
+from workbooks import make_workbook
+
+PROFESSORS = [f"PROF {letter}" for letter in "ABCDEFGH"]
+
+
+def _workbook():
+    return make_workbook(["01/03/2024 14:30"] * len(PROFESSORS), professors=PROFESSORS)
+
+
+def _generated(tmp_path, professor, write_file=True):
+    report = f"report_{professor}.pdf"
+    if write_file:
+        (tmp_path / report).write_bytes(b"%PDF")
+    return {"professor": professor, "status": "generated", "report": report}
+
+
+def test_professor_shard_assigns_each_professor_to_one_shard():
+    for professor in PROFESSORS:
+        shard = professor_shard(professor, 3)
+        assert 1 <= shard <= 3
+        assert professor_shard(professor, 3) == shard
+    assert all(professor_shard(professor, 1) == 1 for professor in PROFESSORS)
+
+
+def test_merge_reports_missing_shards_failures_and_unprocessed(tmp_path):
+    data = _workbook()
+    paths = [
+        write_shard_manifest(str(tmp_path), (1, 3), data, [
+            _generated(tmp_path, "PROF A"),
+            _generated(tmp_path, "PROF B", write_file=False),
+        ]),
+        write_shard_manifest(str(tmp_path), (3, 3), data, [
+            _generated(tmp_path, "PROF C"),
+            {"professor": "PROF D", "status": "error", "error": "boom"},
+        ]),
+    ]
+
+    summary = merge_shard_manifests(paths, data)
+
+    assert summary["shard_count"] == 3
+    assert summary["missing_shards"] == [2]
+    assert summary["generated"] == ["PROF A", "PROF C"]
+    assert [(entry["professor"], entry["status"]) for entry in summary["failed"]] == [
+        ("PROF B", "missing_file"), ("PROF D", "error")]
+    assert summary["unprocessed"] == ["PROF E", "PROF F", "PROF G", "PROF H"]
+
+
+def test_merge_trusts_reports_in_an_archive(tmp_path):
+    data = _workbook()
+    path = write_shard_manifest(str(tmp_path), (1, 1), data, [_generated(tmp_path, "PROF A", write_file=False)],
+                                archive_path=str(tmp_path / "reports.zip"))
+    summary = merge_shard_manifests([path])
+    assert summary["generated"] == ["PROF A"]
+    assert summary["failed"] == []
+
+
+def test_merge_rejects_different_layouts_and_workbooks(tmp_path):
+    data = _workbook()
+    first = write_shard_manifest(str(tmp_path), (1, 2), data, [])
+    other = write_shard_manifest(str(tmp_path), (1, 3), data, [])
+    with pytest.raises(ValueError):
+        merge_shard_manifests([first, other])
+
+    changed = make_workbook(["02/03/2024 14:30"], professors=["PROF A"])
+    with pytest.raises(ValueError):
+        merge_shard_manifests([first], changed)
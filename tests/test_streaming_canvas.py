@@ -0,0 +1,60 @@
+import os
+
+import pytest
+from PIL import Image
+from reportlab.lib.pagesizes import letter
+from reportlab.pdfbase import pdfdoc
+
+from streaming_canvas import StreamingCanvas
+
+
+def draw_pages(c, image, count, first=0):
+    for i in range(first, first + count):
+        c.bookmarkPage(f"page{i}")
+        c.addOutlineEntry(f"Page {i}", f"page{i}", level=0)
+        c.drawImage(image, 50, 600, width=100, height=50)
+        c.drawString(50, 500, f"Page {i}")
+        c.showPage()
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "logo.png"
+    Image.new("RGB", (40, 20), (200, 30, 30)).save(path)
+    return str(path)
+
+
+def test_flush_writes_pages_and_images_and_keeps_no_copy(tmp_path, image):
+    path = tmp_path / "out.pdf"
+    c = StreamingCanvas(str(path), pagesize=letter)
+    draw_pages(c, image, 3)
+    c.flush()
+    retained = [obj for obj in c._doc.idToObject.values()
+                if isinstance(obj, (pdfdoc.PDFPage, pdfdoc.PDFImageXObject, pdfdoc.PDFStream))]
+    assert retained == []
+    size = os.path.getsize(path)
+    assert size > 0
+
+    # The image drawn again refers to the copy already in the file
+    draw_pages(c, image, 3, first=3)
+    c.flush()
+    assert os.path.getsize(path) - size < size
+    c.save()
+
+
+def test_saved_document_has_every_page_and_bookmark(tmp_path, image):
+    pypdf = pytest.importorskip("pypdf")
+    path = tmp_path / "out.pdf"
+    c = StreamingCanvas(str(path), pagesize=letter)
+    c.setTitle("Streaming")
+    for first in (0, 2):
+        draw_pages(c, image, 2, first)
+        c.flush()
+    c.drawString(50, 500, "Unflushed last page")
+    c.save()
+
+    reader = pypdf.PdfReader(str(path), strict=True)
+    assert len(reader.pages) == 5
+    assert [entry.title for entry in reader.outline] == ["Page 0", "Page 1", "Page 2", "Page 3"]
+    assert reader.metadata.title == "Streaming"
+    assert "Unflushed last page" in reader.pages[4].extract_text()
@@ -0,0 +1,18 @@
+import pytest
+
+from validation import TIMESTAMP_COLUMN, WorkbookValidationError, validate_workbook
+from workbooks import make_workbook
+
+
+def test_day_first_text_timestamps_are_valid():
+    data = make_workbook(["01/03/2024 14:30", "13/02/2024 02:00", "28/11/2023 09:15", "05/10/2023 23:59"])
+    report = validate_workbook(data)
+    assert TIMESTAMP_COLUMN not in report["columns"]
+    assert not report["errors"]
+
+
+def test_unparseable_timestamps_are_rejected():
+    data = make_workbook(["13/02/2024 02:00", "not a date", "yesterday", "31/31/2024 10:00"])
+    with pytest.raises(WorkbookValidationError) as error:
+        validate_workbook(data)
+    assert error.value.report["columns"][TIMESTAMP_COLUMN] == 3
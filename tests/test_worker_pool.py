@@ -0,0 +1,38 @@
+import os
+
+from worker_pool import run_in_recycled_workers
+
+
+def _init(prefix):
+    return {"prefix": prefix}
+
+
+def _run(state, task):
+    if task == "crash":
+        os._exit(3)
+    if task == "error":
+        raise ValueError("bad task")
+    return (state["prefix"], task, os.getpid())
+
+
+def test_workers_are_recycled_after_max_tasks():
+    results = list(run_in_recycled_workers(_run, range(6), worker_init=_init, init_args=("run",),
+                                           workers=2, max_tasks_per_worker=2))
+    assert sorted(task for task, _, _ in results) == list(range(6))
+    assert all(error is None and result[:2] == ("run", task) for task, result, error in results)
+    # No process ran more than two tasks
+    pids = [result[2] for _, result, _ in results]
+    assert max(pids.count(pid) for pid in pids) <= 2
+
+
+def test_failed_tasks_are_reported_and_crashed_tasks_retried():
+    messages = []
+    results = {task: (result, error) for task, result, error in run_in_recycled_workers(
+        _run, ["crash", "error", 1], worker_init=_init, init_args=("run",), workers=2, max_retries=1,
+        progress_callback=messages.append)}
+    assert results["error"] == (None, "bad task")
+    assert results[1][1] is None
+    assert results["crash"][0] is None
+    assert "exit code 3" in results["crash"][1]
+    # The crashed task was run once more in a fresh worker before giving up
+    assert len(messages) == 1
@@ -0,0 +1,31 @@
+"""Small workbooks in the export layout for the tests"""
+import pandas as pd
+
+from validation import COLUMNS_AFTER_LEVEL3, N_QUESTIONS, N_TEACHING_METHODS, TIMESTAMP_COLUMN
+
+
+def make_workbook(timestamps, professors=None, grades=None, departments=None, comments=None):
+    """
+    A workbook in the export layout with one valid response per timestamp.
+    professors, grades (one grade for all questions of a row), departments and
+    comments (the first comment column) default to the same value for every row.
+    """
+    rows = len(timestamps)
+    columns = {}
+    if departments is not None:
+        columns['Level 1'] = departments
+    columns.update({TIMESTAMP_COLUMN: timestamps, 'Specialization': ['Informatica'] * rows,
+                    'Level 2': professors or ['PROF A'] * rows, 'Level 3': ['Curs-Anul 1'] * rows,
+                    'Attendance': ['80%'] * rows, 'Workload': ['Medium'] * rows})
+    for i in range(N_TEACHING_METHODS):
+        columns[f'Method {i + 1}'] = ['Yes'] * rows
+    for i in range(N_QUESTIONS):
+        columns[f'Question {i + 1}'] = grades or [8] * rows
+    for i in range(COLUMNS_AFTER_LEVEL3 - 2 - N_TEACHING_METHODS - N_QUESTIONS):
+        columns[f'Comment {i + 1}'] = (comments if i == 0 and comments else [''] * rows)
+    return pd.DataFrame(columns)
+
+
+def write_workbook(path, data):
+    data.to_excel(path, index=False)
+    return str(path)
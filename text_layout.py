@@ -0,0 +1,138 @@
+"""
+Measured text layout for the comment pages of the reports.
+
+Lines are wrapped by their real width in the report font (pdfmetrics.stringWidth)
+instead of by character count, so long words and text with diacritics stay inside
+the margins. A TextLayout measures each glyph and word once and caches the width,
+which makes wrapping thousands of comments a matter of dictionary lookups; a
+report uses its own layout, so the caches go away with it and memory does not
+grow with the comments of a long-running process. paginate places the wrapped
+blocks on pages by their exact height, and draw_text_blocks writes a page's text
+with one text object per style instead of one drawString (and font and colour
+change) per line.
+"""
+from reportlab.pdfbase import pdfmetrics
+
+
+class TextLayout:
+    """
+    Width measurement and line wrapping for one font and size. The width caches
+    grow with the distinct words measured, so keep a layout for one report.
+    """
+
+    def __init__(self, font, size, leading=None):
+        self.font = font
+        self.size = size
+        self.leading = leading if leading is not None else size * 1.2
+        self.glyph_widths = {}
+        self.word_widths = {}
+        self.space_width = self.width(" ")
+
+    def glyph_width(self, glyph):
+        width = self.glyph_widths.get(glyph)
+        if width is None:
+            width = self.glyph_widths[glyph] = pdfmetrics.stringWidth(glyph, self.font, self.size)
+        return width
+
+    def width(self, text):
+        """Width of text in points (the sum of its glyph widths, as stringWidth measures it)"""
+        width = self.word_widths.get(text)
+        if width is None:
+            width = self.word_widths[text] = sum(map(self.glyph_width, text))
+        return width
+
+    def _break_word(self, word, max_width):
+        """Split a word wider than a line into pieces that fit"""
+        pieces = []
+        piece = ""
+        piece_width = 0
+        for glyph in word:
+            glyph_width = self.glyph_width(glyph)
+            if piece and piece_width + glyph_width > max_width:
+                pieces.append(piece)
+                piece, piece_width = "", 0
+            piece += glyph
+            piece_width += glyph_width
+        if piece:
+            pieces.append(piece)
+        return pieces
+
+    def wrap(self, text, max_width):
+        """
+        Split text into lines no wider than max_width, breaking between words
+        (runs of whitespace count as one space) and inside words that are too long
+        """
+        lines = []
+        line = []
+        line_width = 0
+        for word in text.split():
+            word_width = self.width(word)
+            if word_width > max_width:
+                pieces = self._break_word(word, max_width)
+                word = pieces.pop()
+                word_width = self.width(word)
+                if line:
+                    lines.append(" ".join(line))
+                lines.extend(pieces)
+                line, line_width = [], 0
+            if line and line_width + self.space_width + word_width > max_width:
+                lines.append(" ".join(line))
+                line, line_width = [], 0
+            line_width += word_width + (self.space_width if line else 0)
+            line.append(word)
+        if line:
+            lines.append(" ".join(line))
+        return lines
+
+    def wrap_all(self, texts, max_width):
+        """Wrap many texts at once; returns one list of lines per text"""
+        return [self.wrap(text, max_width) for text in texts]
+
+
+def paginate(blocks, leading, first_top, top, bottom, gap=0):
+    """
+    Place blocks of lines (e.g. wrapped comments) from top to bottom on pages.
+
+    The first page starts at first_top, the following ones at top; a block starts
+    on a new page when its lines do not all fit above bottom, and a block taller
+    than a whole page is split across pages. gap is the extra space after a block.
+    Returns the pages as lists of (block index, baseline of the first line, lines,
+    continued), where continued is True for the rest of a split block.
+    """
+    pages = [[]]
+    y = first_top
+    page_lines = int((top - bottom) // leading) + 1
+    for index, lines in enumerate(blocks):
+        if not lines:
+            continue
+        needed = (len(lines) - 1) * leading
+        if pages[-1] and (y < bottom or (y - needed < bottom and len(lines) <= page_lines)):
+            pages.append([])
+            y = top
+        continued = False
+        while lines:
+            fit = max(1, int((y - bottom) // leading) + 1)
+            pages[-1].append((index, y, lines[:fit], continued))
+            y -= len(lines[:fit]) * leading
+            lines = lines[fit:]
+            if lines:
+                pages.append([])
+                y = top
+                continued = True
+        y -= gap
+    return pages if pages[-1] else pages[:-1]
+
+
+def draw_text_blocks(c, blocks, font, size, leading=None, color=(0, 0, 0)):
+    """
+    Draw [(x, y, lines)] with a single text object in one font and colour
+    """
+    if not blocks:
+        return
+    text = c.beginText()
+    text.setFont(font, size, leading if leading is not None else size * 1.2)
+    text.setFillColorRGB(*color)
+    for x, y, lines in blocks:
+        text.setTextOrigin(x, y)
+        text.textLines(lines, trim=0)
+    c.drawText(text)
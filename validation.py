@@ -0,0 +1,142 @@
+"""
+Schema and data-quality checks of a loaded workbook, run before any report is generated.
+
+The report code finds its columns by position around "Level 2" and "Level 3" (see
+resolve_report_columns in main.py), so a missing or shifted column otherwise only
+shows up as one failed report after another. validate_workbook checks that layout
+and counts the invalid grades, unparseable timestamps and empty professor names of
+every column with whole-column operations, in a fraction of a second even for large
+workbooks, and raises WorkbookValidationError with a compact report when the
+workbook cannot produce correct reports.
+"""
+import pandas as pd
+
+N_TEACHING_METHODS = 4
+N_QUESTIONS = 12
+N_COMMENTS = 3
+# Attendance and workload, then the teaching methods, questions and comments
+COLUMNS_AFTER_LEVEL3 = 2 + N_TEACHING_METHODS + N_QUESTIONS + N_COMMENTS
+TIMESTAMP_COLUMN = 'Timestamp (dd/mm/yyyy)'
+
+# Share of a column's values that may be invalid before the workbook is rejected
+MAX_INVALID_FRACTION = 0.05
+# A "question" column with fewer numeric values than this is taken for a shifted column
+MIN_NUMERIC_FRACTION = 0.5
+
+
+class WorkbookValidationError(ValueError):
+    """
+    Raised when a workbook cannot produce correct reports. The validation
+    report (see validate_workbook) is kept in the report attribute.
+    """
+
+    def __init__(self, report):
+        self.report = report
+        super().__init__(format_validation_report(report))
+
+
+def _filled(column):
+    """
+    Which values of a column are present (not missing and not blank)
+    """
+    if column.dtype == object or pd.api.types.is_string_dtype(column):
+        return column.notna() & (column.astype(str).str.strip() != "")
+    return column.notna()
+
+
+def check_layout(data):
+    """
+    The problems of the column layout the reports rely on, as a list of messages
+    """
+    columns = list(data.columns)
+    errors = []
+    for name in ('Level 2', 'Level 3'):
+        if name not in columns:
+            errors.append(f"Missing column '{name}'")
+    if errors:
+        return errors
+
+    if columns.index('Level 2') == 0:
+        errors.append("No specialization column before 'Level 2'")
+    after_level3 = len(columns) - columns.index('Level 3') - 1
+    if after_level3 < COLUMNS_AFTER_LEVEL3:
+        errors.append(f"Expected {COLUMNS_AFTER_LEVEL3} columns after 'Level 3' (attendance, workload, "
+                      f"{N_TEACHING_METHODS} teaching methods, {N_QUESTIONS} questions, {N_COMMENTS} comments), "
+                      f"found {after_level3}")
+    return errors
+
+
+def validate_workbook(data, max_invalid_fraction=MAX_INVALID_FRACTION):
+    """
+    Check the layout and the values of a loaded workbook.
+
+    Returns the report: {"rows", "errors", "warnings", "columns"}, where columns
+    maps each checked column to its number of invalid values. Raises
+    WorkbookValidationError when the layout is wrong or a column has more than
+    max_invalid_fraction invalid values; smaller problems are only warnings.
+    """
+    report = {"rows": int(len(data)), "errors": check_layout(data), "warnings": [], "columns": {}}
+    if report["errors"]:
+        raise WorkbookValidationError(report)
+    if len(data) == 0:
+        report["errors"].append("The workbook has no responses")
+        raise WorkbookValidationError(report)
+
+    def record(column, problem, invalid, present):
+        invalid = int(invalid)
+        if not invalid:
+            return
+        report["columns"][str(column)] = invalid
+        message = f"{column}: {invalid} {problem}"
+        # Empty cells are allowed, so the share is of the filled ones
+        if invalid > max(1, int(present) * max_invalid_fraction):
+            report["errors"].append(message)
+        else:
+            report["warnings"].append(message)
+
+    columns = list(data.columns)
+    professors = _filled(data['Level 2'])
+    if not professors.any():
+        report["errors"].append("Level 2: no professor names")
+    else:
+        record('Level 2', "rows without a professor name (skipped)", (~professors).sum(), len(data))
+
+    # Questions follow attendance, workload and the teaching methods
+    first_question = columns.index('Level 3') + 3 + N_TEACHING_METHODS
+    question_cols = columns[first_question:first_question + N_QUESTIONS]
+    questions = data[question_cols]
+    present = questions.apply(_filled)
+    grades = questions.apply(pd.to_numeric, errors='coerce')
+    numeric = (grades.notna() & present).sum()
+    invalid = (present & ~grades.isin(range(1, 11))).sum()
+    for position, column in enumerate(question_cols, start=1):
+        if present[column].any() and numeric[column] < present[column].sum() * MIN_NUMERIC_FRACTION:
+            report["errors"].append(f"{column}: question {position} is not numeric (shifted columns?)")
+            continue
+        record(column, "grades outside 1-10", invalid[column], present[column].sum())
+
+    if TIMESTAMP_COLUMN in columns:
+        timestamps = data[TIMESTAMP_COLUMN]
+        present = _filled(timestamps)
+        # Text timestamps are in the workbook's dd/mm/yyyy format, as infer_semester reads them
+        parsed = pd.to_datetime(timestamps, errors='coerce', dayfirst=True)
+        record(TIMESTAMP_COLUMN, "unparseable timestamps", (present & parsed.isna()).sum(), present.sum())
+    else:
+        report["warnings"].append(f"No '{TIMESTAMP_COLUMN}' column; completion trends are skipped")
+
+    if report["errors"]:
+        raise WorkbookValidationError(report)
+    return report
+
+
+def format_validation_report(report):
+    """
+    The report as a few lines of text
+    """
+    lines = [f"✗ {error}" for error in report["errors"]]
+    lines += [f"⚠ {warning}" for warning in report["warnings"]]
+    if not lines:
+        lines.append(f"✓ Workbook is valid ({report['rows']} responses)")
+    elif report["errors"]:
+        lines.insert(0, f"Workbook rejected ({report['rows']} responses):")
+    return "\n".join(lines)
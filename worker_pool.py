@@ -0,0 +1,241 @@
+"""
+Process pool that recycles its workers to keep memory bounded.
+
+Long report batches leak memory inside matplotlib and font caches even when
+every figure is closed. Instead of relying on the garbage collector, each
+worker process is retired after a fixed number of tasks or as soon as its
+resident memory passes a threshold, and a fresh process takes its place.
+A task that pushes a worker past the memory cap while it is running is
+retried in a fresh worker.
+"""
+import os
+import sys
+import time
+import threading
+import multiprocessing
+from collections import deque
+from multiprocessing.connection import wait
+
+# Exit code used by a worker that was stopped for exceeding the memory cap
+MEMORY_CAP_EXIT_CODE = 86
+
+
+def current_rss_mb():
+    """
+    Return the resident memory of the current process in MB, or None if it cannot be read
+    """
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    # Linux: resident pages are the second field of /proc/self/statm
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        pass
+
+    # Windows: ask the process API for the working set size
+    if sys.platform == "win32":
+        try:
+            import ctypes
+            from ctypes import wintypes
+
+            class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+                _fields_ = [("cb", wintypes.DWORD),
+                            ("PageFaultCount", wintypes.DWORD),
+                            ("PeakWorkingSetSize", ctypes.c_size_t),
+                            ("WorkingSetSize", ctypes.c_size_t),
+                            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                            ("PagefileUsage", ctypes.c_size_t),
+                            ("PeakPagefileUsage", ctypes.c_size_t)]
+
+            counters = PROCESS_MEMORY_COUNTERS()
+            counters.cb = ctypes.sizeof(counters)
+            handle = ctypes.windll.kernel32.GetCurrentProcess()
+            if ctypes.windll.psapi.GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+                return counters.WorkingSetSize / (1024 * 1024)
+        except Exception:
+            pass
+
+    return None
+
+
+def _watch_memory(max_rss_mb, task_running, stop):
+    """
+    Kill the worker if it passes the memory cap while a task is running.
+    The parent notices the exit code and retries the task in a fresh worker.
+    """
+    while not stop.wait(0.25):
+        if task_running.is_set():
+            rss = current_rss_mb()
+            if rss is not None and rss > max_rss_mb:
+                os._exit(MEMORY_CAP_EXIT_CODE)
+
+
+def _worker_main(conn, task_fn, worker_init, init_args, worker_exit, max_tasks, max_rss_mb):
+    """
+    Body of a worker process: run tasks sent by the parent until told to stop
+    or until it is time to recycle this process.
+    """
+    state = worker_init(*init_args) if worker_init else None
+
+    task_running = threading.Event()
+    stop = threading.Event()
+    if max_rss_mb:
+        threading.Thread(target=_watch_memory, args=(max_rss_mb, task_running, stop), daemon=True).start()
+
+    completed = 0
+    try:
+        while True:
+            message = conn.recv()
+            if message is None:
+                break
+            task_id, task = message
+
+            task_running.set()
+            try:
+                result = task_fn(state, task)
+                error = None
+            except MemoryError:
+                # Let the parent retry this task in a fresh process
+                conn.send((task_id, None, "MemoryError", True))
+                break
+            except Exception as e:
+                result = None
+                error = str(e)
+            finally:
+                task_running.clear()
+
+            completed += 1
+            rss = current_rss_mb()
+            recycle = (max_tasks is not None and completed >= max_tasks) or \
+                      (max_rss_mb is not None and rss is not None and rss > max_rss_mb)
+            conn.send((task_id, result, error, recycle))
+            if recycle:
+                break
+    finally:
+        stop.set()
+        if worker_exit:
+            worker_exit(state)
+        conn.close()
+
+
+def run_in_recycled_workers(task_fn, tasks, worker_init=None, init_args=(), worker_exit=None,
+                            workers=2, max_tasks_per_worker=None, max_rss_mb=None, max_retries=1,
+                            progress_callback=None):
+    """
+    Run task_fn(state, task) for every task in a pool of worker processes and
+    yield (task, result, error) tuples as tasks finish (in completion order).
+
+    Each worker calls worker_init(*init_args) once to build its state and
+    worker_exit(state) when it is retired. A worker is replaced by a fresh
+    process after max_tasks_per_worker tasks or once its resident memory is
+    above max_rss_mb. If a worker dies or passes max_rss_mb during a task, the
+    task is retried in a new worker up to max_retries times before it is
+    reported as failed. task_fn, worker_init and worker_exit must be module
+    level functions so they can be sent to the worker processes.
+    """
+    pending = deque(enumerate(tasks))
+    task_by_id = dict(pending)
+    attempts = {task_id: 0 for task_id in task_by_id}
+
+    # conn -> [process, task_id currently running or None]
+    active = {}
+    context = multiprocessing.get_context("spawn")
+
+    def start_worker():
+        parent_conn, child_conn = context.Pipe()
+        process = context.Process(target=_worker_main,
+                                  args=(child_conn, task_fn, worker_init, init_args, worker_exit,
+                                        max_tasks_per_worker, max_rss_mb),
+                                  daemon=True)
+        process.start()
+        child_conn.close()
+        active[parent_conn] = [process, None]
+
+    def retire(conn):
+        process, _ = active.pop(conn)
+        conn.close()
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+
+    def retry_or_fail(task_id, reason):
+        attempts[task_id] += 1
+        if attempts[task_id] <= max_retries:
+            if progress_callback:
+                progress_callback(f"⚠ {reason}; retrying in a fresh worker")
+            pending.appendleft((task_id, task_by_id[task_id]))
+            return None
+        return (task_by_id[task_id], None, reason)
+
+    try:
+        while pending or any(slot[1] is not None for slot in active.values()):
+            # Keep the pool full and every worker busy
+            while pending and len(active) < workers:
+                start_worker()
+            for conn, slot in active.items():
+                if slot[1] is None and pending:
+                    task_id, task = pending.popleft()
+                    slot[1] = task_id
+                    conn.send((task_id, task))
+
+            busy = {conn: slot for conn, slot in active.items() if slot[1] is not None}
+            sentinels = {slot[0].sentinel: conn for conn, slot in busy.items()}
+            ready = wait(list(busy) + list(sentinels))
+
+            finished = set()
+            for item in ready:
+                conn = item if item in busy else sentinels[item]
+                if conn in finished:
+                    continue
+                finished.add(conn)
+                process, task_id = active[conn]
+
+                if conn.poll():
+                    try:
+                        reply_id, result, error, recycle = conn.recv()
+                    except (EOFError, OSError):
+                        reply_id = None
+                    if reply_id is not None:
+                        active[conn][1] = None
+                        if error == "MemoryError" and result is None:
+                            failure = retry_or_fail(reply_id, "Worker ran out of memory")
+                            retire(conn)
+                            if failure:
+                                yield failure
+                            continue
+                        if recycle:
+                            retire(conn)
+                        yield (task_by_id[reply_id], result, error)
+                        continue
+
+                # The worker died without answering
+                process.join(timeout=5)
+                if process.exitcode == MEMORY_CAP_EXIT_CODE:
+                    reason = f"Worker exceeded the {max_rss_mb} MB memory cap"
+                else:
+                    reason = f"Worker stopped unexpectedly (exit code {process.exitcode})"
+                retire(conn)
+                failure = retry_or_fail(task_id, reason)
+                if failure:
+                    yield failure
+    finally:
+        # Ask idle workers to stop and make sure nothing is left running
+        for conn in list(active):
+            try:
+                conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        deadline = time.time() + 10
+        for conn in list(active):
+            process, _ = active[conn]
+            process.join(timeout=max(0, deadline - time.time()))
+            retire(conn)